@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+BatchSizer.py - number of points per ReadPropertyMultiple request, per device
+
+A device that can't segment its answers must fit the whole
+ReadPropertyMultiple-ACK in one APDU. Instead of falling back to one point per
+request, the number of points is computed from maxApduLengthAccepted and from
+the size of the values actually received. Aborts and buffer overflows shrink
+the batch, a series of successful requests lets it grow again. A size that
+failed is tried again after a long run of successful requests at the largest
+size allowed (the failure may have been a busy device or a lost packet).
+"""
+# --- standard Python modules ---
+import typing as t
+
+# --- 3rd party modules ---
+from bacpypes3.basetypes import Segmentation
+
+# ------------------------------------------------------------------------------
+
+DEFAULT_POINTS_PER_REQUEST = 25
+MAX_POINTS_PER_REQUEST = 50
+
+# ComplexACK header (PDU type, invoke ID, service choice)
+ACK_HEADER_SIZE = 3
+# Each result : object identifier, opening/closing tags, property identifier
+RESULT_OVERHEAD = 11
+# A Real, until something is measured
+DEFAULT_VALUE_SIZE = 5
+
+# Successful requests in a row before trying a bigger batch
+GROW_AFTER = 10
+# Successful requests in a row at the limit before trying a size that failed
+RETRY_CEILING_AFTER = 100
+# Weight of the last measure in the average value size
+SMOOTHING = 0.2
+
+
+def encoded_size(value: t.Any) -> int:
+    """
+    Size of a value once encoded in an APDU (application tagged).
+    """
+    try:
+        return len(value.encode().encode().pduData)
+    except Exception:
+        return DEFAULT_VALUE_SIZE
+
+
+class RPMBatchSizer:
+    """
+    Learns how many points can be read in one ReadPropertyMultiple request.
+
+    :param size: (int) starting size (a size learned before, for example)
+    :param max_apdu_length_accepted: (int) from the device information
+    :param segmentation_supported: (Segmentation) from the device information
+
+    *Example*::
+
+        sizer = RPMBatchSizer(max_apdu_length_accepted=480,
+                              segmentation_supported=Segmentation.noSegmentation)
+        sizer.size      # 29 points of presentValue (Real) fit in 480 bytes
+    """
+
+    def __init__(
+        self,
+        size: t.Optional[int] = None,
+        max_apdu_length_accepted: int = 1476,
+        segmentation_supported: t.Any = Segmentation.segmentedBoth,
+    ) -> None:
+        self.max_apdu_length_accepted = max_apdu_length_accepted
+        self.segmented = segmentation_supported in (
+            Segmentation.segmentedBoth,
+            Segmentation.segmentedTransmit,
+        )
+        self.value_size: float = DEFAULT_VALUE_SIZE
+        # smallest size known to fail, biggest size known to work
+        self.ceiling = MAX_POINTS_PER_REQUEST + 1
+        self.largest_working = 0
+        self._successes = 0
+        self._at_limit = 0
+        if not size:
+            size = DEFAULT_POINTS_PER_REQUEST if self.segmented else self.limit
+        self.size = max(1, min(size, self.limit))
+
+    @property
+    def limit(self) -> int:
+        """
+        Biggest batch expected to fit in the answer of the device.
+        """
+        if self.segmented:
+            limit = MAX_POINTS_PER_REQUEST
+        else:
+            limit = int(
+                (self.max_apdu_length_accepted - ACK_HEADER_SIZE)
+                // (RESULT_OVERHEAD + self.value_size)
+            )
+        return max(1, min(limit, MAX_POINTS_PER_REQUEST, self.ceiling - 1))
+
+    def success(self, values: t.Sequence[t.Any]) -> None:
+        """
+        A batch was read. Measure the values and grow if it's been a while.
+        """
+        if values:
+            measured = sum(encoded_size(value) for value in values) / len(values)
+            self.value_size += SMOOTHING * (measured - self.value_size)
+            if len(values) < self.ceiling:
+                self.largest_working = max(self.largest_working, len(values))
+        self._successes += 1
+        if self.size >= self.limit and self.ceiling <= MAX_POINTS_PER_REQUEST:
+            self._at_limit += 1
+            if self._at_limit >= RETRY_CEILING_AFTER:
+                # give the failing size another chance
+                self.ceiling += 1
+                self._at_limit = 0
+        if self.size > self.limit:
+            self.size = self.limit
+        elif self._successes >= GROW_AFTER and self.size < self.limit:
+            self.size += 1
+            self._successes = 0
+
+    def failure(self, batch_size: t.Optional[int] = None) -> None:
+        """
+        A batch was too big (abort, segmentation not supported, buffer overflow).
+        The size falls back to the largest one known to work (at least half
+        the failing size).
+        """
+        batch_size = batch_size or self.size
+        self.ceiling = min(self.ceiling, max(2, batch_size))
+        self.largest_working = min(self.largest_working, self.ceiling - 1)
+        self.size = max(
+            1,
+            min(
+                self.size,
+                self.ceiling - 1,
+                max(self.largest_working, batch_size // 2),
+            ),
+        )
+        self._successes = 0
+        self._at_limit = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"RPMBatchSizer(size {self.size} | limit {self.limit} | "
+            f"segmented {self.segmented} | ~{self.value_size:.1f} bytes/value)"
+        )
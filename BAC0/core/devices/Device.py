@@ -14,12 +14,15 @@ import os.path
 
 # --- standard Python modules ---
 from collections import namedtuple
+from types import MappingProxyType
 from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 
 # --- this application's modules ---
-from bacpypes3.basetypes import ServicesSupported
+from bacpypes3.basetypes import PropertyIdentifier, ServicesSupported
 from bacpypes3.errors import NoResponse
+from bacpypes3.pdu import Address
+from bacpypes3.primitivedata import ObjectIdentifier
 
 # from ...bokeh.BokehRenderer import BokehPlot
 from ...db.sql import SQLMixin
@@ -35,14 +38,62 @@ from ..io.IOExceptions import (
 )
 from ..utils.notes import note_and_log
 from ..utils.lookfordependency import pandas_if_available
-from .mixins.read_mixin import ReadProperty, ReadPropertyMultiple
+from .mixins.read_mixin import ReadProperty, ReadPropertyMultiple, create_trendlogs
 from .Points import BooleanPoint, EnumPoint, NumericPoint, OfflinePoint, Point
+from .ReadBatcher import READ_BATCHING_WINDOW, ReadBatcher
+from .Snapshot import SNAPSHOT_DIRECTORY, DeviceSnapshot, read_revision
 from .Virtuals import VirtualPoint
 
 _PANDAS, pd, _, _ = pandas_if_available()
 # ------------------------------------------------------------------------------
 
 
+def _object_key(object_type: Any, address: Any) -> Tuple[str, Any]:
+    """
+    Index key of a point : ("analogValue", 3), ("analogValue", "3") and
+    ("analogValue", 3.0) are the same object.
+    """
+    try:
+        address = float(address)
+    except (TypeError, ValueError):
+        address = str(address)
+    return (str(object_type), address)
+
+
+def _notify_change(method):
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._on_change()
+        return result
+
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class _PointList(List[Point]):
+    """
+    List of the points of a device. Changing it in place (append, remove...)
+    calls on_change so everything built from the list is rebuilt.
+    """
+
+    def __init__(self, points, on_change) -> None:
+        super().__init__(points)
+        self._on_change = on_change
+
+    append = _notify_change(list.append)
+    extend = _notify_change(list.extend)
+    insert = _notify_change(list.insert)
+    remove = _notify_change(list.remove)
+    pop = _notify_change(list.pop)
+    clear = _notify_change(list.clear)
+    sort = _notify_change(list.sort)
+    reverse = _notify_change(list.reverse)
+    __setitem__ = _notify_change(list.__setitem__)
+    __delitem__ = _notify_change(list.__delitem__)
+    __iadd__ = _notify_change(list.__iadd__)
+    __imul__ = _notify_change(list.__imul__)
+
+
 class DeviceProperties(object):
     def __init__(self):
         self.name: str = "Unknown"
@@ -63,6 +114,17 @@ class DeviceProperties(object):
         self.fast_polling: bool = False
         self.vendor_id: int = 0
         self.ping_failures: int = 0
+        self.rpm_batch_size: Optional[int] = None
+        self.rpm_window: Optional[int] = None
+        self.rp_window: Optional[int] = None
+        # read objectList[i] with ReadPropertyMultiple when the list is too big
+        self.object_list_rpm: bool = True
+        # points created from their name only, completed on first use
+        self.fast_connect: bool = False
+        # with fast_connect, complete all points in the background
+        self.warm_up: bool = False
+        # directory of the device snapshot (None : no snapshot)
+        self.snapshot: Optional[str] = None
 
     @property
     def asdict(self) -> Dict:
@@ -88,6 +150,12 @@ class Device(SQLMixin):
     object_list (list, optional): User can provide a custom object list for the creation of the device. The object list must be built using the same pattern returned by bacpypes when polling the objectList property. Defaults to None.
     auto_save (bool or int, optional): If False or 0, auto_save is disabled. To activate, pass an integer representing the number of polls before auto_save is called. Will write the histories to SQLite db locally. Defaults to None.
     clear_history_on_save (bool, optional): If set to True, will clear device history. Defaults to None.
+    fast_connect (bool, optional): If set to True, points are created from their name only. Description, units, state texts
+        are read the first time the value of a point is read (or using device.load_point_details()). Defaults to False.
+    warm_up (bool, optional): With fast_connect, read the details of every point in the background after connection. Defaults to False.
+    snapshot (bool or str, optional): If set to True (or to a directory), the object list and points are saved after
+        discovery. On the next connection, if databaseRevision and the length of objectList didn't change, points are
+        created from the snapshot instead of being discovered again. Defaults to False.
 
     """
 
@@ -106,12 +174,28 @@ class Device(SQLMixin):
         clear_history_on_save: bool = False,
         history_size: Optional[int] = None,
         reconnect_on_failure: bool = True,
+        fast_connect: bool = False,
+        warm_up: bool = False,
+        snapshot: Union[bool, str] = False,
     ):
         self.properties = DeviceProperties()
         # self.initialized = False
         self.properties.address = address
         self.properties.device_id = device_id
         self.properties.network = network
+        self._bacnet_address: Tuple[Optional[str], Optional[Address]] = (None, None)
+        self._rpm_batch_sizer = None
+        self._rpm_in_flight: Optional[asyncio.Semaphore] = None
+        self._rp_in_flight: Optional[asyncio.Semaphore] = None
+        # background reading of the details of points (see load_point_details)
+        self._details_task: Optional[asyncio.Task] = None
+        # databaseRevision of the snapshot of the device
+        self._database_revision: Optional[int] = None
+        # points that can't be read using ReadPropertyMultiple
+        # point name -> time.monotonic() until which it is read with ReadProperty
+        self._rpm_excluded: Dict[str, float] = {}
+        # point.value reads grouped in ReadPropertyMultiple (opt-in)
+        self._read_batcher: Optional[ReadBatcher] = None
         self.properties.pollDelay = poll
         self.properties.fast_polling = True if poll < 10 else False
         self.properties.name = ""
@@ -123,6 +207,11 @@ class Device(SQLMixin):
         self.properties.save_resampling = save_resampling
         self.properties.clear_history_on_save = clear_history_on_save
         self.properties.history_size = history_size
+        self.properties.fast_connect = fast_connect
+        self.properties.warm_up = warm_up
+        self.properties.snapshot = (
+            SNAPSHOT_DIRECTORY if snapshot is True else snapshot
+        ) or None
         self._reconnect_on_failure = reconnect_on_failure
 
         self.segmentation_supported = segmentation_supported
@@ -134,6 +223,7 @@ class Device(SQLMixin):
 
         self.points = []
         self._list_of_trendlogs = {}
+        self._trends_by_name: Tuple[Any, Dict[str, Any]] = (None, {})
 
         self._polling_task = namedtuple("_polling_task", ["task", "running"])
         self._polling_task.task = None
@@ -141,6 +231,7 @@ class Device(SQLMixin):
 
         self._find_overrides_progress = 0.0
         self._find_overrides_running = False
+        self._discover_points_progress = 0.0
         self._release_overrides_progress = 0.0
         self._release_overrides_running = False
         self.creation_task = (
@@ -170,6 +261,81 @@ class Device(SQLMixin):
                     "Please provide address, device id and network or specify from_backup argument"
                 )
 
+    @property
+    def points(self) -> List[Point]:
+        return self._points
+
+    @points.setter
+    def points(self, points: List[Point]) -> None:
+        self._points = _PointList(points, self._points_changed)
+        self._points_changed()
+
+    def _points_changed(self) -> None:
+        """
+        Called each time a new point list is given to the device. Everything
+        built from the point list (like compiled read plans) must be
+        invalidated here.
+        """
+        self._read_plans: Dict[Tuple, Any] = {}
+        # indexes used to find points without scanning the list
+        self._points_by_name: Dict[str, Point] = {}
+        self._points_by_object: Dict[Tuple[str, Any], Point] = {}
+        self._points_by_tag: Dict[Any, List[Point]] = {}
+        # built on first use
+        self._points_by_class: Dict[type, Tuple[Point, ...]] = {}
+        self._point_views: Optional[Dict[str, MappingProxyType]] = None
+        for point in reversed(self._points):
+            # the first point wins, as it did when scanning the list
+            self._points_by_name[point.properties.name] = point
+            self._points_by_object[
+                _object_key(point.properties.type, point.properties.address)
+            ] = point
+        for point in self._points:
+            self._index_tags(point, getattr(point, "tags", None) or [])
+
+    def _index_tags(self, point: Point, tags: List[Tuple[Any, Any]]) -> None:
+        for tag_id, tag_value in tags:
+            for key in (tag_id, (tag_id, tag_value)):
+                points = self._points_by_tag.setdefault(key, [])
+                if not any(each is point for each in points):
+                    points.append(point)
+
+    def points_of_class(self, point_class: type) -> Tuple[Point, ...]:
+        """
+        All the points that are instances of point_class (NumericPoint,
+        BooleanPoint...). Kept until the point list changes.
+        """
+        try:
+            return self._points_by_class[point_class]
+        except KeyError:
+            points = tuple(
+                point for point in self._points if isinstance(point, point_class)
+            )
+            self._points_by_class[point_class] = points
+            return points
+
+    def find_points_by_tag(self, tag_id: Any, tag_value: Any = None) -> List[Point]:
+        """
+        Points having the tag tag_id (with the value tag_value, if given).
+        """
+        key = tag_id if tag_value is None else (tag_id, tag_value)
+        return list(self._points_by_tag.get(key, []))
+
+    @property
+    def bacnet_address(self) -> Address:
+        """
+        Address of the device as a bacpypes3 Address. Built once and reused for
+        every request sent to the device.
+        """
+        address = str(self.properties.address)
+        if self._bacnet_address[0] != address:
+            self._bacnet_address = (address, Address(address))
+        return self._bacnet_address[1]  # type: ignore[return-value]
+
+    @property
+    def device_identifier(self) -> ObjectIdentifier:
+        return ObjectIdentifier(("device", int(self.properties.device_id)))
+
     @property
     def initialized(self):
         if isinstance(self, DeviceConnected) and self.creation_task.done():
@@ -314,6 +480,14 @@ class Device(SQLMixin):
         for point in self.points:
             point.properties.history_size = size
 
+    def batch_point_reads(self, window: Optional[float] = READ_BATCHING_WINDOW) -> None:
+        """
+        Group the point.value reads made within window seconds in
+        ReadPropertyMultiple requests. Use None to read points one at a time
+        again (default behaviour).
+        """
+        self._read_batcher = ReadBatcher(self, window) if window is not None else None
+
     @property
     def analog_units(self) -> Dict[str, str]:
         raise NotImplementedError()
@@ -349,13 +523,12 @@ class Device(SQLMixin):
         """
         Find point based on type and address
         """
-        for point in self.points:
-            if (
-                point.properties.type == objectType
-                and float(point.properties.address) == objectAddress
-            ):
-                return point
-        raise ValueError(f"{objectType} {objectAddress} doesn't exist in controller")
+        try:
+            return self._points_by_object[_object_key(objectType, objectAddress)]
+        except KeyError:
+            raise ValueError(
+                f"{objectType} {objectAddress} doesn't exist in controller"
+            )
 
     def find_overrides(self, force: bool = False) -> None:
         if self._find_overrides_running and not force:
@@ -389,6 +562,9 @@ class Device(SQLMixin):
     def find_overrides_progress(self) -> float:
         return self._find_overrides_progress
 
+    def discover_points_progress(self) -> float:
+        return self._discover_points_progress
+
     def release_all_overrides(self, force: bool = False) -> None:
         if self._release_overrides_running and not force:
             self.log(
@@ -460,6 +636,17 @@ class DeviceConnected(Device):
             f"Wait while stopping polling for {self.properties.name}", level="info"
         )
         self.poll(command="stop")
+        if self._details_task is not None and not self._details_task.done():
+            # details of the points still being read in the background
+            self._details_task.cancel()
+            try:
+                await self._details_task
+            except asyncio.CancelledError:
+                pass
+        self._details_task = None
+        if self._database_revision is not None:
+            # keep what was learned (batch size...)
+            await self.save_snapshot(self._database_revision)
         if unregister:
             self.properties.network.unregister_device(self)
             self.properties.network = None
@@ -506,11 +693,13 @@ class DeviceConnected(Device):
         """
         Upon connection to build the device point list and properties.
         """
+        if await self._points_from_snapshot():
+            return
         try:
-            self.properties.pss.value = await self.properties.network.read(
-                "{} device {} protocolServicesSupported".format(
-                    self.properties.address, self.properties.device_id
-                )
+            self.properties.pss.value = await self.properties.network.read_value(
+                self.bacnet_address,
+                self.device_identifier,
+                PropertyIdentifier.protocolServicesSupported,
             )
 
         except NoResponseFromController as error:
@@ -523,14 +712,16 @@ class DeviceConnected(Device):
             await self.new_state(DeviceDisconnected)
 
         self.properties.name = str(
-            await self.properties.network.read(
-                f"{self.properties.address} device {self.properties.device_id} objectName"
+            await self.properties.network.read_value(
+                self.bacnet_address,
+                self.device_identifier,
+                PropertyIdentifier.objectName,
             )
         )
-        self.properties.vendor_id = await self.properties.network.read(
-            "{} device {} vendorIdentifier".format(
-                self.properties.address, self.properties.device_id
-            )
+        self.properties.vendor_id = await self.properties.network.read_value(
+            self.bacnet_address,
+            self.device_identifier,
+            PropertyIdentifier.vendorIdentifier,
         )
         self._log.info(
             "Device {}:[{}] found... building points list".format(
@@ -543,12 +734,8 @@ class DeviceConnected(Device):
                 self.points,
                 self._list_of_trendlogs,
             ) = await self._discoverPoints(self.custom_object_list)
-            if self.properties.pollDelay is not None and self.properties.pollDelay > 0:
-                self.poll(delay=self.properties.pollDelay)
-            self.update_history_size(size=self.properties.history_size)
-            self._log.info(
-                f"Device {self.properties.name} | {self.properties.device_id} ready, use device_name.points and start interact with it"
-            )
+            self._device_ready()
+            await self.save_snapshot()
             # self.clear_histories()
         except NoResponseFromController:
             self.log("Cannot retrieve object list, disconnecting...", level="error")
@@ -561,6 +748,80 @@ class DeviceConnected(Device):
             else:
                 self.log("Device creation failed... disconnecting", level="error")
 
+    def _device_ready(self):
+        if self.properties.pollDelay is not None and self.properties.pollDelay > 0:
+            self.poll(delay=self.properties.pollDelay)
+        self.update_history_size(size=self.properties.history_size)
+        self._log.info(
+            f"Device {self.properties.name} | {self.properties.device_id} ready, "
+            "use device_name.points and start interact with it"
+        )
+
+    async def _points_from_snapshot(self):
+        """
+        Create the points from the snapshot of the device, if it is still
+        valid. Returns False when a discovery is required.
+        """
+        device_id = self.properties.device_id
+        if not self.properties.snapshot or self.custom_object_list:
+            return False
+        if device_id is None:
+            return False
+        snapshot = DeviceSnapshot.load(device_id, self.properties.snapshot)
+        if snapshot is None:
+            return False
+        revision = await read_revision(self)
+        if not snapshot.matches(revision):
+            self.log(
+                f"Device {self.properties.device_id} changed since the snapshot "
+                f"(revision {revision}), discovering points",
+                level="info",
+            )
+            return False
+        self.properties.name = snapshot.name
+        self.properties.vendor_id = snapshot.vendor_id
+        self.properties.pss.value = snapshot.pss
+        self.properties.rpm_batch_size = snapshot.rpm_batch_size
+        self.segmentation_supported = snapshot.segmentation_supported
+        self.properties.segmentation_supported = snapshot.segmentation_supported
+        self.properties.objects_list = snapshot.objects_list
+        self._database_revision = snapshot.database_revision
+        self.points = snapshot.create_points(self)
+        self._list_of_trendlogs = await create_trendlogs(snapshot.objects_list, self)
+        self._log.info(
+            f"Device {self.properties.device_id}:[{self.properties.name}] created from snapshot"
+        )
+        stubs = [point for point in self.points if not point.properties.details_loaded]
+        if stubs and self.properties.warm_up:
+            self._details_task = asyncio.create_task(self.load_point_details(stubs))
+        self._device_ready()
+        return True
+
+    async def save_snapshot(self, database_revision=None):
+        """
+        Save the object list and the points of the device (see the snapshot
+        argument of the device). Also done when the device disconnects, to
+        keep the learned ReadPropertyMultiple batch size.
+
+        :param database_revision: (int) databaseRevision the points were
+            discovered at (read from the device by default)
+        """
+        if not self.properties.snapshot or self.custom_object_list:
+            return
+        if database_revision is None:
+            revision = await read_revision(self)
+            if revision is None:
+                self.log("No databaseRevision, snapshot not saved", level="debug")
+                return
+            database_revision = revision[0]
+        self._database_revision = database_revision
+        try:
+            DeviceSnapshot.from_device(self, database_revision).save(
+                self.properties.snapshot
+            )
+        except Exception as error:
+            self.log(f"Error saving snapshot : {error}", level="error")
+
     def __getitem__(self, point_name):
         """
         Allows the syntax: device['point_name'] or device[list_of_points]
@@ -574,11 +835,7 @@ class DeviceConnected(Device):
                 return self.df(point_name, force_read=False)
             elif isinstance(point_name, tuple):
                 _type, _address = point_name
-                for point in self.points:
-                    if point.properties.type == _type and str(
-                        point.properties.address
-                    ) == str(_address):
-                        return point
+                return self._points_by_object.get(_object_key(_type, _address))
             else:
                 try:
                     return self._findPoint(point_name, force_read=False)
@@ -607,7 +864,7 @@ class DeviceConnected(Device):
         Allows the syntax:
             if "point_name" in device:
         """
-        return value in self.points_name
+        return value in self._points_by_name
 
     @property
     def pollable_points_name(self):
@@ -644,62 +901,72 @@ class DeviceConnected(Device):
         value = args[-1]
         return (pointName, value)
 
+    def _views(self) -> Dict[str, MappingProxyType]:
+        """
+        Point name -> units (or states) for each kind of point, built once per
+        point list.
+        """
+        if self._point_views is None:
+
+            def units(points):
+                return {
+                    each.properties.name: each.properties.units_state for each in points
+                }
+
+            analog = units(self.points_of_class(NumericPoint))
+            self._point_views = {
+                "analog": MappingProxyType(analog),
+                "temperatures": MappingProxyType(
+                    {k: v for k, v in analog.items() if "deg" in str(v)}
+                ),
+                "percent": MappingProxyType(
+                    {k: v for k, v in analog.items() if "percent" in str(v)}
+                ),
+                "multi": MappingProxyType(units(self.points_of_class(EnumPoint))),
+                "binary": MappingProxyType(units(self.points_of_class(BooleanPoint))),
+            }
+        return self._point_views
+
     @property
     def analog_units(self):
         """
         Shortcut to retrieve all analog points units [Used by Bokeh trending feature]
         """
-        au = []
-        us = []
-        for each in self.points:
-            if isinstance(each, NumericPoint):
-                au.append(each.properties.name)
-                us.append(each.properties.units_state)
-        return dict(zip(au, us))
+        return self._views()["analog"]
 
     @property
     def temperatures(self):
-        for each in self.analog_units.items():
-            if "deg" in each[1]:
-                yield each
+        """
+        (name, units) of the analog points in degrees
+        """
+        return self._views()["temperatures"].items()
 
     @property
     def percent(self):
-        for each in self.analog_units.items():
-            if "percent" in each[1]:
-                yield each
+        """
+        (name, units) of the analog points in percent
+        """
+        return self._views()["percent"].items()
 
     @property
     def multi_states(self):
-        ms = []
-        us = []
-        for each in self.points:
-            if isinstance(each, EnumPoint):
-                ms.append(each.properties.name)
-                us.append(each.properties.units_state)
-        return dict(zip(ms, us))
+        return self._views()["multi"]
 
     @property
     def binary_states(self):
-        bs = []
-        us = []
-
-        for each in self.points:
-            if isinstance(each, BooleanPoint):
-                bs.append(each.properties.name)
-                us.append(each.properties.units_state)
-        return dict(zip(bs, us))
+        return self._views()["binary"]
 
     def _findPoint(self, name, force_read=False):
         """
         Used by getter and setter functions
+
+        A read can't be awaited here : the point is returned with its last
+        value whatever force_read is (use await point.value to read it).
         """
-        for point in self.points:
-            if point.properties.name == name:
-                if force_read:
-                    point.value
-                return point
-        raise ValueError(f"{name} doesn't exist in controller")
+        try:
+            return self._points_by_name[name]
+        except (KeyError, TypeError):
+            raise ValueError(f"{name} doesn't exist in controller")
 
     def _trendlogs(self):
         for k, v in self._list_of_trendlogs.items():
@@ -716,17 +983,25 @@ class DeviceConnected(Device):
         return list(self._trendlogs())
 
     def _findTrend(self, name):
-        for trend in self._trendlogs():
-            if trend.properties.object_name == name:
-                return trend
-        raise ValueError(f"{name} doesn't exist in controller")
+        if self._trends_by_name[0] is not self._list_of_trendlogs:
+            self._trends_by_name = (
+                self._list_of_trendlogs,
+                {
+                    trend.properties.object_name: trend
+                    for trend in reversed(list(self._trendlogs()))
+                },
+            )
+        try:
+            return self._trends_by_name[1][name]
+        except (KeyError, TypeError):
+            raise ValueError(f"{name} doesn't exist in controller")
 
     async def read_property(self, prop):
         # if instance == -1:
         #    pass
         if isinstance(prop, tuple):
             _obj, _instance, _prop = prop
-        elif isinstance(prop, str):
+        elif isinstance(prop, (str, PropertyIdentifier)):
             _obj = "device"
             _instance = self.properties.device_id
             _prop = prop
@@ -735,9 +1010,11 @@ class DeviceConnected(Device):
                 "Please provide property using tuple with object, instance and property"
             )
         try:
-            request = f"{self.properties.address} {_obj} {_instance} {_prop}"
-            val = await self.properties.network.read(
-                request, vendor_id=self.properties.vendor_id
+            val = await self.properties.network.read_value(
+                self.bacnet_address,
+                (_obj, int(_instance)),
+                _prop,
+                vendor_id=self.properties.vendor_id,
             )
         except KeyError as error:
             raise Exception(f"Unknown property : {error}")
@@ -747,8 +1024,6 @@ class DeviceConnected(Device):
         if prop == "description":
             self.update_description(value)
         else:
-            if priority is not None:
-                priority = f"- {priority}"
             if isinstance(prop, tuple):
                 _obj, _instance, _prop = prop
             else:
@@ -756,11 +1031,13 @@ class DeviceConnected(Device):
                     "Please provide property using tuple with object, instance and property"
                 )
             try:
-                request = "{} {} {} {} {} {}".format(
-                    self.properties.address, _obj, _instance, _prop, value, priority
-                )
-                val = await self.properties.network.write(
-                    request, vendor_id=self.properties.vendor_id
+                val = await self.properties.network.write_value(
+                    self.bacnet_address,
+                    (_obj, int(_instance)),
+                    _prop,
+                    value,
+                    priority=None if priority is None else int(priority),
+                    vendor_id=self.properties.vendor_id,
                 )
             except KeyError as error:
                 raise Exception(f"Unknown property : {error}")
@@ -772,10 +1049,9 @@ class DeviceConnected(Device):
 
         """
         try:
-            res = await self.properties.network.readMultiple(
-                "{} device {} all".format(
-                    self.properties.address, str(self.properties.device_id)
-                ),
+            res = await self.properties.network.read_multiple_values(
+                self.bacnet_address,
+                [(self.device_identifier, [PropertyIdentifier.all])],
                 vendor_id=self.properties.vendor_id,
                 show_property_name=True,
             )
@@ -880,16 +1156,16 @@ class DeviceDisconnected(Device):
 
         else:
             try:
-                await self.properties.network.read(
-                    "{} device {} objectName".format(
-                        self.properties.address, self.properties.device_id
-                    )
+                await self.properties.network.read_value(
+                    self.bacnet_address,
+                    self.device_identifier,
+                    PropertyIdentifier.objectName,
                 )
 
-                segmentation = await self.properties.network.read(
-                    "{} device {} segmentationSupported".format(
-                        self.properties.address, self.properties.device_id
-                    )
+                segmentation = await self.properties.network.read_value(
+                    self.bacnet_address,
+                    self.device_identifier,
+                    PropertyIdentifier.segmentationSupported,
                 )
 
                 self.segmentation_supported = (
@@ -1022,16 +1298,16 @@ class DeviceFromDB(DeviceConnected):
             self.log("Network provided... trying to connect", level="debug")
             self.properties.network = network
             try:
-                name = await self.properties.network.read(
-                    "{} device {} objectName".format(
-                        self.properties.address, self.properties.device_id
-                    )
+                name = await self.properties.network.read_value(
+                    self.bacnet_address,
+                    self.device_identifier,
+                    PropertyIdentifier.objectName,
                 )
 
-                segmentation = await self.properties.network.read(
-                    "{} device {} segmentationSupported".format(
-                        self.properties.address, self.properties.device_id
-                    )
+                segmentation = await self.properties.network.read_value(
+                    self.bacnet_address,
+                    self.device_identifier,
+                    PropertyIdentifier.segmentationSupported,
                 )
                 segmentation_supported = False if segmentation.numerator == 3 else True
 
@@ -1072,13 +1348,16 @@ class DeviceFromDB(DeviceConnected):
 
         # network = self.properties.network
         pss = self.properties.pss
+        snapshot = self.properties.snapshot
 
-        self.points = []
+        points = []
+        last_readings = await self.last_readings_from_sql(self.properties.db_name)
         for point in await self.points_from_sql(self.properties.db_name):
             try:
-                self.points.append(OfflinePoint(self, point))
+                points.append(OfflinePoint(self, point, last_readings.get(point)))
             except RemovedPointException:
                 continue
+        self.points = points
 
         self.properties = DeviceProperties()
         self.properties.db_name = dbname
@@ -1096,6 +1375,8 @@ class DeviceFromDB(DeviceConnected):
         self.properties.save_resampling = self._props["save_resampling"]
         self.properties.clear_history_on_save = self._props["clear_history_on_save"]
         self.properties.default_history_size = self._props["history_size"]
+        self.properties.rpm_batch_size = self._props.get("rpm_batch_size")
+        self.properties.snapshot = snapshot
         self.log(f"{self.properties.name} restored from db", level="info")
         self.log(
             'You can reconnect to network using : "device.connect(network=bacnet)"',
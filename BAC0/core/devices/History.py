@@ -0,0 +1,214 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+History.py - the readings of a point, in a fixed capacity circular buffer
+
+Histories used to be 2 lists (tz-aware datetimes and values) sliced again on
+every reading once history_size was reached. Here, timestamps are float64
+epochs and numeric values are float64, both in arrays. Strings (binary and
+multi-state points) are kept in a list.
+
+The storage grows geometrically (nothing is allocated for a point never
+read). Once capacity readings are kept, each reading is written twice (at i
+and at i + capacity) so the readings, in order, are always a contiguous slice
+of the storage : appending is O(1) and exporting to NumPy / pandas doesn't
+copy anything.
+"""
+# --- standard Python modules ---
+import math
+import time
+import typing as t
+from array import array
+from datetime import datetime
+
+# --- this application's modules ---
+from ..utils.lookfordependency import check_dependencies, pandas_if_available
+
+_PANDAS, pd, sql, Timestamp = pandas_if_available()
+_NUMPY = check_dependencies(["numpy"])
+if _NUMPY:
+    import numpy as np
+
+# ------------------------------------------------------------------------------
+
+
+class PointHistory:
+    """
+    Timestamps and values of the readings of a point.
+
+    :param capacity: (int) number of readings kept (None : keep everything)
+    :param numeric: (bool) store values as float64 (they fall back to objects
+        if something else than a number is received)
+
+    *Example*::
+
+        history = PointHistory(capacity=3)
+        for value in range(5):
+            history.append(value)
+        len(history)                # 3
+        history.values              # array([2., 3., 4.]) (a view, no copy)
+    """
+
+    def __init__(self, capacity: t.Optional[int] = None, numeric: bool = False):
+        self.numeric = numeric
+        self.capacity: t.Optional[int] = None
+        self._head = self._count = 0
+        self._timestamps = array("d")
+        self._values = self._new_values([])
+        self.resize(capacity)
+
+    def _new_values(self, values: t.Iterable[t.Any]) -> t.Any:
+        return array("d", values) if self.numeric else list(values)
+
+    def _allocate(self, size: int) -> None:
+        """
+        New storage for size readings, holding the current ones. A new array is
+        created instead of growing the old one : views handed out before keep
+        the buffer they point to.
+        """
+        timestamps, values = self.timestamps, self.values
+        count = len(timestamps)
+        self._timestamps = array("d", bytes(8 * size))
+        self._timestamps[:count] = array("d", timestamps)
+        filler = self._new_values([0.0 if self.numeric else None])
+        self._values = self._new_values(values) + filler * (size - count)
+        self._head = 0
+
+    def _mirror(self, capacity: int) -> None:
+        """
+        Storage of a full history : 2 * capacity, the readings written twice.
+        """
+        self._allocate(2 * capacity)
+        self._timestamps[capacity:] = self._timestamps[:capacity]
+        self._values[capacity:] = self._values[:capacity]
+
+    def resize(self, capacity: t.Optional[int] = None) -> None:
+        """
+        Change the number of readings kept, keeping the most recent ones.
+        """
+        if capacity is not None:
+            capacity = max(1, int(capacity))
+            if self._count > capacity:
+                self._head += self._count - capacity
+                self._count = capacity
+        self.capacity = capacity
+        if capacity is not None and self._count == capacity:
+            self._mirror(capacity)
+        else:
+            self._allocate(self._count)
+
+    def _to_objects(self) -> None:
+        """
+        Something else than a number was received, store values as objects.
+        """
+        self.numeric = False
+        self._values = list(self._values)
+
+    def append(self, value: t.Any, timestamp: t.Optional[float] = None) -> None:
+        """
+        Add a reading (timestamp is an epoch, now by default).
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self.numeric:
+            if value is None:
+                value = math.nan
+            elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                self._to_objects()
+        capacity = self.capacity
+        if capacity is None or self._count < capacity:
+            if self._count == len(self._timestamps):
+                size = max(16, 2 * self._count)
+                self._allocate(size if capacity is None else min(size, capacity))
+            position = self._count
+            self._count += 1
+            self._timestamps[position] = timestamp
+            self._values[position] = value
+            if self._count == capacity:
+                self._mirror(capacity)
+            return
+        position = self._head
+        self._head = (self._head + 1) % capacity
+        self._timestamps[position] = self._timestamps[position + capacity] = timestamp
+        self._values[position] = self._values[position + capacity] = value
+
+    def clear(self) -> None:
+        self._head = self._count = 0
+        self._allocate(0)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def last(self) -> t.Tuple[datetime, t.Any]:
+        """
+        Timestamp (tz-aware datetime) and value of the last reading.
+
+        :raises IndexError: if the history is empty
+        """
+        if not self._count:
+            raise IndexError("History is empty")
+        position = self._head + self._count - 1
+        return (
+            datetime.fromtimestamp(self._timestamps[position]).astimezone(),
+            self._values[position],
+        )
+
+    @property
+    def timestamps(self) -> t.Any:
+        """
+        Epoch timestamps, oldest first (a NumPy view when NumPy is available).
+        The view follows the buffer : copy it to keep it.
+        """
+        start, end = self._head, self._head + self._count
+        if _NUMPY:
+            return np.frombuffer(self._timestamps, dtype=np.float64)[start:end]
+        return memoryview(self._timestamps)[start:end]
+
+    @property
+    def values(self) -> t.Any:
+        """
+        Values, oldest first (a NumPy view of numeric values when NumPy is
+        available, a list otherwise). The view follows the buffer : copy it to
+        keep it.
+        """
+        start, end = self._head, self._head + self._count
+        if not self.numeric:
+            return self._values[start:end]
+        if _NUMPY:
+            return np.frombuffer(self._values, dtype=np.float64)[start:end]
+        return memoryview(self._values)[start:end]
+
+    def datetimes(self) -> t.List[datetime]:
+        """
+        Timestamps as tz-aware datetimes (local time).
+        """
+        return [
+            datetime.fromtimestamp(timestamp).astimezone()
+            for timestamp in self.timestamps
+        ]
+
+    def to_dict(self) -> t.Dict[datetime, t.Any]:
+        values = self.values
+        if not isinstance(values, list):
+            values = values.tolist()
+        return dict(zip(self.datetimes(), values))
+
+    def to_series(self) -> t.Any:
+        """
+        A pandas Series indexed by tz-aware timestamps (local time).
+        """
+        index = pd.to_datetime(self.timestamps, unit="s", utc=True).tz_convert(
+            datetime.now().astimezone().tzinfo
+        )
+        # copy : the views change with the next readings
+        return pd.Series(index=index, data=self.values, copy=True)
+
+    def __repr__(self) -> str:
+        return f"PointHistory({self._count} readings | capacity {self.capacity} | {'float64' if self.numeric else 'object'})"
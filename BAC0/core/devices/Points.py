@@ -9,6 +9,7 @@ Points.py - Definition of points so operations on Read results are more convenie
 """
 
 import asyncio
+import time
 import typing as t
 from collections import namedtuple
 
@@ -33,6 +34,7 @@ from ..io.IOExceptions import (
 )
 from ..utils.lookfordependency import pandas_if_available
 from ..utils.notes import note_and_log
+from .History import PointHistory
 
 _PANDAS, pd, sql, Timestamp = pandas_if_available()
 # ------------------------------------------------------------------------------
@@ -56,6 +58,8 @@ class PointProperties(object):
         self.history_size = None
         self.bacnet_properties = {}
         self.status_flags = None
+        # False for points created from their name only (fast connect)
+        self.details_loaded = True
 
     def __repr__(self):
         return f"{self.asdict}"
@@ -79,6 +83,10 @@ class Point:
 
     _cache_delta = timedelta(seconds=5)
     _last_cov_identifier = 0
+    # values kept in a float64 array (see History.py)
+    _numeric_history = False
+    # last valid reading (epoch, value), kept by _trend
+    _last_reading: t.Tuple[t.Optional[float], t.Any] = (None, None)
     _running_cov_tasks = {}
 
     def __init__(
@@ -93,7 +101,7 @@ class Point:
         history_size=None,
         tags=[],
     ):
-        self._history = namedtuple("_history", ["timestamp", "value"])
+        self._history = PointHistory(history_size, numeric=self._numeric_history)
         self.properties = PointProperties()
 
         self._polling_task = namedtuple("_polling_task", ["task", "running"])
@@ -104,11 +112,6 @@ class Point:
         self._match_task.task = None
         self._match_task.running = False
 
-        self._history.timestamp = []
-        self._history.value = []
-        # self._history.value = [presentValue]
-        # self._history.timestamp.append(datetime.now().astimezone())
-
         self.properties.history_size = history_size
 
         self.properties.device = device
@@ -129,6 +132,29 @@ class Point:
             "_previous_read": (None, None)
         }
 
+    @property
+    def object_identifier(self) -> ObjectIdentifier:
+        """
+        BACnet object identifier of the point, built once and reused for every
+        request.
+        """
+        try:
+            return self._object_identifier
+        except AttributeError:
+            self._object_identifier = ObjectIdentifier(
+                (self.properties.type, int(self.properties.address))
+            )
+            return self._object_identifier
+
+    async def _read_value(self, prop, arr_index=None):
+        return await self.properties.device.properties.network.read_value(
+            self.properties.device.bacnet_address,
+            self.object_identifier,
+            prop,
+            arr_index=arr_index,
+            vendor_id=self.properties.device.properties.vendor_id,
+        )
+
     @property
     async def value(self):
         """
@@ -141,15 +167,14 @@ class Point:
         ):
             return self._cache["_previous_read"][1]
 
+        if not self.properties.details_loaded:
+            await self.properties.device.load_point_details([self])
+        batcher = getattr(self.properties.device, "_read_batcher", None)
         try:
-            res = await self.properties.device.properties.network.read(
-                "{} {} {} presentValue".format(
-                    self.properties.device.properties.address,
-                    self.properties.type,
-                    str(self.properties.address),
-                ),
-                vendor_id=self.properties.device.properties.vendor_id,
-            )
+            if batcher is not None:
+                res = await batcher.read(self)
+            else:
+                res = await self._read_value(PropertyIdentifier.presentValue)
             # self._trend(res)
         except Exception:
             raise
@@ -162,14 +187,7 @@ class Point:
         """
         if self.properties.priority_array is not False:
             try:
-                res = await self.properties.device.properties.network.read(
-                    "{} {} {} priorityArray".format(
-                        self.properties.device.properties.address,
-                        self.properties.type,
-                        str(self.properties.address),
-                    ),
-                    vendor_id=self.properties.device.properties.vendor_id,
-                )
+                res = await self._read_value(PropertyIdentifier.priorityArray)
                 self.properties.priority_array = []
                 for i, each in enumerate(res):
                     _t = each.__dict__["_choice"]
@@ -189,15 +207,10 @@ class Point:
 
     async def read_property(self, prop):
         try:
-            return await self.properties.device.properties.network.read(
-                "{} {} {} {}".format(
-                    self.properties.device.properties.address,
-                    self.properties.type,
-                    str(self.properties.address),
-                    prop,
-                ),
-                vendor_id=self.properties.device.properties.vendor_id,
-            )
+            if isinstance(prop, tuple):
+                prop, arr_index = prop
+                return await self._read_value(prop, arr_index=int(arr_index))
+            return await self._read_value(prop)
         except Exception as e:
             raise Exception(f"Problem reading : {self.properties.name} | {e}")
 
@@ -207,12 +220,9 @@ class Point:
         To retrieve something general, forcing vendor id 0
         """
         try:
-            res = await self.properties.device.properties.network.readMultiple(
-                "{} {} {} all".format(
-                    self.properties.device.properties.address,
-                    self.properties.type,
-                    str(self.properties.address),
-                ),
+            res = await self.properties.device.properties.network.read_multiple_values(
+                self.properties.device.bacnet_address,
+                [(self.object_identifier, [PropertyIdentifier.all])],
                 vendor_id=self.properties.device.properties.vendor_id,
                 show_property_name=True,
             )
@@ -259,29 +269,18 @@ class Point:
             return val
 
     def _trend(self, res: t.Union[float, int, str]) -> None:
-        now = datetime.now().astimezone()
-        self._history.timestamp.append(now)
-        self._history.value.append(res)
-        if self.properties.device.properties.network.database:
-            self.properties.device.properties.network.database.prepare_point([self])
-
-        if self.properties.history_size is None:
-            return
-        else:
-            if self.properties.history_size < 1:
-                self.properties.history_size = 1
-            if len(self._history.timestamp) >= self.properties.history_size:
-                try:
-                    self._history.timestamp = self._history.timestamp[
-                        -self.properties.history_size :  # noqa E203
-                    ]
-                    self._history.value = self._history.value[
-                        -self.properties.history_size :  # noqa E203
-                    ]
-                    assert len(self._history.timestamp) == len(self._history.value)
-
-                except Exception:
-                    self._log.exception("Can't append to history")
+        history_size = self.properties.history_size
+        if history_size is not None and history_size < 1:
+            self.properties.history_size = history_size = 1
+        if history_size != self._history.capacity:
+            self._history.resize(history_size)
+        now = time.time()
+        self._history.append(res, timestamp=now)
+        if res is not None and res == res:  # NaN != NaN
+            self._last_reading = (now, res)
+            database = self.properties.device.properties.network.database
+            if database:
+                database.add_sample(self, now, res)
 
     @property
     def units(self):
@@ -295,24 +294,17 @@ class Point:
         """
         returns: last value read
         """
-        if _PANDAS:
-            last_val = self.history.dropna()
-            last_val_clean = None if len(last_val) == 0 else last_val.iloc[-1]
-            return last_val_clean
-        else:
-            return self._history.value[-1]
+        return self._last_reading[1]
 
     @property
     def lastTimestamp(self):
         """
         returns: last timestamp read
         """
-        if _PANDAS:
-            last_val = self.history.dropna()
-            last_val_clean = None if len(last_val) == 0 else last_val.index[-1]
-            return last_val_clean
-        else:
-            return self._history.timestamp[-1]
+        timestamp = self._last_reading[0]
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp).astimezone()
 
     @property
     def history(self) -> t.Dict[datetime, t.Union[int, float, str]]:
@@ -320,10 +312,8 @@ class Point:
         returns : (pd.Series) containing timestamp and value of all readings
         """
         if not _PANDAS:
-            return dict(zip(self._history.timestamp, self._history.value))
-        idx = self._history.timestamp.copy()
-        his_table = pd.Series(index=idx, data=self._history.value[: len(idx)])
-        del idx
+            return self._history.to_dict()
+        his_table = self._history.to_series()
         his_table.name = ("{}/{}").format(
             self.properties.device.properties.name, self.properties.name
         )
@@ -340,8 +330,8 @@ class Point:
         return his_table
 
     def clear_history(self):
-        self._history.timestamp = []
-        self._history.value = []
+        self._history.clear()
+        self._last_reading = (None, None)
 
     def chart(self, remove=False):
         """
@@ -389,20 +379,24 @@ class Point:
         if prop == "description":
             await self.update_description(value)
         else:
-            if priority != "":
+            if priority != "" and priority is not None:
                 if (
                     isinstance(float(priority), float)
                     and float(priority) >= 1
                     and float(priority) <= 16
                 ):
-                    priority = f"{priority}"
+                    priority = int(priority)
                 else:
                     raise ValueError("Priority must be a number between 1 and 16")
-            req = f"{self.properties.device.properties.address} {self.properties.type} {self.properties.address} {prop} {value} - {priority}"
-            # self.log(req, level='info')
+            else:
+                priority = None
             try:
-                await self.properties.device.properties.network._write(
-                    req,
+                await self.properties.device.properties.network.write_value(
+                    self.properties.device.bacnet_address,
+                    self.object_identifier,
+                    prop,
+                    value,
+                    priority=priority,
                     vendor_id=self.properties.device.properties.vendor_id,
                 )
             except NoResponseFromController:
@@ -684,20 +678,23 @@ class Point:
         add information, etc.
         They will be included if InfluxDB is used.
         """
-        if lst is None:
-            self.tag.append((tag_id, tag_value))
-        else:
-            for each in lst:
-                tag_id, tag_value = each
-                self.tag.append((tag_id, tag_value))
+        new_tags = [(tag_id, tag_value)] if lst is None else list(lst)
+        # a new list : the default one is shared by points created without tags
+        self.tags = list(self.tags) + new_tags
+        try:
+            self.properties.device._index_tags(self, new_tags)
+        except AttributeError:
+            pass
 
     async def _update_value(self):
         await asyncio.wait_for(self.value, timeout=1.0)
 
     def _update_value_if_required(self):
+        last_timestamp, last_value = self.lastTimestamp, self.lastValue
+        if last_timestamp is None:
+            raise IndexError(f"{self.properties.name} has not been read yet")
         value_too_old = (
-            self._history.timestamp[-1]
-            > datetime.now().astimezone() - Point._cache_delta
+            last_timestamp > datetime.now().astimezone() - Point._cache_delta
         )
         if value_too_old:
             try:
@@ -706,11 +703,9 @@ class Point:
             except Exception as e:
                 self.log(f"Error updating value : {e}", level="error")
                 return self.lastValue
-        if datetime.now().astimezone() - self._history.timestamp[-1] > timedelta(
-            seconds=60
-        ):
+        if datetime.now().astimezone() - last_timestamp > timedelta(seconds=60):
             self.log(
-                f"Last known value {self._history.value[-1]} with timestamp of {self._history.timestamp[-1]}, older than 10sec {datetime.now().astimezone()}. Consider using dev['point'].lastValue if you trust polling of device of manage a up to date read in asynchronous side of your app for better precision",
+                f"Last known value {last_value} with timestamp of {last_timestamp}, older than 10sec {datetime.now().astimezone()}. Consider using dev['point'].lastValue if you trust polling of device of manage a up to date read in asynchronous side of your app for better precision",
                 level="warning",
             )
         return self.lastValue
@@ -724,6 +719,8 @@ class NumericPoint(Point):
     Representation of a Numeric value
     """
 
+    _numeric_history = True
+
     def __init__(
         self,
         device=None,
@@ -1273,7 +1270,7 @@ class OfflinePoint(Point):
     (we can't read on bacnet...)
     """
 
-    def __init__(self, device, name):
+    def __init__(self, device, name, last_reading=None):
         self.properties = PointProperties()
         self.properties.device = device
         dev_name = self.properties.device.properties.db_name
@@ -1302,6 +1299,10 @@ class OfflinePoint(Point):
         else:
             raise TypeError("Unknown point type")
 
+        if last_reading is not None:
+            # last valid (timestamp, value) saved in the database
+            self._last_reading = last_reading
+
     def new_state(self, newstate):
         self.__class__ = newstate
 
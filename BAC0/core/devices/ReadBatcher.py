@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+ReadBatcher.py - group point reads of a device in ReadPropertyMultiple requests
+
+Code written one point at a time, like
+
+    await asyncio.gather(*(point.value for point in device.points))
+
+sends one ReadProperty per point. When read batching is enabled on a device,
+the reads arriving within a small window (5 ms by default) are collected and
+sent as ReadPropertyMultiple requests. Each caller gets its own value.
+Points known to break ReadPropertyMultiple requests are read alone.
+"""
+# --- standard Python modules ---
+import asyncio
+import typing as t
+
+# --- 3rd party modules ---
+from bacpypes3.basetypes import ErrorType, PropertyIdentifier
+
+# --- this application's modules ---
+from ..utils.notes import note_and_log
+from .BatchSizer import DEFAULT_POINTS_PER_REQUEST
+from .mixins.read_mixin import ReadPropertyMultiple
+from .ReadPlan import ReadPlan
+
+# ------------------------------------------------------------------------------
+
+READ_BATCHING_WINDOW = 0.005  # seconds
+
+
+@note_and_log
+class ReadBatcher:
+    """
+    Collects the presentValue reads of the points of a device.
+
+    :param device: (BAC0.core.devices.Device.Device)
+    :param window: (float) seconds to wait for other reads before sending
+
+    *Example*::
+
+        device.batch_point_reads()          # or device.batch_point_reads(0.01)
+        await asyncio.gather(*(point.value for point in device.points))
+    """
+
+    def __init__(self, device, window: float = READ_BATCHING_WINDOW) -> None:
+        self.device = device
+        self.window = window
+        # id(point) -> (point, futures) ; points are not hashable
+        self._pending: t.Dict[int, t.Tuple[t.Any, t.List[asyncio.Future]]] = {}
+        self._flush_handle: t.Optional[asyncio.TimerHandle] = None
+        # tasks are kept until done, the loop only keeps weak references
+        self._tasks: t.Set[asyncio.Task] = set()
+
+    async def read(self, point) -> t.Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(id(point), (point, []))[1].append(future)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        self._create_task(self._send(pending))
+
+    def _create_task(self, coro: t.Coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _send(
+        self, pending: t.Dict[int, t.Tuple[t.Any, t.List[asyncio.Future]]]
+    ) -> None:
+        """
+        Send the reads, every caller gets an answer (a value or an error)
+        whatever happens.
+        """
+        try:
+            await self._send_batches(pending)
+        except asyncio.CancelledError:
+            for _, futures in pending.values():
+                for future in futures:
+                    future.cancel()
+            raise
+        except Exception as error:
+            self.log(f"Error while sending batched reads : {error}", level="error")
+            for _, futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+
+    async def _send_batches(
+        self, pending: t.Dict[int, t.Tuple[t.Any, t.List[asyncio.Future]]]
+    ) -> None:
+        device = self.device
+        if not isinstance(device, ReadPropertyMultiple):
+            # device doesn't support ReadPropertyMultiple (or is disconnected)
+            for point, futures in pending.values():
+                self._create_task(self._read_alone(point, futures))
+            return
+        device._expire_rpm_exclusions()
+        points = []
+        for point, futures in pending.values():
+            if point.properties.name in device._rpm_excluded:
+                self._create_task(self._read_alone(point, futures))
+            else:
+                points.append(point)
+        if not points:
+            return
+        plan = ReadPlan(
+            device.bacnet_address,
+            points,
+            property_identifier="presentValue",
+            vendor_id=device.properties.vendor_id,
+        )
+        sizer = device._rpm_batch_sizer
+        size = sizer.size if sizer is not None else DEFAULT_POINTS_PER_REQUEST
+        self.log(f"Sending {len(plan)} batched reads", level="debug")
+        for points, parameter_list in plan.batches(size):
+            try:
+                response = await device.properties.network._read_property_multiple(
+                    plan.address, parameter_list, vendor_info=plan.vendor_info
+                )
+            except Exception:
+                response = None
+            if isinstance(response, list) and len(response) == len(points):
+                values = [value for (_, _, _, value) in response]
+            else:
+                values = [None] * len(points)
+            for point, value in zip(points, values):
+                futures = pending[id(point)][1]
+                if value is None or isinstance(value, ErrorType):
+                    # read it alone so the caller gets the real answer (or error)
+                    self._create_task(self._read_alone(point, futures))
+                    continue
+                for future in futures:
+                    if not future.done():
+                        future.set_result(value)
+
+    async def _read_alone(self, point, futures: t.List[asyncio.Future]) -> None:
+        try:
+            value = await point._read_value(PropertyIdentifier.presentValue)
+        except Exception as error:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+ReadPlan.py - compiled ReadPropertyMultiple requests for a set of points
+
+Polling a device used to rebuild a text request for every point, then split and
+parse it again in ReadProperty.readMultiple on every cycle. A ReadPlan does this
+work once : object identifiers, property identifier and vendor information are
+resolved when the plan is built and the parameter lists sent to bacpypes3 are
+kept, already batched, for as long as the point list of the device doesn't change.
+"""
+# --- standard Python modules ---
+import typing as t
+
+# --- 3rd party modules ---
+from bacpypes3.basetypes import PropertyIdentifier
+from bacpypes3.pdu import Address
+from bacpypes3.primitivedata import ObjectIdentifier
+from bacpypes3.vendor import VendorInfo, get_vendor_info
+
+# ------------------------------------------------------------------------------
+
+
+class ReadPlan:
+    """
+    Pre-built ReadPropertyMultiple parameters used to read the same property
+    of a list of points.
+
+    :param address: (str or Address) address of the device
+    :param points: (list) BAC0 points to read (the order is kept)
+    :param property_identifier: (str) property to read for each point
+    :param vendor_id: (int) vendor identifier of the device
+    :param excluded: (list) BAC0 points that can't be part of a
+        ReadPropertyMultiple request and must be read one by one
+
+    *Example*::
+
+        plan = ReadPlan(device.properties.address, device.points)
+        for points, parameter_list in plan.batches(25):
+            ...
+    """
+
+    def __init__(
+        self,
+        address: t.Union[str, Address],
+        points: t.Iterable[t.Any],
+        property_identifier: str = "presentValue",
+        vendor_id: int = 0,
+        excluded: t.Iterable[t.Any] = (),
+    ) -> None:
+        self.address: Address = (
+            address if isinstance(address, Address) else Address(address)
+        )
+        self.vendor_info: VendorInfo = get_vendor_info(vendor_id)
+        self.points: t.List[t.Any] = list(points)
+        self.excluded: t.List[t.Any] = list(excluded)
+        self.property_identifier: PropertyIdentifier = (
+            self.vendor_info.property_identifier(property_identifier)
+        )
+        self.object_identifiers: t.List[ObjectIdentifier] = [
+            self.vendor_info.object_identifier(
+                (point.properties.type, int(point.properties.address))
+            )
+            for point in self.points
+        ]
+        self._batches: t.Dict[int, t.List[t.Tuple[t.List[t.Any], t.List]]] = {}
+
+    def batches(
+        self, points_per_request: int
+    ) -> t.List[t.Tuple[t.List[t.Any], t.List]]:
+        """
+        Split the plan in requests of at most points_per_request points.
+        Batches are built once per size and reused.
+
+        :returns: list of (points, parameter_list) where parameter_list is
+            ready to be sent to bacpypes3 read_property_multiple
+        """
+        points_per_request = max(1, int(points_per_request))
+        try:
+            return self._batches[points_per_request]
+        except KeyError:
+            pass
+        batches = []
+        for i in range(0, len(self.points), points_per_request):
+            parameter_list: t.List = []
+            for object_identifier in self.object_identifiers[
+                i : i + points_per_request  # noqa E203
+            ]:
+                parameter_list.append(object_identifier)
+                parameter_list.append([self.property_identifier])
+            batches.append(
+                (self.points[i : i + points_per_request], parameter_list)  # noqa E203
+            )
+        self._batches[points_per_request] = batches
+        return batches
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __repr__(self) -> str:
+        return f"ReadPlan({self.address} | {len(self.points)} points | {self.property_identifier})"
@@ -0,0 +1,286 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+Snapshot.py - what was learned about a device, to reconnect without discovery
+
+Connecting to a device reads its object list and the name, units and
+description of every point. When the device is defined with snapshot=True,
+the result is saved to a small JSON file (one per device id). On the next
+connection, only the databaseRevision of the device and the length of its
+objectList are read : when both are unchanged, the points are created from the
+snapshot. Any change (or a device without databaseRevision) means a normal
+discovery, and a new snapshot.
+
+The snapshot also keeps the learned ReadPropertyMultiple batch size and the
+segmentation support of the device.
+"""
+# --- standard Python modules ---
+import json
+import os
+import typing as t
+
+# --- 3rd party modules ---
+from bacpypes3.basetypes import EngineeringUnits, PropertyIdentifier, ServicesSupported
+
+# --- this application's modules ---
+from .Points import BooleanPoint, DateTimePoint, EnumPoint, NumericPoint, StringPoint
+
+# ------------------------------------------------------------------------------
+
+SNAPSHOT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".BAC0", "snapshots")
+# Change it when the content of the file changes
+SNAPSHOT_VERSION = 1
+
+POINT_CLASSES = {
+    cls.__name__: cls
+    for cls in (NumericPoint, BooleanPoint, EnumPoint, StringPoint, DateTimePoint)
+}
+POINT_KEYS = {"class", "type", "address", "name", "description", "units_state"}
+
+
+def _units_to_json(units_state: t.Any) -> t.Any:
+    if units_state is None:
+        return None
+    if isinstance(units_state, (list, tuple)):
+        return [str(each) for each in units_state]
+    return str(units_state)
+
+
+def _units_from_json(point_class: str, units_state: t.Any) -> t.Any:
+    if point_class == "BooleanPoint" and isinstance(units_state, list):
+        return tuple(units_state)
+    if point_class == "NumericPoint" and isinstance(units_state, str):
+        try:
+            return EngineeringUnits(units_state)
+        except Exception:
+            return units_state
+    return units_state
+
+
+def _valid_point(point: t.Any) -> bool:
+    return (
+        isinstance(point, dict)
+        and POINT_KEYS <= point.keys()
+        and point["class"] in POINT_CLASSES
+        and all(isinstance(point[key], str) for key in ("type", "address", "name"))
+        and isinstance(point.get("details_loaded", True), bool)
+    )
+
+
+async def read_revision(device) -> t.Optional[t.Tuple[int, int]]:
+    """
+    databaseRevision and length of the objectList of a device (None if the
+    device can't tell).
+    """
+    network = device.properties.network
+    try:
+        database_revision = await network.read_value(
+            device.bacnet_address,
+            device.device_identifier,
+            PropertyIdentifier.databaseRevision,
+        )
+        number_of_objects = await network.read_value(
+            device.bacnet_address,
+            device.device_identifier,
+            PropertyIdentifier.objectList,
+            arr_index=0,
+        )
+        return (int(database_revision), int(number_of_objects))
+    except Exception as error:
+        device.log(f"Device revision not available ({error})", level="debug")
+        return None
+
+
+class DeviceSnapshot:
+    """
+    Object list and points of a device, as of a databaseRevision.
+
+    *Example*::
+
+        snapshot = DeviceSnapshot.load(device_id=1234)
+        if snapshot and snapshot.matches(await read_revision(device)):
+            points = snapshot.create_points(device)
+    """
+
+    def __init__(
+        self,
+        device_id: int,
+        database_revision: int,
+        objects_list: t.List[t.Any],
+        points: t.List[t.Dict[str, t.Any]],
+        name: str = "",
+        vendor_id: int = 0,
+        pss: t.Any = None,
+        rpm_batch_size: t.Optional[int] = None,
+        segmentation_supported: bool = True,
+    ) -> None:
+        self.device_id = device_id
+        self.database_revision = database_revision
+        self.objects_list = objects_list
+        self.points = points
+        self.name = name
+        self.vendor_id = vendor_id
+        self.pss = pss
+        self.rpm_batch_size = rpm_batch_size
+        self.segmentation_supported = segmentation_supported
+
+    @classmethod
+    def from_device(cls, device, database_revision: int) -> "DeviceSnapshot":
+        return cls(
+            device_id=device.properties.device_id,
+            database_revision=int(database_revision),
+            objects_list=[
+                (str(obj_type), int(address))
+                for obj_type, address in device.properties.objects_list
+            ],
+            points=[
+                {
+                    "class": point.__class__.__name__,
+                    "type": point.properties.type,
+                    "address": point.properties.address,
+                    "name": point.properties.name,
+                    "description": point.properties.description,
+                    "units_state": point.properties.units_state,
+                    "details_loaded": point.properties.details_loaded,
+                }
+                for point in device.points
+                if point.__class__.__name__ in POINT_CLASSES
+            ],
+            name=device.properties.name,
+            vendor_id=device.properties.vendor_id,
+            pss=getattr(device.properties.pss, "value", None),
+            rpm_batch_size=device.properties.rpm_batch_size,
+            # what the connection found (not the device properties)
+            segmentation_supported=device.segmentation_supported,
+        )
+
+    @staticmethod
+    def filename(device_id: int, directory: t.Optional[str] = None) -> str:
+        return os.path.join(
+            directory or SNAPSHOT_DIRECTORY, f"device_{device_id}.json"
+        )
+
+    def asdict(self) -> t.Dict[str, t.Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "device_id": int(self.device_id),
+            "database_revision": int(self.database_revision),
+            "objects_list": [
+                [str(obj_type), int(address)] for obj_type, address in self.objects_list
+            ],
+            "points": [
+                {
+                    "class": each["class"],
+                    "type": str(each["type"]),
+                    "address": str(each["address"]),
+                    "name": str(each["name"]),
+                    "description": (
+                        None if each["description"] is None else str(each["description"])
+                    ),
+                    "units_state": _units_to_json(each["units_state"]),
+                    "details_loaded": bool(each["details_loaded"]),
+                }
+                for each in self.points
+            ],
+            "name": str(self.name),
+            "vendor_id": int(self.vendor_id or 0),
+            "pss": None if self.pss is None else [int(bit) for bit in self.pss],
+            "rpm_batch_size": self.rpm_batch_size,
+            "segmentation_supported": bool(self.segmentation_supported),
+        }
+
+    def save(self, directory: t.Optional[str] = None) -> None:
+        filename = self.filename(self.device_id, directory)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # a snapshot is never half written
+        with open(f"{filename}.tmp", "w", encoding="utf-8") as file:
+            json.dump(self.asdict(), file)
+        os.replace(f"{filename}.tmp", filename)
+
+    @classmethod
+    def load(
+        cls, device_id: int, directory: t.Optional[str] = None
+    ) -> t.Optional["DeviceSnapshot"]:
+        """
+        The snapshot of a device (None if there is none, or if it can't be
+        used). The content of the file is validated, anything unexpected
+        means a normal discovery.
+        """
+        try:
+            with open(cls.filename(device_id, directory), encoding="utf-8") as file:
+                content = json.load(file)
+            if (
+                not isinstance(content, dict)
+                or content.get("version") != SNAPSHOT_VERSION
+                or content.get("device_id") != int(device_id)
+                or not isinstance(content.get("database_revision"), int)
+                or not isinstance(content.get("name"), str)
+                or not isinstance(content.get("vendor_id"), int)
+                or not isinstance(content.get("rpm_batch_size"), (int, type(None)))
+                or not isinstance(content.get("segmentation_supported"), bool)
+                or not all(
+                    isinstance(obj_type, str) and isinstance(address, int)
+                    for obj_type, address in content.get("objects_list")
+                )
+                or not all(_valid_point(point) for point in content.get("points"))
+            ):
+                return None
+            pss = content.get("pss")
+            return cls(
+                device_id=content["device_id"],
+                database_revision=content["database_revision"],
+                objects_list=[
+                    (obj_type, address) for obj_type, address in content["objects_list"]
+                ],
+                points=[
+                    {
+                        **point,
+                        "units_state": _units_from_json(
+                            point["class"], point["units_state"]
+                        ),
+                    }
+                    for point in content["points"]
+                ],
+                name=content["name"],
+                vendor_id=content["vendor_id"],
+                pss=None if pss is None else ServicesSupported(pss),
+                rpm_batch_size=content["rpm_batch_size"],
+                segmentation_supported=content["segmentation_supported"],
+            )
+        except Exception:
+            return None
+
+    def matches(self, revision: t.Optional[t.Tuple[int, int]]) -> bool:
+        """
+        True if the device didn't change since the snapshot.
+
+        :param revision: (databaseRevision, length of objectList) from read_revision()
+        """
+        return revision == (self.database_revision, len(self.objects_list))
+
+    def create_points(self, device) -> t.List[t.Any]:
+        points = []
+        for each in self.points:
+            point = POINT_CLASSES[each["class"]](
+                pointType=each["type"],
+                pointAddress=each["address"],
+                pointName=each["name"],
+                description=each["description"],
+                presentValue=None,
+                units_state=each["units_state"],
+                device=device,
+                history_size=device.properties.history_size,
+            )
+            point.properties.details_loaded = each.get("details_loaded", True)
+            points.append(point)
+        return points
+
+    def __repr__(self) -> str:
+        return (
+            f"DeviceSnapshot(device {self.device_id} | "
+            f"databaseRevision {self.database_revision} | {len(self.points)} points)"
+        )
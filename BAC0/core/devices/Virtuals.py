@@ -10,12 +10,12 @@ Points.py - Definition of points so operations on Read results are more convenie
 
 import asyncio
 import hashlib
+import time
+import typing as t
 from collections import namedtuple
-
-
-# --- standard Python modules ---
 from datetime import datetime
 
+
 from bacpypes3.basetypes import EngineeringUnits
 
 from ...tasks.Match import Match_Value
@@ -23,6 +23,7 @@ from ...tasks.Match import Match_Value
 # --- this application's modules ---
 from ..utils.notes import note_and_log
 from ..utils.lookfordependency import pandas_if_available
+from .History import PointHistory
 
 _PANDAS, pd, _, _ = pandas_if_available()
 # ------------------------------------------------------------------------------
@@ -130,9 +131,9 @@ class VirtualPoint:
         self.tags = tags
         self._history_fn = history_fn
 
-        self._history = namedtuple("_history", ["timestamp", "value"])
-        self._history.timestamp = []
-        self._history.value = []
+        self._history = PointHistory(numeric=True)
+        # last valid reading (epoch, value), kept by _trend
+        self._last_reading: t.Tuple[t.Optional[float], t.Any] = (None, None)
 
         self._match_task = namedtuple("_match_task", ["task", "running"])
         self._match_task.task = None
@@ -161,39 +162,32 @@ class VirtualPoint:
             )
 
     def _trend(self, res):
-        self._history.timestamp.append(datetime.now().astimezone())
-        self._history.value.append(res)
-        if self.properties.device.properties.network.database:
-            self.properties.device.properties.network.database.prepare_point([self])
-
-        if self.properties.history_size is None:
-            return
-        else:
-            if self.properties.history_size < 1:
-                self.properties.history_size = 1
-            if len(self._history.timestamp) >= self.properties.history_size:
-                try:
-                    self._history.timestamp = self._history.timestamp[
-                        -self.properties.history_size :
-                    ]
-                    self._history.value = self._history.value[
-                        -self.properties.history_size :
-                    ]
-                    assert len(self._history.timestamp) == len(self._history.value)
-                except Exception:
-                    self._log.exception("Can't append to history")
+        history_size = self.properties.history_size
+        if history_size is not None and history_size < 1:
+            self.properties.history_size = history_size = 1
+        if history_size != self._history.capacity:
+            self._history.resize(history_size)
+        now = time.time()
+        self._history.append(res, timestamp=now)
+        if res is not None and res == res:  # NaN != NaN
+            self._last_reading = (now, res)
+            database = self.properties.device.properties.network.database
+            if database:
+                database.add_sample(self, now, res)
 
     @property
     def lastTimestamp(self):
         """
         returns: last timestamp read
         """
-        if _PANDAS:
+        if self._history_fn is not None and _PANDAS:
             last_val = self.history.dropna()
             last_val_clean = None if len(last_val) == 0 else last_val.index[-1]
             return last_val_clean
-        else:
-            return self._history.timestamp[-1]
+        timestamp = self._last_reading[0]
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp).astimezone()
 
     @property
     async def value(self):
@@ -207,10 +201,9 @@ class VirtualPoint:
         """
         returns: last value read
         """
-        if _PANDAS:
+        if self._history_fn is not None and _PANDAS:
             return self.history.dropna().iloc[-1]
-        else:
-            return self._history.value[-1]
+        return self._last_reading[1]
 
     @property
     def history(self):
@@ -221,10 +214,8 @@ class VirtualPoint:
             return self._history_fn()
         else:
             if not _PANDAS:
-                return dict(zip(self._history.timestamp, self._history.value))
-            idx = self._history.timestamp.copy()
-            his_table = pd.Series(index=idx, data=self._history.value[: len(idx)])
-            del idx
+                return self._history.to_dict()
+            his_table = self._history.to_series()
             his_table.name = ("{}/{}").format(
                 self.properties.device.properties.name, self.properties.name
             )
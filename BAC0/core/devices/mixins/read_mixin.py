@@ -8,8 +8,15 @@
 read_mixin.py - Add ReadProperty and ReadPropertyMultiple to a device
 """
 # --- standard Python modules ---
+import asyncio
+import time
 import typing as t
 
+from bacpypes3.basetypes import PropertyIdentifier, PropertyReference, Segmentation
+from bacpypes3.pdu import Address
+from bacpypes3.primitivedata import ObjectIdentifier
+from bacpypes3.vendor import get_vendor_info
+
 # --- this application's modules ---
 from ....tasks.Poll import DeviceFastPoll, DeviceNormalPoll
 from ...io.IOExceptions import (
@@ -18,6 +25,8 @@ from ...io.IOExceptions import (
     SegmentationNotSupported,
 )
 from ..Points import BooleanPoint, DateTimePoint, EnumPoint, NumericPoint, StringPoint
+from ..BatchSizer import RPMBatchSizer
+from ..ReadPlan import ReadPlan
 from ..Trends import TrendLog
 
 # --- 3rd party modules ---
@@ -28,6 +37,28 @@ from ..Trends import TrendLog
 # ------------------------------------------------------------------------------
 
 
+# Number of compiled read plans kept by a device
+MAX_READ_PLANS = 16
+
+# ReadPropertyMultiple requests in flight, per device
+IP_RPM_WINDOW = 4
+ROUTED_RPM_WINDOW = 2
+
+# Seconds a point that breaks ReadPropertyMultiple is read with ReadProperty
+RPM_EXCLUSION_DELAY = 3600
+
+# ReadProperty requests in flight, per device (well below the 256 invoke IDs)
+IP_RP_WINDOW = 8
+ROUTED_RP_WINDOW = 1
+
+# Attempts for each index of an object list read one object at a time
+OBJECT_LIST_RETRIES = 2
+
+# Discovery phases (object types, trend logs) running at the same time, per device
+IP_DISCOVERY_CONCURRENCY = 3
+ROUTED_DISCOVERY_CONCURRENCY = 1
+
+
 # Requests processing
 def retrieve_type(obj_list, point_type_key):
     for point_type, point_address in obj_list:
@@ -35,6 +66,49 @@ def retrieve_type(obj_list, point_type_key):
             yield (point_type, point_address)
 
 
+# Properties of a point that are not needed to create it (read after discovery
+# by devices without ReadPropertyMultiple, on first use in fast connect mode)
+POINT_DETAILS = {
+    "analog": ("description", "units"),
+    "loop": ("description", "units"),
+    "multi": ("description", "stateText"),
+    "binary": ("description", "inactiveText", "activeText"),
+}
+
+
+# Points per ReadPropertyMultiple request when reading details
+DETAILS_PER_REQUEST = 5
+
+
+def point_kind(point_type):
+    """
+    analog, binary, multi... as used by retrieve_type.
+    """
+    for kind in ("analog", "binary", "multi", "loop"):
+        if kind in str(point_type):
+            return kind
+    return str(point_type)
+
+
+def set_point_details(point, values):
+    """
+    Description, units and state texts read for a point (in the order of
+    POINT_DETAILS).
+    """
+    kind = point_kind(point.properties.type)
+    description, *units_state = values
+    point.properties.description = "" if description is None else str(description)
+    if kind == "binary":
+        if None not in units_state:
+            point.properties.units_state = tuple(str(x) for x in units_state)
+    elif kind == "multi":
+        states = units_state[0]
+        point.properties.units_state = [str(x) for x in states] if states else []
+    elif units_state:
+        point.properties.units_state = units_state[0]
+    point.properties.details_loaded = True
+
+
 def to_float_if_possible(val):
     try:
         return float(val)
@@ -134,6 +208,121 @@ class ReadUtilsMixin:
 
         return (requests, points)
 
+    async def _rp_read(self, point_type, point_address, prop, arr_index=None):
+        async with self._rp_window():
+            return await self.properties.network.read_value(
+                self.bacnet_address,
+                (point_type, int(point_address)),
+                prop,
+                arr_index=arr_index,
+                vendor_id=self.properties.vendor_id,
+            )
+
+    def _rp_window(self) -> asyncio.Semaphore:
+        """
+        Number of ReadProperty requests sent to the device without waiting
+        for the previous answers.
+        """
+        if self._rp_in_flight is None:
+            window = self.properties.rp_window
+            if not window:
+                window = (
+                    ROUTED_RP_WINDOW
+                    if self.bacnet_address.addrType == Address.remoteStationAddr
+                    else IP_RP_WINDOW
+                )
+            self._rp_in_flight = asyncio.Semaphore(window)
+        return self._rp_in_flight
+
+    def _read_plan(self, point_list, property_identifier="presentValue"):
+        """
+        Compiled read requests for a list of point names. Plans are kept
+        until the point list of the device changes.
+
+        :param point_list: a list of point names
+        :returns: (ReadPlan)
+        """
+        self._expire_rpm_exclusions()
+        key = (tuple(point_list), property_identifier)
+        try:
+            return self._read_plans[key]
+        except KeyError:
+            pass
+        plan = ReadPlan(
+            self.bacnet_address,
+            [
+                self._findPoint(each, force_read=False)
+                for each in point_list
+                if each not in self._rpm_excluded
+            ],
+            property_identifier=property_identifier,
+            vendor_id=self.properties.vendor_id,
+            excluded=[
+                self._findPoint(each, force_read=False)
+                for each in point_list
+                if each in self._rpm_excluded
+            ],
+        )
+        if len(self._read_plans) >= MAX_READ_PLANS:
+            # forget the oldest one
+            del self._read_plans[next(iter(self._read_plans))]
+        self._read_plans[key] = plan
+        self.log(f"New read plan : {plan}", level="debug")
+        return plan
+
+    def _exclude_from_rpm(self, point) -> None:
+        """
+        Read the point with ReadProperty for a while (it breaks the
+        ReadPropertyMultiple requests it is part of).
+        """
+        self._rpm_excluded[point.properties.name] = (
+            time.monotonic() + RPM_EXCLUSION_DELAY
+        )
+        self._read_plans = {}
+
+    def _expire_rpm_exclusions(self) -> None:
+        """
+        Give the points excluded from ReadPropertyMultiple requests another
+        chance once RPM_EXCLUSION_DELAY is over (after a firmware update...).
+        """
+        if not self._rpm_excluded:
+            return
+        now = time.monotonic()
+        expired = [name for name, until in self._rpm_excluded.items() if until <= now]
+        for name in expired:
+            del self._rpm_excluded[name]
+        if expired:
+            self._read_plans = {}
+
+    async def _read_excluded(self, plan):
+        """
+        Read, one by one, the points that can't be part of a
+        ReadPropertyMultiple request.
+
+        :returns: list of (point, value)
+        """
+        if plan.excluded:
+            self.log(
+                f"{len(plan.excluded)} points read using ReadProperty", level="debug"
+            )
+        results = []
+        for point in plan.excluded:
+            try:
+                value = await self.properties.network.read_value(
+                    plan.address,
+                    point.object_identifier,
+                    plan.property_identifier,
+                    vendor_id=self.properties.vendor_id,
+                )
+            except Exception as error:
+                self.log(
+                    f"Problem reading {point.properties.name} : {error!r}",
+                    level="warning",
+                )
+                continue
+            results.append((point, value))
+        return results
+
 
 class DiscoveryUtilsMixin:
     """
@@ -145,10 +334,10 @@ class DiscoveryUtilsMixin:
             objList = custom_object_list
         else:
             try:
-                objList = await self.properties.network.read(
-                    "{} device {} objectList".format(
-                        self.properties.address, self.properties.device_id
-                    ),
+                objList = await self.properties.network.read_value(
+                    self.bacnet_address,
+                    self.device_identifier,
+                    PropertyIdentifier.objectList,
                     vendor_id=self.properties.vendor_id,
                 )
 
@@ -159,69 +348,195 @@ class DiscoveryUtilsMixin:
                 objList = []
 
             except (SegmentationNotSupported, BufferOverflow):
-                objList = []
-                number_of_objects = await self.properties.network.read(
-                    "{} device {} objectList".format(
-                        self.properties.address, self.properties.device_id
-                    ),
-                    arr_index=0,
-                    vendor_id=self.properties.vendor_id,
-                )
+                objList = await self._read_objects_list_by_index()
+        return objList
 
-                for i in range(1, number_of_objects + 1):
-                    objList.append(
-                        await self.properties.network.read(
-                            "{} device {} objectList".format(
-                                self.properties.address, self.properties.device_id
-                            ),
-                            arr_index=i,
-                            vendor_id=self.properties.vendor_id,
+    async def _read_objects_list_by_index(self):
+        """
+        The object list is too big for the device to send it in one answer,
+        read it one array index at a time. Indexes are read as
+        ReadPropertyMultiple batches when the device supports it, with
+        ReadProperty requests (within the window of the device) otherwise
+        or for the batches that failed.
+        """
+        number_of_objects = await self.properties.network.read_value(
+            self.bacnet_address,
+            self.device_identifier,
+            PropertyIdentifier.objectList,
+            arr_index=0,
+            vendor_id=self.properties.vendor_id,
+        )
+        self.log(
+            f"Reading the {number_of_objects} objects of the object list one by one",
+            level="info",
+        )
+        objects: t.Dict[int, t.Any] = {}
+        indexes = list(range(1, number_of_objects + 1))
+        if (
+            self.properties.object_list_rpm
+            and self.properties.pss["readPropertyMultiple"]
+        ):
+            objects.update(await self._read_objects_list_rpm(indexes))
+
+        async def _read_index(index):
+            for attempt in range(OBJECT_LIST_RETRIES + 1):
+                try:
+                    return await self._rp_read(
+                        *self.device_identifier,
+                        PropertyIdentifier.objectList,
+                        arr_index=index,
+                    )
+                except Exception as error:
+                    if attempt == OBJECT_LIST_RETRIES:
+                        self.log(
+                            f"objectList[{index}] can't be read ({error!r}), skipping it",
+                            level="error",
                         )
+            return None
+
+        missing = [index for index in indexes if index not in objects]
+        for index, value in zip(
+            missing, await asyncio.gather(*(_read_index(index) for index in missing))
+        ):
+            objects[index] = value
+        return [objects[index] for index in indexes if objects[index] is not None]
+
+    async def _read_objects_list_rpm(self, indexes):
+        """
+        objectList[i] for many indexes, in ReadPropertyMultiple requests.
+
+        :returns: (dict) index -> object identifier, for the batches that
+            succeeded
+        """
+        info = await self.properties.network._device_info(self.bacnet_address)
+        # a device that can't send the object list doesn't segment its answers
+        size = RPMBatchSizer(
+            max_apdu_length_accepted=info.max_apdu_length_accepted,
+            segmentation_supported=Segmentation.noSegmentation,
+        ).size
+        window = self._rp_window()
+
+        async def _read_batch(batch):
+            parameter_list = [
+                self.device_identifier,
+                [
+                    PropertyReference(
+                        propertyIdentifier=PropertyIdentifier.objectList,
+                        propertyArrayIndex=index,
                     )
-        return objList
+                    for index in batch
+                ],
+            ]
+            try:
+                async with window:
+                    response = await self.properties.network._read_property_multiple(
+                        self.bacnet_address,
+                        parameter_list,
+                        vendor_info=get_vendor_info(self.properties.vendor_id),
+                    )
+            except Exception as error:
+                self.log(f"objectList batch failed : {error!r}", level="debug")
+                return {}
+            if not isinstance(response, list) or len(response) != len(batch):
+                return {}
+            return {
+                index: value
+                for (_, _, index, value) in response
+                if isinstance(value, ObjectIdentifier)
+            }
+
+        objects = {}
+        for result in await asyncio.gather(
+            *(_read_batch(indexes[i : i + size]) for i in range(0, len(indexes), size))
+        ):
+            objects.update(result)
+        return objects
 
     async def _discoverPoints(self, custom_object_list=None):
         objList = await self.read_objects_list(custom_object_list=custom_object_list)
 
-        points = []
-        trendlogs = {}
-
-        points.extend(
-            await self._process_new_objects(
-                obj_cls=NumericPoint, obj_type="analog", objList=objList
-            )
-        )
-        points.extend(
-            await self._process_new_objects(
-                obj_cls=BooleanPoint, obj_type="binary", objList=objList
-            )
-        )
-        points.extend(
-            await self._process_new_objects(
-                obj_cls=EnumPoint, obj_type="multi", objList=objList
-            )
-        )
-        points.extend(
-            await self._process_new_objects(
-                obj_cls=NumericPoint, obj_type="loop", objList=objList
-            )
-        )
-        points.extend(
-            await self._process_new_objects(
-                obj_cls=StringPoint, obj_type="characterstringValue", objList=objList
-            )
+        phases = [
+            (NumericPoint, "analog"),
+            (BooleanPoint, "binary"),
+            (EnumPoint, "multi"),
+            (NumericPoint, "loop"),
+            (StringPoint, "characterstringValue"),
+            (DateTimePoint, "datetime-value"),
+        ]
+        # nothing to ask for object types the device doesn't have
+        phases = [
+            (obj_cls, obj_type)
+            for obj_cls, obj_type in phases
+            if any(retrieve_type(objList, obj_type))
+        ]
+        total = len(phases) + 1
+        done = 0
+        self._discover_points_progress = 0.0
+        limit = asyncio.Semaphore(
+            ROUTED_DISCOVERY_CONCURRENCY
+            if self.bacnet_address.addrType == Address.remoteStationAddr
+            else IP_DISCOVERY_CONCURRENCY
         )
-        points.extend(
-            await self._process_new_objects(
-                obj_cls=DateTimePoint, obj_type="datetime-value", objList=objList
+
+        async def _phase(name, coro):
+            nonlocal done
+            async with limit:
+                result = await coro
+            done += 1
+            self._discover_points_progress = done / total
+            self.log(
+                f"{self.properties.name} | {name} discovered ({done}/{total})",
+                level="info",
             )
+            return result
+
+        # Phases run concurrently, results are assembled in the order above
+        results = await asyncio.gather(
+            *(
+                _phase(
+                    f"{obj_type} points",
+                    self._process_new_objects(
+                        obj_cls=obj_cls, obj_type=obj_type, objList=objList
+                    ),
+                )
+                for obj_cls, obj_type in phases
+            ),
+            _phase("trend logs", create_trendlogs(objList, self)),
+            return_exceptions=True,
         )
-        # TrendLogs
-        trendlogs = await create_trendlogs(objList, self)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        *new_points, trendlogs = results
+        points = [point for each in new_points for point in each]
 
         self.log("Points and trendlogs (if any) created", level="info")
+        stubs = [point for point in points if not point.properties.details_loaded]
+        if stubs and (self.properties.warm_up or not self.properties.fast_connect):
+            # the device is usable now, details are read in the background
+            self._details_task = asyncio.create_task(self.load_point_details(stubs))
         return (objList, points, trendlogs)
 
+    async def load_point_details(self, points=None):
+        """
+        Read the description, units and state texts of points created without
+        them (fast connect mode, devices without ReadPropertyMultiple). Each
+        point is also completed the first time its value is read.
+
+        :param points: (list) points to complete (all of them by default)
+        """
+        points = [
+            point
+            for point in (self.points if points is None else points)
+            if not point.properties.details_loaded
+        ]
+        if not points:
+            return
+        await self._read_details(points)
+        # units changed
+        self._point_views = None
+        self.log(f"Details of {len(points)} points read", level="debug")
+
     async def rp_discovered_values(self, discover_request, points_per_request):
         values = []
         info_length = discover_request[1]
@@ -256,7 +571,10 @@ class RPMObjectsProcessing:
         """
         request = []
         new_points = []
-        if obj_type == "analog":
+        if self.properties.fast_connect:
+            # the rest is read on first use
+            prop_list = "objectName"
+        elif obj_type == "analog":
             prop_list = "objectName presentValue units description"
         elif obj_type == "binary":
             prop_list = "objectName presentValue inactiveText activeText description"
@@ -303,7 +621,15 @@ class RPMObjectsProcessing:
                 f"Retrieved Type {point_type} {point_address} {point_infos}"
             )
             pointName = point_infos[_find_propid_index("objectName")]
-            presentValue = point_infos[_find_propid_index("presentValue")]
+            if pointName is None:
+                self._log.warning(
+                    f"Name of {point_type} {point_address} not read, point skipped"
+                )
+                continue
+            try:
+                presentValue = point_infos[_find_propid_index("presentValue")]
+            except KeyError:
+                presentValue = None
             self._log.debug(
                 f"Reading {pointName} gave {presentValue} of type {obj_type}"
             )
@@ -354,76 +680,134 @@ class RPMObjectsProcessing:
                     )
                 )
                 raise
+        if self.properties.fast_connect:
+            for point in new_points:
+                point.properties.details_loaded = False
         return new_points
 
+    async def _read_details(self, points):
+        """
+        Read the description, units and state texts of points, in
+        ReadPropertyMultiple requests (one kind of point per request).
+        """
+        by_kind = {}
+        for point in points:
+            by_kind.setdefault(point_kind(point.properties.type), []).append(point)
+        window = self._rpm_window()
+
+        async def _read(batch, props):
+            request = [
+                f"{point.properties.type} {point.properties.address} {' '.join(props)} "
+                for point in batch
+            ]
+            try:
+                async with window:
+                    values = await self._discover_batch(request, len(props))
+            except Exception as error:
+                self.log(f"Problem reading details : {error!r}", level="warning")
+                return
+            for point, point_values in zip(batch, values):
+                set_point_details(point, point_values)
+
+        await asyncio.gather(
+            *(
+                _read(batch, POINT_DETAILS.get(kind, ("description",)))
+                for kind, kind_points in by_kind.items()
+                for batch in batch_requests(kind_points, DETAILS_PER_REQUEST)
+            )
+        )
+
 
 class RPObjectsProcessing:
+    """
+    Without ReadPropertyMultiple, each property of each object is a request.
+    The requests are sent concurrently (within the window of the device) and
+    only objectName and presentValue are read while discovering points. The
+    other properties (description, units, state texts) are read once every
+    point is created.
+    """
+
     async def _process_new_objects(
         self, obj_cls=NumericPoint, obj_type: str = "analog", objList=None
     ):
-        _newpoints = []
-        for each in retrieve_type(objList, obj_type):
-            point_type = str(each[0])
-            point_address = str(each[1])
+        objects = list(retrieve_type(objList, obj_type))
+
+        async def _required(point_type, point_address):
+            if self.properties.fast_connect:
+                name = await self._rp_read(point_type, point_address, "objectName")
+                return (name, None)
+            return await asyncio.gather(
+                self._rp_read(point_type, point_address, "objectName"),
+                self._rp_read(point_type, point_address, "presentValue"),
+            )
 
-            if obj_type == "analog":
-                units_state = await self.read_single(
-                    f"{point_type} {point_address} units "
-                )
-            elif obj_type == "multi":
-                units_state = await self.read_single(
-                    f"{point_type} {point_address} stateText "
-                )
-            elif obj_type == "loop":
-                units_state = await self.read_single(
-                    f"{point_type} {point_address} units "
-                )
-            elif obj_type == "binary":
-                units_state = (
-                    (
-                        await self.read_single(
-                            f"{point_type} {point_address} inactiveText "
-                        )
-                    ),
-                    (
-                        await self.read_single(
-                            f"{point_type} {point_address} activeText "
-                        )
-                    ),
-                )
-            else:
-                units_state = None
+        results = await asyncio.gather(
+            *(
+                _required(point_type, point_address)
+                for point_type, point_address in objects
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
-            presentValue = await self.read_single(
-                f"{point_type} {point_address} presentValue "
-            )
+        _newpoints = []
+        for (point_type, point_address), (pointName, presentValue) in zip(
+            objects, results
+        ):
             if (obj_type == "analog" or obj_type == "loop") and presentValue:
                 presentValue = float(presentValue)
-
+            if obj_type == "binary":
+                # until the state texts are read
+                units_state = ("OFF", "ON")
+            else:
+                units_state = None
             _newpoints.append(
                 obj_cls(
-                    pointType=point_type,
-                    pointAddress=point_address,
-                    pointName=await self.read_single(
-                        f"{point_type} {point_address} objectName "
-                    ),
-                    description=await self.read_single(
-                        f"{point_type} {point_address} description "
-                    ),
+                    pointType=str(point_type),
+                    pointAddress=str(point_address),
+                    pointName=pointName,
+                    description="",
                     presentValue=presentValue,
                     units_state=units_state,
                     device=self,
                 )
             )
+        for point in _newpoints:
+            point.properties.details_loaded = False
         return _newpoints
 
+    async def _read_details(self, points):
+        """
+        Read the description, units and state texts of points, one property
+        per request.
+        """
+
+        async def _point_details(point):
+            point_type, point_address = point.properties.type, point.properties.address
+            props = POINT_DETAILS.get(point_kind(point_type), ("description",))
+            try:
+                values = await asyncio.gather(
+                    *(self._rp_read(point_type, point_address, prop) for prop in props)
+                )
+            except Exception as error:
+                self.log(
+                    f"Problem reading details of {point.properties.name} : {error!r}",
+                    level="warning",
+                )
+                return
+            set_point_details(point, values)
+
+        await asyncio.gather(*(_point_details(point) for point in points))
+
 
 class ReadPropertyMultiple(ReadUtilsMixin, DiscoveryUtilsMixin, RPMObjectsProcessing):
     async def read_multiple(
         self,
         points_list,
         *,
-        points_per_request=25,
+        points_per_request=None,
         discover_request=(None, 6),
         force_single=False,
         property_identifier="presentValue",
@@ -433,7 +817,10 @@ class ReadPropertyMultiple(ReadUtilsMixin, DiscoveryUtilsMixin, RPMObjectsProces
         [ReadProperty requests are very slow in comparison].
 
         :param points_list: (list) a list of all point_name as str
-        :param points_per_request: (int) number of points in the request
+        :param points_per_request: (int) number of points in the request. By default,
+            the number of points is learned for the device (see BatchSizer).
+            A given number is used as is by devices that support segmentation
+            (nothing is learned) and is only an upper bound for the others.
 
         Requesting many points results big requests that need segmentation.  Aim to request
         just the 'right amount' so segmentation can be avoided.  Determining the 'right amount'
@@ -449,10 +836,10 @@ class ReadPropertyMultiple(ReadUtilsMixin, DiscoveryUtilsMixin, RPMObjectsProces
                 points_list, points_per_request=1, discover_request=discover_request
             )
         else:
-            if not self.properties.segmentation_supported:
-                points_per_request = 1
-
             if discover_request[0]:
+                if not self.properties.segmentation_supported or not points_per_request:
+                    points_per_request = 1
+
                 values = []
                 info_length = discover_request[1]
                 big_request = discover_request[0]
@@ -460,91 +847,231 @@ class ReadPropertyMultiple(ReadUtilsMixin, DiscoveryUtilsMixin, RPMObjectsProces
                 self.log(f"Length : {info_length}", level="debug")
 
                 for request in batch_requests(big_request, points_per_request):
-                    try:
-                        self.properties.address
-                        request = f"{self.properties.address} {''.join(request)}"
-                        self.log(f"RPM_Request: {request} ", level="debug")
-                        try:
-                            val = await self.properties.network.readMultiple(
-                                request, vendor_id=self.properties.vendor_id
-                            )
-                        except SegmentationNotSupported:
-                            raise
-                        except ValueError as error:
-                            # high limit ?
-                            self._log.warning(
-                                f"Got a value error of {error} for request : {request}"
-                            )
-                            self._log.warning(
-                                "We will use single point reading to create device and turn off segmentation support"
-                            )
-                            self.properties.segmentation_supported = False
-                            await self.read_multiple(
-                                points_list,
-                                points_per_request=1,
-                                discover_request=discover_request,
-                            )
-                            break
-
-                        # print('val : ', val, len(val), type(val))
-                        if val is None:
-                            self.properties.segmentation_supported = False
-                            raise SegmentationNotSupported
-
-                    except KeyError as error:
-                        raise Exception(f"Unknown point name : {error}")
-
-                    except SegmentationNotSupported:
-                        self.properties.segmentation_supported = False
-                        self._log.warning(
-                            "Looks like segmentation is not supported. Turning that off."
-                        )
-                        # self.read_multiple(points_list,points_per_request=1, discover_request=discover_request)
-                        self.log("Segmentation not supported", level="warning")
-                        self.log("Request too big...will reduce it", level="warning")
-                        if points_per_request == 1:
-                            raise
-                        await self.read_multiple(
-                            points_list,
-                            points_per_request=1,
-                            discover_request=discover_request,
-                        )
-
-                    else:
-                        for points_info in batch_requests(val, info_length):
-                            values.append(points_info)
+                    values.extend(await self._discover_batch(request, info_length))
                 return values
 
             else:
                 self.log("Read Multiple", level="debug")
-                big_request = self._rpm_request_by_name(
-                    points_list, property_identifier=property_identifier
-                )
-                i = 0
-                for request in batch_requests(big_request[0], points_per_request):
-                    try:
-                        request = f"{self.properties.address} {''.join(request)}"
-                        self.log(request, level="debug")
-                        val = await self.properties.network.readMultiple(
-                            request, vendor_id=self.properties.vendor_id
-                        )
+                try:
+                    plan = self._read_plan(
+                        points_list, property_identifier=property_identifier
+                    )
+                except ValueError as error:
+                    raise Exception(f"Unknown point name : {error}")
+
+                sizer = None
+                if (
+                    points_per_request is None
+                    or not self.properties.segmentation_supported
+                ):
+                    sizer = await self._batch_sizer()
+                    points_per_request = min(
+                        points_per_request or sizer.size, sizer.size
+                    )
 
-                    except SegmentationNotSupported:
-                        self.properties.segmentation_supported = False
-                        await self.read_multiple(
-                            points_list,
-                            points_per_request=1,
-                            discover_request=discover_request,
+                window = self._rpm_window()
+
+                async def _read(points, parameter_list):
+                    async with window:
+                        return await self._read_batch(
+                            plan, points, parameter_list, sizer
                         )
 
-                    except KeyError as error:
-                        raise Exception(f"Unknown point name : {error}")
+                # Requests are sent concurrently (within the window of the
+                # device), values are trended in the order of the plan
+                results = await asyncio.gather(
+                    *(
+                        _read(points, parameter_list)
+                        for points, parameter_list in plan.batches(points_per_request)
+                    ),
+                    return_exceptions=True,
+                )
+                if plan.excluded:
+                    results.append((True, await self._read_excluded(plan)))
+                errors = []
+                for result in results:
+                    if isinstance(result, BaseException):
+                        errors.append(result)
+                        continue
+                    for point, value in result[1]:
+                        point._trend(value)
+                if errors:
+                    raise errors[0]
+
+    def _rpm_window(self) -> asyncio.Semaphore:
+        """
+        Number of ReadPropertyMultiple requests sent to the device without
+        waiting for the previous answers. Devices behind a router (MS/TP most
+        of the time) get a smaller window : the token passing allows only a
+        few requests to be waiting for them.
+        """
+        if self._rpm_in_flight is None:
+            window = self.properties.rpm_window
+            if not window:
+                window = (
+                    ROUTED_RPM_WINDOW
+                    if self.bacnet_address.addrType == Address.remoteStationAddr
+                    else IP_RPM_WINDOW
+                )
+            self._rpm_in_flight = asyncio.Semaphore(window)
+        return self._rpm_in_flight
+
+    async def _read_batch(self, plan, points, parameter_list, sizer=None):
+        """
+        Read one batch of a read plan and trend the values.
+
+        When the device can't answer (segmentation not supported, buffer
+        overflow, ValueError, any other abort or reject), the batch is split
+        in halves until each part succeeds. The batch size is reduced only if
+        all the parts succeed (the batch was too big). A point that fails on
+        its own is read with ReadProperty from now on and doesn't change the
+        batch size.
+
+        :returns: (bool, list) False if a point had to be excluded, and
+            the (point, value) read
+        """
+        try:
+            response = await self.properties.network._read_property_multiple(
+                plan.address, parameter_list, vendor_info=plan.vendor_info
+            )
+
+        except (SegmentationNotSupported, BufferOverflow, ValueError) as error:
+            return await self._split_batch(plan, points, parameter_list, sizer, error)
+
+        if not isinstance(response, list):
+            self.log(
+                f"No values ({response!r}) for a request of {len(points)} points",
+                level="warning",
+            )
+            return await self._split_batch(
+                plan, points, parameter_list, sizer, response
+            )
+        values = [value for (_, _, _, value) in response]
+        if sizer is not None:
+            sizer.success(values)
+            self.properties.rpm_batch_size = sizer.size
+        return (True, list(zip(points, values)))
+
+    async def _split_batch(self, plan, points, parameter_list, sizer, error):
+        """
+        Read the halves of a batch the device couldn't answer (see
+        _read_batch).
+        """
+        if len(points) == 1:
+            self.log(
+                f"{points[0].properties.name} can't be read using ReadPropertyMultiple ({error!r}), using ReadProperty",
+                level="warning",
+            )
+            self._exclude_from_rpm(points[0])
+            return (
+                False,
+                await self._read_excluded(
+                    ReadPlan(
+                        plan.address,
+                        [],
+                        property_identifier=plan.property_identifier,
+                        excluded=points,
+                    )
+                ),
+            )
+        half = len(points) // 2
+        first, first_values = await self._read_batch(
+            plan, points[:half], parameter_list[: 2 * half], sizer  # noqa E203
+        )
+        second, second_values = await self._read_batch(
+            plan, points[half:], parameter_list[2 * half :], sizer  # noqa E203
+        )
+        if first and second and sizer is not None:
+            sizer.failure(len(points))
+            self.properties.rpm_batch_size = sizer.size
+            self.log(
+                f"Request too big ({len(points)} points)...will reduce it | {sizer}",
+                level="warning",
+            )
+        return (first and second, first_values + second_values)
+
+    async def _discover_batch(self, request, info_length):
+        """
+        Read the properties of a batch of objects while discovering points.
+        A batch too big for the device (segmentation not supported, buffer
+        overflow, ValueError) is split in halves ; an object too big on its
+        own is read one property at a time. A batch without a complete answer
+        is not split, its objects are read one property at a time.
+
+        :returns: list of the properties read for each object
+        """
+        _request = f"{self.properties.address} {''.join(request)}"
+        self.log(f"RPM_Request: {_request} ", level="debug")
+        try:
+            val = await self.properties.network.readMultiple(
+                _request, vendor_id=self.properties.vendor_id
+            )
+        except KeyError as error:
+            raise Exception(f"Unknown point name : {error}")
 
-                    else:
-                        points_values = zip(big_request[1][i : i + len(val)], val)
-                        i += len(val)
-                        for each in points_values:
-                            each[0]._trend(each[1])
+        except (SegmentationNotSupported, BufferOverflow, ValueError) as error:
+            if len(request) == 1:
+                self._log.warning(
+                    f"Got {error!r} for request : {_request}, reading properties one by one"
+                )
+                return [await self._discover_single(request[0])]
+            self.log(
+                f"Request too big ({len(request)} objects)...will split it",
+                level="warning",
+            )
+            half = len(request) // 2
+            return await self._discover_batch(
+                request[:half], info_length
+            ) + await self._discover_batch(request[half:], info_length)
+
+        if val is None or len(val) != len(request) * info_length:
+            self._log.warning(
+                f"No complete answer ({val}) for request : {_request}, "
+                "reading properties one by one"
+            )
+            return [await self._discover_single(each) for each in request]
+        return list(batch_requests(val, info_length))
+
+    async def _discover_single(self, request):
+        obj_type, obj_inst, *props = request.split()
+        values = []
+        for prop in props:
+            try:
+                values.append(
+                    await self.properties.network.read_value(
+                        self.bacnet_address,
+                        (obj_type, int(obj_inst)),
+                        prop,
+                        vendor_id=self.properties.vendor_id,
+                    )
+                )
+            except Exception as error:
+                self.log(
+                    f"Problem reading {obj_type} {obj_inst} {prop} : {error!r}",
+                    level="warning",
+                )
+                values.append(None)
+        return values
+
+    async def _batch_sizer(self):
+        """
+        Batch sizer of the device, created with the device information
+        (max APDU length and segmentation) the first time it's needed.
+        """
+        if self._rpm_batch_sizer is None:
+            info = await self.properties.network._device_info(self.bacnet_address)
+            self._rpm_batch_sizer = RPMBatchSizer(
+                size=self.properties.rpm_batch_size,
+                max_apdu_length_accepted=info.max_apdu_length_accepted,
+                segmentation_supported=(
+                    info.segmentation_supported
+                    if self.properties.segmentation_supported
+                    else Segmentation.noSegmentation
+                ),
+            )
+            self.properties.rpm_batch_size = self._rpm_batch_sizer.size
+            self.log(f"{self._rpm_batch_sizer}", level="debug")
+        return self._rpm_batch_sizer
 
     async def read_single(
         self, points_list, *, points_per_request=1, discover_request=(None, 4)
@@ -555,21 +1082,20 @@ class ReadPropertyMultiple(ReadUtilsMixin, DiscoveryUtilsMixin, RPMObjectsProces
             )
 
         else:
-            big_request = self._rpm_request_by_name(points_list)
-            i = 0
-            for request in batch_requests(big_request[0], points_per_request):
-                try:
-                    request = f"{self.properties.address} {''.join(request)}"
-                    val = await self.properties.network.read(
-                        request, vendor_id=self.properties.vendor_id
-                    )
-                    points_values = zip(big_request[1][i : i + len(val)], val)
-                    i += len(val)
-                    for each in points_values:
-                        each[0]._trend(each[1])
-
-                except KeyError as error:
-                    raise Exception(f"Unknown point name : {error}")
+            try:
+                plan = self._read_plan(points_list)
+            except ValueError as error:
+                raise Exception(f"Unknown point name : {error}")
+            for point, object_identifier in zip(plan.points, plan.object_identifiers):
+                val = await self.properties.network.read_value(
+                    plan.address,
+                    object_identifier,
+                    plan.property_identifier,
+                    vendor_id=self.properties.vendor_id,
+                )
+                point._trend(val)
+            for point, val in await self._read_excluded(plan):
+                point._trend(val)
 
     def poll(self, command="start", *, delay=10):
         """
@@ -668,13 +1194,25 @@ class ReadProperty(ReadUtilsMixin, DiscoveryUtilsMixin, RPObjectsProcessing):
         device.read_multiple(['point1', 'point2', 'point3'], points_per_request = 10)
         """
         if isinstance(points_list, list):
-            (requests, points) = self._rpm_request_by_name(points_list)
-            for i, req in enumerate(requests):
-                val = await self.read_single(
-                    req, points_per_request=1, discover_request=discover_request
-                )
+            try:
+                plan = self._read_plan(points_list)
+            except ValueError as error:
+                raise Exception(f"Unknown point name : {error}")
+            for point, object_identifier in zip(plan.points, plan.object_identifiers):
+                try:
+                    val = await self.properties.network.read_value(
+                        plan.address,
+                        object_identifier,
+                        plan.property_identifier,
+                        vendor_id=self.properties.vendor_id,
+                    )
+                except NoResponseFromController:
+                    continue
+                if val is not None and val != "":
+                    point._trend(val)
+            for point, val in await self._read_excluded(plan):
                 if val is not None and val != "":
-                    points[i]._trend(val)
+                    point._trend(val)
         else:
             await self.read_single(
                 points_list, points_per_request=1, discover_request=discover_request
@@ -1,4 +1,6 @@
 import asyncio
+import statistics
+import time
 import typing as t
 
 from bacpypes3.app import Application
@@ -9,6 +11,14 @@ from BAC0.core.app.asyncApp import BAC0Application
 
 from ...core.utils.notes import note_and_log
 
+# Networks discovered at the same time
+WHO_IS_CONCURRENCY = 8
+# Minimal time (sec) between 2 Who-Is
+WHO_IS_PACING = 0.05
+# A Who-Is answered by this many I-Am is asked again in smaller ranges
+I_AM_STORM = 100
+MAX_RANGE_SPLITS = 4
+
 
 @note_and_log
 class Discover:
@@ -16,16 +26,90 @@ class Discover:
     Main function to explore the network and find devices.
     """
 
+    # time.monotonic() when the next paced Who-Is can be sent (set by Base)
+    _next_who_is: float
+
     @property
     def known_network_numbers(self) -> t.Set[int]:
         return self.this_application._learnedNetworks
 
+    async def _who_is_slot(self, pacing: float) -> None:
+        now = time.monotonic()
+        start = max(now, self._next_who_is)
+        self._next_who_is = start + pacing
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _who_is_network(
+        self,
+        network: int,
+        low_limit: int,
+        high_limit: int,
+        timeout: int = 3,
+        pacing: float = WHO_IS_PACING,
+        this_network: t.Optional[int] = None,
+        splits: int = 0,
+    ) -> t.List[t.Any]:
+        """
+        Who-Is on a network. When too many devices answer (I-Am storm), some
+        I-Am may have been dropped by routers : the range is split in 2 around
+        the median instance found and each half is asked again.
+        """
+        await self._who_is_slot(pacing)
+        _res = await self.this_application.app.who_is(
+            low_limit=low_limit,
+            high_limit=high_limit,
+            address=Address(f"{network}:*"),
+            timeout=timeout,
+        )
+        # Who-Is sent at the same time to remote broadcasts all get the I-Am
+        # of every network, keep the ones coming from this network
+        i_ams = [
+            each
+            for each in _res
+            if (
+                each.pduSource.addrNet
+                if each.pduSource.addrType == Address.remoteStationAddr
+                else this_network
+            )
+            == network
+        ]
+        if (
+            len(i_ams) < I_AM_STORM
+            or splits >= MAX_RANGE_SPLITS
+            or low_limit >= high_limit
+        ):
+            return i_ams
+        middle = int(statistics.median(each.iAmDeviceIdentifier[1] for each in i_ams))
+        middle = min(max(middle, low_limit + 1), high_limit)
+        self.log(
+            f"{len(i_ams)} I-Am from network {network} ({low_limit} - {high_limit}), asking again in smaller ranges",
+            level="info",
+        )
+        for each in await asyncio.gather(
+            *(
+                self._who_is_network(
+                    network,
+                    *sub_range,
+                    timeout=timeout,
+                    pacing=pacing,
+                    this_network=this_network,
+                    splits=splits + 1,
+                )
+                for sub_range in ((low_limit, middle - 1), (middle, high_limit))
+            )
+        ):
+            i_ams.extend(each)
+        return i_ams
+
     def discover(
         self,
         networks: t.Union[str, t.List[int], int] = "known",
         limits: t.Tuple[int, int] = (0, 4194303),
         global_broadcast: bool = False,
         reset: bool = False,
+        concurrency: int = WHO_IS_CONCURRENCY,
+        pacing: float = WHO_IS_PACING,
     ) -> None:
         try:
             loop = asyncio.get_running_loop()
@@ -38,6 +122,8 @@ class Discover:
                 limits=limits,
                 global_broadcast=global_broadcast,
                 reset=reset,
+                concurrency=concurrency,
+                pacing=pacing,
             )
         )
 
@@ -48,6 +134,8 @@ class Discover:
         global_broadcast: bool = False,
         timeout: int = 3,
         reset: bool = False,
+        concurrency: int = WHO_IS_CONCURRENCY,
+        pacing: float = WHO_IS_PACING,
     ) -> None:
         """
         Discover is meant to be the function used to explore the network when we
@@ -80,6 +168,13 @@ class Discover:
 
         :param global_broadcast (boolean) : If set to true, a global broadcast
             will be used for the whois. Use with care.
+
+        :param concurrency (int) : number of networks discovered at the same
+            time
+
+        :param pacing (float) : minimal time (sec) between 2 whois requests.
+            When a network answers with a lot of I-Am, the instance range is
+            split and each part is asked again (I-Am may have been lost).
         """
         if reset:
             self.discoveredDevices = {}
@@ -119,16 +214,33 @@ class Discover:
                     _networks.add(networks)
 
         if _networks and not global_broadcast:
-            for each_network in _networks:
-                self.log(f"Discovering network {each_network}", level="info")
-                _res = await self.this_application.app.who_is(
-                    low_limit=deviceInstanceRangeLowLimit,
-                    high_limit=deviceInstanceRangeHighLimit,
-                    address=Address(f"{each_network}:*"),
-                    timeout=timeout,
-                )
-                for each in _res:
-                    found.append((each, each_network))
+            limit = asyncio.Semaphore(concurrency)
+
+            async def _discover_network(network):
+                async with limit:
+                    self.log(f"Discovering network {network}", level="info")
+                    return await self._who_is_network(
+                        network,
+                        deviceInstanceRangeLowLimit,
+                        deviceInstanceRangeHighLimit,
+                        timeout=timeout,
+                        pacing=pacing,
+                        this_network=_this_network,
+                    )
+
+            networks_asked = list(_networks)
+            results = await asyncio.gather(
+                *(_discover_network(network) for network in networks_asked)
+            )
+            seen = set()
+            for each_network, i_ams in zip(networks_asked, results):
+                for each in i_ams:
+                    # the same device can answer more than once (ranges split),
+                    # devices behind a gateway can share its address
+                    key = (str(each.pduSource), each.iAmDeviceIdentifier[1])
+                    if key not in seen:
+                        seen.add(key)
+                        found.append((each, each_network))
 
         else:
             msg = (
@@ -137,7 +249,8 @@ class Discover:
                 else "No BACnet network found"
             )
             self.log(
-                f"{msg}, attempting a simple whois using provided device instances limits ({deviceInstanceRangeLowLimit} - {deviceInstanceRangeHighLimit})",
+                f"{msg}, attempting a simple whois using provided device instances limits "
+                f"({deviceInstanceRangeLowLimit} - {deviceInstanceRangeHighLimit})",
                 level="info",
             )
             if global_broadcast is True:
@@ -185,6 +298,7 @@ class Discover:
                 }
 
         self.log(
-            f"Discovery done. Found {len(self.discoveredDevices) if self.discoveredDevices else 0} devices on {len(_networks) if _networks else 0} BACnet networks.",
+            f"Discovery done. Found {len(self.discoveredDevices) if self.discoveredDevices else 0} devices "
+            f"on {len(_networks) if _networks else 0} BACnet networks.",
             level="info",
         )
@@ -0,0 +1,129 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+DeviceInfoCache.py - address -> device information, in front of bacpypes3
+
+Before each request, bacpypes3 needs to know the device (max APDU, segmentation,
+vendor...). When it doesn't, a Who-Is is sent to the address and the request
+waits for the I-Am. This cache keeps the answer for a while, remembers devices
+that did not answer (so an unreachable device doesn't cost a Who-Is timeout on
+every read) and sends only one Who-Is per address at a time, whatever the
+number of requests waiting for it.
+"""
+# --- standard Python modules ---
+import asyncio
+import time
+import typing as t
+
+# --- 3rd party modules ---
+from bacpypes3.app import Application, DeviceInfo
+from bacpypes3.pdu import Address
+
+# --- this application's modules ---
+from ..utils.notes import note_and_log
+from .IOExceptions import NoResponseFromController
+
+# ------------------------------------------------------------------------------
+
+DEVICE_INFO_TTL = 300  # seconds
+NO_RESPONSE_TTL = 30  # seconds
+WHOIS_TIMEOUT = 3  # seconds
+
+
+@note_and_log
+class DeviceInfoCache:
+    """
+    BAC0 level cache of device information, indexed by address.
+
+    :param ttl: (int) seconds a known device is trusted before asking again
+    :param no_response_ttl: (int) seconds a device that did not answer a Who-Is
+        is considered unreachable
+    :param timeout: (int) Who-Is timeout
+
+    *Example*::
+
+        info = await bacnet._device_info_cache.get(bacnet.this_application.app, Address('2:5'))
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEVICE_INFO_TTL,
+        no_response_ttl: float = NO_RESPONSE_TTL,
+        timeout: float = WHOIS_TIMEOUT,
+    ) -> None:
+        self.ttl = ttl
+        self.no_response_ttl = no_response_ttl
+        self.timeout = timeout
+        self._entries: t.Dict[Address, t.Tuple[float, t.Optional[DeviceInfo]]] = {}
+        self._pending: t.Dict[Address, asyncio.Future] = {}
+
+    async def get(self, app: Application, address: Address) -> DeviceInfo:
+        """
+        Return the device information for address.
+
+        :raises NoResponseFromController: if the device didn't answer the last
+            Who-Is sent to it (for no_response_ttl seconds)
+        """
+        if not isinstance(address, Address):
+            address = Address(address)
+        try:
+            expires, info = self._entries[address]
+        except KeyError:
+            pass
+        else:
+            if time.monotonic() < expires:
+                if info is None:
+                    raise NoResponseFromController(
+                        f"{address} did not answer a recent Who-Is"
+                    )
+                return info
+            del self._entries[address]
+
+        try:
+            pending = self._pending[address]
+        except KeyError:
+            pending = asyncio.ensure_future(self._lookup(app, address))
+            self._pending[address] = pending
+            pending.add_done_callback(
+                lambda _, address=address: self._pending.pop(address, None)
+            )
+        # shield : a cancelled reader must not cancel the Who-Is of the others
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, app: Application, address: Address) -> DeviceInfo:
+        info = await app.device_info_cache.get_device_info(address)
+        if info is None:
+            self.log(f"Who-Is {address}", level="debug")
+            _iams = await app.who_is(address=address, timeout=self.timeout)
+            if _iams:
+                await app.device_info_cache.set_device_info(_iams[0])
+                info = await app.device_info_cache.get_device_info(address)
+        if info is None:
+            self.log(
+                f"No I-Am from {address}, skipping it for {self.no_response_ttl} seconds",
+                level="warning",
+            )
+            self._entries[address] = (time.monotonic() + self.no_response_ttl, None)
+            raise NoResponseFromController(f"No I-Am received from {address}")
+        self.log(f"Device Info Cache : {info}", level="debug")
+        self._entries[address] = (time.monotonic() + self.ttl, info)
+        return info
+
+    def forget(self, address: t.Optional[Address] = None) -> None:
+        """
+        Drop what is known about address (or about every device).
+        """
+        if address is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(address, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"DeviceInfoCache({len(self._entries)} devices | ttl {self.ttl}s | no response ttl {self.no_response_ttl}s)"
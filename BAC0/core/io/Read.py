@@ -17,9 +17,12 @@ Read.py - creation of ReadProperty and ReadPropertyMultiple requests
         ReadProperty()
             def read()
             def readMultiple()
+            def read_value()
+            def read_multiple_values()
 
 """
 
+import asyncio
 import re
 
 # --- standard Python modules ---
@@ -41,7 +44,7 @@ from bacpypes3.apdu import (
     RejectPDU,
     RejectReason,
 )
-from bacpypes3.app import Application
+from bacpypes3.app import Application, DeviceInfo
 from bacpypes3.basetypes import (
     DateTime,
     PropertyIdentifier,
@@ -51,6 +54,7 @@ from bacpypes3.basetypes import (
 )
 from bacpypes3.errors import NoResponse, ObjectError
 from bacpypes3.object import get_vendor_info
+from bacpypes3.vendor import VendorInfo
 
 # --- 3rd party modules ---
 from bacpypes3.pdu import Address
@@ -63,6 +67,7 @@ from ..utils.notes import note_and_log
 # --- this application's modules ---
 from .IOExceptions import (
     ApplicationNotStarted,
+    BufferOverflow,
     NoResponseFromController,
     ReadRangeException,
     SegmentationNotSupported,
@@ -114,9 +119,6 @@ class ReadProperty:
         if not self._started:
             raise ApplicationNotStarted("BACnet stack not running - use startApp()")
 
-        _this_application: BAC0Application = self.this_application
-        _app: Application = _this_application.app
-
         args_split = args.split()
 
         (
@@ -129,63 +131,128 @@ class ReadProperty:
         )
 
         self.log_title("Read property", args_split)
-        # Do I know you ?
-        dic = await self.this_application.app.device_info_cache.get_device_info(
-            device_address
+        return await self.read_value(
+            device_address,
+            object_identifier,
+            property_identifier,
+            arr_index=property_array_index,
+            vendor_id=vendor_id,
         )
-        if dic is None:
-            _iam = await self.this_application.app.who_is(address=device_address)
-            try:
-                await self.this_application.app.device_info_cache.set_device_info(
-                    _iam[0]
-                )
-            except IndexError:
-                self.log(
-                    f"Trouble with Iam... Response received from {device_address} = {_iam}",
-                    level="error",
-                )
-                if _iam == []:
-                    raise NoResponseFromController
-            dic = await self.this_application.app.device_info_cache.get_device_info(
-                device_address
+
+    async def read_value(
+        self,
+        address: t.Union[Address, str],
+        object_identifier: t.Union[ObjectIdentifier, t.Tuple[str, int], str],
+        property_identifier: t.Union[PropertyIdentifier, str, int],
+        arr_index: t.Optional[int] = None,
+        vendor_id: int = 0,
+    ) -> t.Union[ReadValue, None]:
+        """
+        Send a ReadProperty request built from BACnet identifiers, wait for the
+        answer and return the value. Nothing is formatted or parsed so this is
+        the one to use when addresses and identifiers are already known.
+
+        :param address: Address of the device (or str)
+        :param object_identifier: ObjectIdentifier (or a tuple like ('analogInput', 1))
+        :param property_identifier: PropertyIdentifier (or str / int)
+        :param arr_index: optional array index
+        :param vendor_id: used to resolve proprietary identifiers given as str
+        :returns: data read from device
+
+        *Example*::
+
+            await bacnet.read_value(
+                Address('2:5'),
+                ObjectIdentifier('analogInput:1'),
+                PropertyIdentifier('presentValue'),
+            )
+        """
+        if not self._started:
+            raise ApplicationNotStarted("BACnet stack not running - use startApp()")
+
+        _this_application: BAC0Application = self.this_application
+        _app: Application = _this_application.app
+
+        device_address, object_identifier, property_identifier = _bacnet_identifiers(
+            address, object_identifier, property_identifier, vendor_id=vendor_id
+        )
+        # The same read already sent by someone else ? Wait for its answer.
+        return await self._single_flight(
+            (device_address, object_identifier, property_identifier, arr_index),
+            self._read_property,
+            _app,
+            device_address,
+            object_identifier,
+            property_identifier,
+            arr_index,
+        )
+
+    async def _single_flight(self, key: t.Hashable, fn, *args) -> t.Any:
+        """
+        Run fn(*args) unless a request with the same key is in flight, in which
+        case the answer of that request is shared.
+        """
+        try:
+            pending = self._requests_in_flight[key]
+        except KeyError:
+            pending = asyncio.ensure_future(fn(*args))
+            self._requests_in_flight[key] = pending
+            pending.add_done_callback(
+                lambda _, key=key: self._requests_in_flight.pop(key, None)
             )
-            self.log(f"Device Info Cache : {dic}", level="debug")
+        # shield : a cancelled caller must not cancel the request of the others
+        return await asyncio.shield(pending)
+
+    async def _read_property(
+        self,
+        _app: Application,
+        device_address: Address,
+        object_identifier: ObjectIdentifier,
+        property_identifier: PropertyIdentifier,
+        arr_index: t.Optional[int],
+    ) -> t.Union[ReadValue, None]:
+        # Do I know you ?
+        await self._device_info_cache.get(_app, device_address)
         try:
             response = await _app.read_property(
                 device_address,
                 object_identifier,
                 property_identifier,
-                property_array_index,
+                arr_index,
             )
 
         except ErrorRejectAbortNack as err:
             response = err
 
             if "unknown-property" in str(err.reason):
-                if "description" in args:
+                if property_identifier == PropertyIdentifier.description:
                     self._log.warning(
                         "The description property is not implemented in the device. "
                         "Using a default value for internal needs."
                     )
                     return "n/a"
-                elif "inactiveText" in args:
+                elif property_identifier == PropertyIdentifier.inactiveText:
                     self._log.warning(
                         "The inactiveText property is not implemented in the device. "
                         "Using a default value of Off for internal needs."
                     )
                     return "False"
-                elif "activeText" in args:
+                elif property_identifier == PropertyIdentifier.activeText:
                     self._log.warning(
                         "The activeText property is not implemented in the device. "
                         "Using a default value of On for internal needs."
                     )
                     return "True"
                 else:
-                    raise UnknownPropertyError(f"Unknown property {args}")
+                    raise UnknownPropertyError(
+                        f"Unknown property {device_address} {object_identifier} {property_identifier}"
+                    )
             else:
                 self.log(f"Error : {err}", level="error")
         except ObjectError:
-            raise UnknownObjectError(f"Unknown object {args}")
+            raise UnknownObjectError(
+                f"Unknown object {device_address} {object_identifier}"
+            )
 
         # except bufferOverflow
         except NoResponse:
@@ -236,9 +303,6 @@ class ReadProperty:
         if not self._started:
             raise ApplicationNotStarted("BACnet stack not running - use startApp()")
 
-        _this_application: BAC0Application = self.this_application
-        _app: Application = _this_application.app
-
         if request_dict is not None:
             address, parameter_list = await self.build_rpm_request_from_dict(
                 request_dict, vendor_id
@@ -256,43 +320,13 @@ class ReadProperty:
             )
             self.log_title("Read Multiple", args_list)
 
-        # Force DeviceInfoCache
-        dic = await self.this_application.app.device_info_cache.get_device_info(address)
-        if dic is None:
-            _iam = await self.this_application.app.who_is(address=address)
-            await self.this_application.app.device_info_cache.set_device_info(_iam[0])
-            dic = await self.this_application.app.device_info_cache.get_device_info(
-                address
-            )
-            self.log(f"Device Info Cache : {dic}", level="debug")
-
         values = []
         dict_values = {}
 
-        self.log(f"Parameter list : {parameter_list}", level="debug")
-
-        try:
-            # build an ReadPropertyMultiple request
-            response = await _app.read_property_multiple(address, parameter_list)
-            self.log(f"Response : {response}", level="debug")
-
-        except ErrorRejectAbortNack as err:
-            # construction error
-            response = err
-            self._log.exception(f"exception: {err.reason}")
-            if "segmentation-not-supported" in str(err.reason):
-                raise SegmentationNotSupported
-            if "unrecognized-service" in str(err.reason):
-                raise UnrecognizedService()
-            if "unknown-object" in str(err.reason):
-                self.log(f"Unknown object {args}", level="warning")
-                raise UnknownObjectError(f"Unknown object {args}")
-            if "unknown-property" in str(err.reason):
-                values.append("")  # type: ignore[arg-type]
-                return values
-            if "no-response" in str(err.reason):
-                values.append("")  # type: ignore[arg-type]
-                return values
+        response = await self._read_property_multiple(address, parameter_list)
+        if response is None:
+            values.append("")  # type: ignore[arg-type]
+            return values
 
         if not isinstance(response, ErrorRejectAbortNack):
             """
@@ -333,6 +367,153 @@ class ReadProperty:
 
         return values
 
+    async def read_multiple_values(
+        self,
+        address: t.Union[Address, str],
+        specs: t.List[t.Tuple[t.Any, t.List[t.Any]]],
+        vendor_id: int = 0,
+        show_property_name: bool = False,
+    ) -> t.List[t.Any]:
+        """
+        Send a ReadPropertyMultiple request built from BACnet identifiers and
+        return the values, in the order of the request.
+
+        :param address: Address of the device (or str)
+        :param specs: list of (object_identifier, [property, ...]) where each
+            property is a PropertyIdentifier, a (PropertyIdentifier, index) tuple
+            or a PropertyReference
+        :param vendor_id: used to resolve proprietary identifiers given as str
+        :param show_property_name: if True, values are (value, property_identifier)
+        :returns: list of values ("" for an unknown property or no response)
+
+        *Example*::
+
+            await bacnet.read_multiple_values(
+                Address('2:5'),
+                [
+                    (ObjectIdentifier('analogInput:1'), [PropertyIdentifier('presentValue')]),
+                    (ObjectIdentifier('analogInput:2'), [PropertyIdentifier('presentValue'), PropertyIdentifier('units')]),
+                ],
+            )
+        """
+        vendor_info = get_vendor_info(vendor_id)
+        parameter_list: t.List = []
+        for object_identifier, properties in specs:
+            (
+                device_address,
+                object_identifier,
+                _,
+            ) = _bacnet_identifiers(address, object_identifier, None, vendor_id)
+            references = []
+            for prop in properties:
+                if isinstance(prop, PropertyReference):
+                    references.append(prop)
+                elif isinstance(prop, tuple):
+                    prop, idx = prop
+                    references.append(
+                        PropertyReference(
+                            propertyIdentifier=_property_identifier(prop, vendor_info),
+                            propertyArrayIndex=idx,
+                        )
+                    )
+                else:
+                    references.append(_property_identifier(prop, vendor_info))
+            parameter_list.append(object_identifier)
+            parameter_list.append(references)
+        if not parameter_list:
+            raise ValueError("object identifier expected")
+
+        response = await self._read_property_multiple(_address(address), parameter_list)
+        if response is None:
+            return [""]
+        if isinstance(response, ErrorRejectAbortNack):
+            return []
+        if show_property_name:
+            return [(value, prop_id) for _, prop_id, _, value in response]
+        return [value for _, _, _, value in response]
+
+    async def _device_info(self, address: Address) -> DeviceInfo:
+        """
+        Device information (max APDU, segmentation, vendor...) known for address.
+        A Who-Is is sent if needed.
+        """
+        return await self._device_info_cache.get(self.this_application.app, address)
+
+    async def _read_property_multiple(
+        self,
+        address: Address,
+        parameter_list: t.List,
+        vendor_info: t.Optional[VendorInfo] = None,
+    ) -> t.Union[t.List[t.Tuple], ErrorRejectAbortNack, None]:
+        """
+        Send a ReadPropertyMultiple request made of an already built parameter
+        list (as returned by build_rpm_request) and return bacpypes3 results.
+
+        This is where compiled read plans enter the stack, no parsing is
+        done here. Providing vendor_info saves a lookup in bacpypes3.
+
+        :returns: list of (object_identifier, property_identifier, property_array_index, value),
+            None if the property or the device didn't answer, or the error
+            received.
+        :raises NoResponseFromController: if the device didn't answer Who-Is
+        """
+        if not self._started:
+            raise ApplicationNotStarted("BACnet stack not running - use startApp()")
+
+        _this_application: BAC0Application = self.this_application
+        _app: Application = _this_application.app
+
+        key = (address, tuple(_hashable(each) for each in parameter_list))
+        return await self._single_flight(
+            key,
+            self._send_read_property_multiple,
+            _app,
+            address,
+            parameter_list,
+            vendor_info,
+        )
+
+    async def _send_read_property_multiple(
+        self,
+        _app: Application,
+        address: Address,
+        parameter_list: t.List,
+        vendor_info: t.Optional[VendorInfo],
+    ) -> t.Union[t.List[t.Tuple], ErrorRejectAbortNack, None]:
+        # Force DeviceInfoCache ; a device that doesn't answer Who-Is raises
+        # NoResponseFromController, it's not an empty read
+        await self._device_info_cache.get(_app, address)
+
+        self.log(f"Parameter list : {parameter_list}", level="debug")
+
+        try:
+            # build an ReadPropertyMultiple request
+            response = await _app.read_property_multiple(
+                address, parameter_list, vendor_info=vendor_info
+            )
+            self.log(f"Response : {response}", level="debug")
+
+        except ErrorRejectAbortNack as err:
+            # construction error
+            response = err
+            self._log.exception(f"exception: {err.reason}")
+            if "segmentation-not-supported" in str(err.reason):
+                raise SegmentationNotSupported
+            if "buffer-overflow" in str(err.reason) or "apdu-too-long" in str(
+                err.reason
+            ):
+                raise BufferOverflow
+            if "unrecognized-service" in str(err.reason):
+                raise UnrecognizedService()
+            if "unknown-object" in str(err.reason):
+                self.log(f"Unknown object {parameter_list}", level="warning")
+                raise UnknownObjectError(f"Unknown object {parameter_list}")
+            if "unknown-property" in str(err.reason):
+                return None
+            if "no-response" in str(err.reason):
+                return None
+        return response
+
     def build_rp_request(
         self, args: t.List[str], arr_index=None, vendor_id: int = 0, bacoid=None
     ) -> t.Tuple:
@@ -693,7 +874,9 @@ class ReadProperty:
         return value
 
     async def read_priority_array(self, addr, obj, obj_instance) -> t.List:
-        pa = await self.read(f"{addr} {obj} {obj_instance} priorityArray")
+        pa = await self.read_value(
+            addr, (obj, int(obj_instance)), PropertyIdentifier.priorityArray
+        )
         res = [pa]
         for each in range(1, 17):
             _pa = pa[each]  # type: ignore[index]
@@ -703,6 +886,59 @@ class ReadProperty:
         return res
 
 
+def _address(address: t.Union[Address, str]) -> Address:
+    return address if isinstance(address, Address) else Address(address)
+
+
+def _property_identifier(
+    prop: t.Union[PropertyIdentifier, str, int], vendor_info: VendorInfo
+) -> PropertyIdentifier:
+    if isinstance(prop, PropertyIdentifier):
+        return prop
+    if isinstance(prop, str):
+        if prop.isdigit():
+            prop = int(prop)
+        elif "@prop_" in prop:
+            prop = int(prop.split("_")[1])
+    return vendor_info.property_identifier(prop)
+
+
+def _hashable(parameter: t.Any) -> t.Hashable:
+    if isinstance(parameter, list):
+        return tuple(_hashable(each) for each in parameter)
+    if isinstance(parameter, PropertyReference):
+        return (parameter.propertyIdentifier, parameter.propertyArrayIndex)
+    return parameter
+
+
+def _bacnet_identifiers(
+    address: t.Union[Address, str],
+    object_identifier: t.Union[ObjectIdentifier, t.Tuple, str],
+    property_identifier: t.Union[PropertyIdentifier, str, int, None],
+    vendor_id: int = 0,
+) -> t.Tuple[Address, ObjectIdentifier, t.Optional[PropertyIdentifier]]:
+    """
+    Accept BACnet identifiers (used as is) or their usual str / tuple form.
+    """
+    if (
+        isinstance(address, Address)
+        and isinstance(object_identifier, ObjectIdentifier)
+        and (
+            property_identifier is None
+            or isinstance(property_identifier, PropertyIdentifier)
+        )
+    ):
+        return (address, object_identifier, property_identifier)
+    vendor_info = get_vendor_info(vendor_id)
+    if not isinstance(object_identifier, ObjectIdentifier):
+        if isinstance(object_identifier, str):
+            object_identifier = object_identifier.replace(":", ",")
+        object_identifier = vendor_info.object_identifier(object_identifier)
+    if property_identifier is not None:
+        property_identifier = _property_identifier(property_identifier, vendor_info)
+    return (_address(address), object_identifier, property_identifier)
+
+
 def find_reason(apdu):
     try:
         if apdu is TimeoutError:
@@ -16,10 +16,12 @@ Write.py - creation of WriteProperty requests
 
         WriteProperty()
             def write()
+            def write_value()
 
 
 """
 import re
+import typing as t
 
 from bacpypes3.apdu import (
     ErrorRejectAbortNack,
@@ -43,6 +45,7 @@ from .IOExceptions import (
     NoResponseFromController,
     WritePropertyException,
 )
+from .Read import _bacnet_identifiers
 
 # ------------------------------------------------------------------------------
 
@@ -87,9 +90,6 @@ class WriteProperty:
         if not self._started:
             raise ApplicationNotStarted("BACnet stack not running - use startApp()")
 
-        _this_application: BAC0Application = self.this_application
-        _app: Application = _this_application.app
-
         self.log_title("Write property", args)
 
         (
@@ -101,23 +101,72 @@ class WriteProperty:
             priority,
         ) = self.build_wp_request(args)
 
+        await self.write_value(
+            device_address,
+            object_identifier,
+            property_identifier,
+            value,
+            arr_index=property_array_index,
+            priority=priority,
+        )
+
+    async def write_value(
+        self,
+        address: t.Union[Address, str],
+        object_identifier: t.Union[ObjectIdentifier, t.Tuple[str, int], str],
+        property_identifier: t.Union[PropertyIdentifier, str, int],
+        value: t.Any,
+        arr_index: t.Optional[int] = None,
+        priority: t.Optional[int] = None,
+        vendor_id: int = 0,
+    ) -> None:
+        """
+        Send a WriteProperty request built from BACnet identifiers and wait for
+        the answer. The value is given as is (a float, an int, a str, a bacpypes3
+        primitive...) and cast by bacpypes3 to the datatype of the property.
+        Use "null" or Null(()) to relinquish a priority.
+
+        *Example*::
+
+            await bacnet.write_value(
+                Address('2:5'),
+                ObjectIdentifier('analogValue:1'),
+                PropertyIdentifier('presentValue'),
+                100,
+                priority=8,
+            )
+        """
+        if not self._started:
+            raise ApplicationNotStarted("BACnet stack not running - use startApp()")
+
+        _this_application: BAC0Application = self.this_application
+        _app: Application = _this_application.app
+
+        device_address, object_identifier, property_identifier = _bacnet_identifiers(
+            address, object_identifier, property_identifier, vendor_id=vendor_id
+        )
+        if isinstance(value, str) and value == "null":
+            value = Null(())
+
         try:
-            response = await _app.write_property(
+            await _app.write_property(
                 device_address,
                 object_identifier,
                 property_identifier,
                 value,
-                property_array_index,
+                arr_index,
                 priority,
             )
 
         except ErrorRejectAbortNack as err:
             self.log(f"exception: {err!r}", level="error")
-            raise NoResponseFromController(f"APDU Abort Reason : {response}")
+            raise NoResponseFromController(f"APDU Abort Reason : {err}")
 
         except ValueError as err:
             self.log(f"exception: {err!r}", level="error")
-            raise ValueError(f"Invalid value for property : {err} | {response}")
+            raise ValueError(
+                f"Invalid value for property : {err} | {object_identifier} {property_identifier} {value}"
+            )
 
         except WritePropertyException as error:
             # construction error
@@ -1,6 +1,6 @@
 import importlib.util
 from types import ModuleType
-from typing import Type
+from typing import Any, Callable, Tuple, Union
 
 
 # Function to dynamically import a module
@@ -55,7 +55,9 @@ def influxdb_if_available():
     return (_INFLUXDB, influxdb_client)
 
 
-def pandas_if_available() -> tuple[bool, Type, ModuleType, ModuleType]:
+def pandas_if_available() -> (
+    Tuple[bool, Any, Union[ModuleType, Callable], Callable[..., Any]]
+):
     global _PANDAS
     if not check_dependencies(["pandas"]):
         _PANDAS = False
@@ -64,14 +66,7 @@ def pandas_if_available() -> tuple[bool, Type, ModuleType, ModuleType]:
     try:
         pd = import_module("pandas")
         sql = import_module("pandas.io.sql")
-        Timestamp = None
-        timestamp_spec = importlib.util.find_spec("pandas.Timestamp")
-        if timestamp_spec is not None:
-            Timestamp = pd.Timestamp
-        else:
-            timestamp_lib_spec = importlib.util.find_spec("pandas.lib.Timestamp")
-            if timestamp_lib_spec is not None:
-                Timestamp = import_module("pandas.lib").Timestamp
+        Timestamp = pd.Timestamp
 
         _PANDAS = True
 
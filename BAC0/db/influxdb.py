@@ -1,14 +1,18 @@
+import asyncio
+import random
+import typing as t
 from datetime import datetime
 
-import pytz
-
 from ..core.utils.lookfordependency import influxdb_if_available
 from ..core.utils.notes import note_and_log
+from .lineprotocol import LineEncoder
+from .samples import DEFAULT_QUEUE_SIZE, SampleQueue
+from .spill import SEGMENT_SIZE, SpillLog
 
 
 _INFLUX, _ = influxdb_if_available()
 if _INFLUX:
-    from influxdb_client import Point, WriteOptions
+    from influxdb_client import WriteOptions
     from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
 else:
     raise ImportError("Install influxdb to use this feature")
@@ -33,6 +37,25 @@ class InfluxDB:
     username (str): The username for authentication with the InfluxDB server.
     password (str): The password for authentication with the InfluxDB server.
     client (InfluxDBClientAsync): The client for interacting with the InfluxDB server.
+
+    One client (and one write API) is kept open for the life of the instance.
+    Readings are added to a bounded queue (see add_sample, queue_size and
+    queue_policy). A background writer (see start()) turns them into line
+    protocol and writes them in batches following the WriteOptions : a batch
+    is sent when batch_size readings are waiting or every flush_interval
+    (+ jitter_interval), failed writes are retried (retry_interval,
+    exponential_base, max_retry_delay, max_retries). close() writes what is
+    left.
+
+    Nothing is written to disk by default : with the default "drop_oldest"
+    policy, readings that don't fit in the queue during an outage are lost,
+    oldest first. Set queue_policy = "spill" in the parameters to keep them.
+
+    With the "spill" policy, batches that can't be written and readings not
+    fitting in the queue go to a spill log on disk (spill_directory, in
+    segments of spill_segment_size bytes). Once _health() succeeds again,
+    the log is written back oldest first, at replay_rate lines per second,
+    each segment being deleted when all its lines are written.
     """
 
     url = None
@@ -44,7 +67,7 @@ class InfluxDB:
     tags_file = None
     username = None
     password = None
-    client: InfluxDBClientAsync
+    client: t.Optional[InfluxDBClientAsync] = None
 
     def __init__(self, params):
         for k, v in params.items():
@@ -52,8 +75,25 @@ class InfluxDB:
         if self.bucket is None:
             raise ValueError("Missing bucket name, please provide one in db_params")
         # self.connect_to_db()
-        self.points = []
-        self.write_options = WriteOptions(
+        self.queue: SampleQueue = SampleQueue(
+            capacity=getattr(self, "queue_size", DEFAULT_QUEUE_SIZE),
+            policy=getattr(self, "queue_policy", "drop_oldest"),
+        )
+        self.spill_log: t.Optional[SpillLog] = (
+            SpillLog(
+                getattr(self, "spill_directory", f"{self.bucket}_spill"),
+                segment_size=getattr(self, "spill_segment_size", SEGMENT_SIZE),
+            )
+            if self.queue.policy == "spill"
+            else None
+        )
+        # measurement and tag set of each point, escaped once
+        self._encoder: LineEncoder = LineEncoder()
+        # lines per second when writing the spill log back
+        self.replay_rate: float = getattr(self, "replay_rate", 2_000)
+        # writes are failing, waiting for _health()
+        self._outage: bool = False
+        self.write_options: WriteOptions = WriteOptions(
             batch_size=getattr(self, "batch_size", 25),
             flush_interval=getattr(self, "flush_interval", 10_000),
             jitter_interval=getattr(self, "jitter_interval", 2_000),
@@ -62,6 +102,159 @@ class InfluxDB:
             max_retry_delay=getattr(self, "max_retry_delay", 30_000),
             exponential_base=getattr(self, "exponential_base", 2),
         )
+        self.client = None
+        self._write_api: t.Any = None
+        self._writer_task: t.Optional[asyncio.Task] = None
+        self._batch_ready: asyncio.Event = asyncio.Event()
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+    def _connect(self) -> InfluxDBClientAsync:
+        """
+        The client of this instance, created on first use.
+        """
+        if self.client is None:
+            self.client = InfluxDBClientAsync.from_env_properties()
+            self._write_api = self.client.write_api()
+        return self.client
+
+    def start(self) -> None:
+        """
+        Start the background writer.
+        """
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer())
+
+    async def _writer(self) -> None:
+        options = self.write_options
+        while True:
+            timeout = (
+                options.flush_interval + random.uniform(0, options.jitter_interval)
+            ) / 1000
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                if self.spill_log is not None and (self._outage or self.spill_log):
+                    if await self._healthy():
+                        self._outage = False
+                        await self._replay()
+                await self.flush()
+            except Exception as error:
+                self.log(f"Error while writing to db: {error}", level="error")
+
+    async def flush(self) -> bool:
+        """
+        Write the waiting readings, batch_size readings per request.
+
+        Returns:
+        bool: False if readings are still waiting or were spilled (write
+        failed after retries).
+        """
+        async with self._flush_lock:
+            if self.spill_log is not None:
+                self._spill(self.encode(self.queue.get_overflow()))
+                if self._outage:
+                    # database not back yet, straight to disk
+                    self._spill(self.encode(self.queue.get_batch(len(self.queue))))
+                    return False
+            batch_size = max(1, self.write_options.batch_size)
+            while self.queue:
+                samples = self.queue.get_batch(batch_size)
+                lines = self.encode(samples)
+                if lines and not await self._write_batch(lines):
+                    self._outage = True
+                    if self.spill_log is not None:
+                        self._spill(lines)
+                    else:
+                        # back in front of the queue, for the next flush
+                        self.queue.requeue(samples)
+                    return False
+            return True
+
+    def _spill(self, lines) -> None:
+        if not lines:
+            return
+        try:
+            self.spill_log.append(lines)
+            self.log(
+                f"{len(lines)} readings saved to {self.spill_log.directory}",
+                level="warning",
+            )
+        except OSError as error:
+            self.log(
+                f"Error while saving to {self.spill_log.directory}: {error}",
+                level="error",
+            )
+
+    async def _healthy(self) -> bool:
+        try:
+            return await self._health()
+        except Exception as error:
+            self.log(f"InfluxDB not available: {error}", level="debug")
+            return False
+
+    async def _replay(self) -> bool:
+        """
+        Write the spill log back, oldest segment first, at replay_rate lines
+        per second. A segment is deleted once written. If a write fails, the
+        segment is kept and will be written again from its start (InfluxDB
+        overwrites identical points, nothing is duplicated).
+        """
+        batch_size = max(1, self.write_options.batch_size)
+        for segment in self.spill_log.segments(close=True):
+            lines = self.spill_log.read(segment)
+            for start in range(0, len(lines), batch_size):
+                end = start + batch_size
+                batch = lines[start:end]
+                if not await self.write(self.bucket, "\n".join(batch)):
+                    self._outage = True
+                    return False
+                await asyncio.sleep(len(batch) / self.replay_rate)
+            self.spill_log.acknowledge(segment)
+            self.log(f"{len(lines)} spilled readings written to db", level="info")
+        return True
+
+    async def _write_batch(self, batch) -> bool:
+        options = self.write_options
+        delay = options.retry_interval / 1000
+        for attempt in range(options.max_retries + 1):
+            if await self.write(self.bucket, "\n".join(batch)):
+                return True
+            if attempt < options.max_retries:
+                await asyncio.sleep(delay)
+                delay = min(
+                    delay * options.exponential_base, options.max_retry_delay / 1000
+                )
+        return False
+
+    async def close(self) -> None:
+        """
+        Stop the writer, write what is left and close the client.
+        """
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        if self.spill_log is not None:
+            self._spill(self.encode(self.queue.get_overflow()))
+        if self.client is not None:
+            if self.queue:
+                # no retries, we are leaving
+                lines = self.encode(self.queue.get_batch(len(self.queue)))
+                if not await self.write(self.bucket, "\n".join(lines)):
+                    if self.spill_log is not None:
+                        self._spill(lines)
+                    else:
+                        self.log(
+                            f"{len(lines)} readings not written to db", level="error"
+                        )
+            await self.client.close()
+            self.client = self._write_api = None
 
     async def write(self, bucket: str, record) -> bool:
         """
@@ -79,25 +272,23 @@ class InfluxDB:
         Raises:
         Exception: If an error occurs while writing to the database.
         """
-        async with InfluxDBClientAsync.from_env_properties() as client:
-            try:
-                self.log(f"Write called for record: {record}", level="debug")
-                write_api = client.write_api()
-                success = await write_api.write(
-                    bucket=bucket, org=self.org, record=record
-                )
-                self.log(f"Write response: {success}", level="debug")
-                return success
-            except Exception as error:
-                self.log(f"Error while writing{record} to db: {error}", level="error")
-                return False
+        self._connect()
+        try:
+            self.log(f"Write called for record: {record}", level="debug")
+            success = await self._write_api.write(
+                bucket=bucket, org=self.org, record=record
+            )
+            self.log(f"Write response: {success}", level="debug")
+            return success
+        except Exception as error:
+            self.log(f"Error while writing{record} to db: {error}", level="error")
+            return False
 
     async def query(self, query: str) -> list:
-        async with InfluxDBClientAsync.from_env_properties() as client:
-            query_api = client.query_api()
-            records = await query_api.query_stream(query)
-            async for record in records:
-                yield record
+        query_api = self._connect().query_api()
+        records = await query_api.query_stream(query)
+        async for record in records:
+            yield record
 
     async def delete(
         self,
@@ -131,21 +322,21 @@ class InfluxDB:
         """
         if bucket is None:
             bucket = self.bucket
-        async with InfluxDBClientAsync.from_env_properties() as client:
-            try:
-                start = start
-                stop = stop
-                # Delete data with location = 'Prague'
-                successfully = await client.delete_api().delete(
-                    start=start,
-                    stop=stop,
-                    bucket=bucket,
-                    predicate=f'{predicate} = "{value}"',
-                )
-                return successfully
-            except Exception as error:
-                self.log(f"Error while deleting from db: {error}", level="error")
-                return False
+        client = self._connect()
+        try:
+            start = start
+            stop = stop
+            # Delete data with location = 'Prague'
+            successfully = await client.delete_api().delete(
+                start=start,
+                stop=stop,
+                bucket=bucket,
+                predicate=f'{predicate} = "{value}"',
+            )
+            return successfully
+        except Exception as error:
+            self.log(f"Error while deleting from db: {error}", level="error")
+            return False
 
     async def _health(self) -> bool:
         """
@@ -160,109 +351,62 @@ class InfluxDB:
         Raises:
         Exception: If an error occurs while pinging the server.
         """
-        async with InfluxDBClientAsync.from_env_properties() as client:
-            ready = await client.ping()
-            if ready:
-                self.log("InfluxDB connection is ready", level="info")
-                return True
-            else:
-                self.log("InfluxDB connection is not ready", level="error")
-                return False
-
-    def clean_value(self, object_type, val, units_state):
+        ready = await self._connect().ping()
+        if ready:
+            self.log("InfluxDB connection is ready", level="info")
+            return True
+        else:
+            self.log("InfluxDB connection is not ready", level="error")
+            return False
+
+    def add_sample(self, point, timestamp: float, value) -> None:
         """
-        Cleans and formats the value based on the object type.
-
-        This method checks the object type and formats the value accordingly. If the object type contains "analog",
-        the value is formatted to a string with three decimal places and the units state. If the object type contains "multi",
-        the value is split on ":" and the second part is used.
-
-        Parameters:
-        object_type (str): The type of the object.
-        val: The value to be cleaned.
-        units_state: The units state of the object.
-
-        Returns:
-        tuple: A tuple containing the cleaned string value and the original value.
-
-        Raises:
-        Exception: If an error occurs while cleaning the value.
+        A new reading of a point (called by Point._trend). It is only queued,
+        encoding is left to the writer.
         """
-        try:
-            if "analog" in object_type:
-                _string_value = f"{val:.3f} {units_state}"
-                _value = val
-            elif "multi" in object_type:
-                _string_value = f"{val.split(':')[1]}"
-                _value = int(val.split(":")[0])
-            elif "binary" in object_type:
-                try:
-                    _string_value = f"{units_state[int(val.split(':'[0]))]}"
-                except Exception:
-                    try:
-                        _value, _string_value = val.split(":")
-                        _value = int(_value)
-                    except Exception as error:
-                        self._log.error(
-                            f"Error while cleaning value {val} of object type {object_type}: {error}"
-                        )
-            else:
-                _string_value = f"{val}"
-                _value = val
-            return (_value, _string_value)
-        except AttributeError as error:
-            self._log.error(
-                f"Error while cleaning value {val} of object type {object_type}: {error}"
-            )
+        self.queue.put(point, timestamp, value)
+        if len(self.queue) >= self.write_options.batch_size:
+            self._batch_ready.set()
 
     def prepare_point(self, list_of_points):
-        _points = []
-
+        """
+        Queue the last value of points (points never read are skipped).
+        """
         for point in list_of_points:
-            _object_name = point.properties.name
-            _devicename = point.properties.device.properties.name
-            _device_id = point.properties.device.properties.device_id
-            _units_state = f"{point.properties.units_state}"
-            _description = point.properties.description
-            _object = f"{point.properties.type}:{point.properties.address}"
-            _value, _string_value = self.clean_value(
-                point.properties.type, point.lastValue, point.properties.units_state
-            )
-            _name = f"{_devicename}/{_object_name}"
-            _id = f"Device_{_device_id}/{_object}"
-            _point = (
-                Point(_id)
-                .tag("object_name", _object_name)
-                .tag("name", _name)
-                .tag("description", _description)
-                .tag("units_state", _units_state)
-                .tag("object", _object)
-                .tag("device", _devicename)
-                .tag("device_id", _device_id)
-                .field("value", _value)
-                .field("string_value", _string_value)
-                .time(point.lastTimestamp.astimezone(pytz.UTC))
-            )
-            for each in point.tags:
-                _tag_id, _tag_value = each
-                _point.tag(_tag_id, _tag_value)
-            self.points.append(_point)
+            timestamp = point.lastTimestamp
+            if timestamp is not None:
+                self.add_sample(point, timestamp.timestamp(), point.lastValue)
+
+    def encode(self, samples) -> t.List[str]:
+        """
+        Line protocol of queued readings (see BAC0.db.lineprotocol).
+        """
+        lines = []
+        encode_one = self._encoder.encode_one
+        for point, timestamp, value in samples:
+            try:
+                lines.append(encode_one(point, timestamp, value))
+            except Exception as error:
+                self.log(
+                    f"Error while encoding {point.properties.name} : {error}",
+                    level="error",
+                )
+        return lines
 
-    async def write_points_lastvalue_to_db(self, list_of_points):
+    async def write_points_lastvalue_to_db(self, list_of_points) -> bool:
         """
-        Writes a list of points to the InfluxDB database.
+        Writes the last value of a list of points to the InfluxDB database,
+        with the readings already waiting in the queue.
 
         Args:
             list_of_points (list): A list of points to be written to the database.
 
         Returns:
-            None
+            bool: False if readings are still waiting or were spilled (see flush)
         """
-
-        self.log(f"Writing to db: {self.points}", level="debug")
-        success = await self.write(self.bucket, self.points)
-        if success:
-            self.points = []
+        self.prepare_point(list_of_points)
+        self.log(f"Writing to db: {self.queue}", level="debug")
+        return await self.flush()
 
     def read_last_value_from_db(self, id=None):
         # example id : Device_5004/analogInput:1
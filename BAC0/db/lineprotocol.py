@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+lineprotocol.py - readings of points as InfluxDB line protocol
+
+Building an influxdb_client Point for each reading (seven tags + the tags of
+the point, escaped again every time) costs much more than the reading
+itself. The measurement and the tag set of a point don't change between
+readings : they are escaped once and kept. Only the fields and the timestamp
+are formatted for each reading.
+
+Like influxdb_client, tags are sorted by key and empty tags are skipped.
+"""
+# --- standard Python modules ---
+import math
+import typing as t
+import weakref
+
+# ------------------------------------------------------------------------------
+
+_MEASUREMENT = str.maketrans({",": "\\,", " ": "\\ ", "\n": "\\n"})
+_TAG = str.maketrans({",": "\\,", "=": "\\=", " ": "\\ ", "\n": "\\n"})
+_STRING = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+
+def escape_measurement(value: t.Any) -> str:
+    return str(value).translate(_MEASUREMENT)
+
+
+def escape_tag(value: t.Any) -> str:
+    return str(value).translate(_TAG)
+
+
+def tag_set(tags: t.Iterable[t.Tuple[t.Any, t.Any]]) -> str:
+    """
+    ",key=value,..." sorted by key, tags without key or value skipped (the
+    last value given for a key is used).
+    """
+    escaped = {}
+    for key, value in tags:
+        if key is None or value is None:
+            continue
+        key, value = escape_tag(key), escape_tag(value)
+        if key and value:
+            escaped[key] = value
+    return "".join(f",{key}={escaped[key]}" for key in sorted(escaped))
+
+
+def field(key: str, value: t.Any) -> t.Optional[str]:
+    """
+    A field (None if the value can't be written : None, NaN, infinite).
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return f"{key}={'true' if value else 'false'}"
+    if isinstance(value, int):
+        return f"{key}={value}i"
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        return f"{key}={value!r}"
+    return f'{key}="{str(value).translate(_STRING)}"'
+
+
+def timestamp_ns(timestamp: float) -> int:
+    # through microseconds : a float can't hold an epoch in ns exactly
+    return round(timestamp * 1_000_000) * 1000
+
+
+class LineEncoder:
+    """
+    Encodes (point, timestamp, value) readings. The measurement and tag set of
+    each point are built the first time and kept until the name, description,
+    units or tags of the point change.
+
+    *Example*::
+
+        encoder = LineEncoder()
+        encoder.encode([(point, time.time(), 21.5)])
+        # ['Device_5/analogInput:0,description=...,units_state=degreesCelsius
+        #   value=21.5,string_value="21.500 degreesCelsius" 1718900000000000000']
+    """
+
+    def __init__(self) -> None:
+        # id(point) -> (weakref to point, key, prefix, kind, units)
+        self._cache: t.Dict[int, t.Tuple[t.Any, t.Tuple, str, str, str]] = {}
+
+    @staticmethod
+    def _key(point: t.Any) -> t.Tuple:
+        properties = point.properties
+        return (
+            properties.name,
+            properties.description,
+            properties.units_state,
+            point.tags,
+            properties.device.properties.name,
+        )
+
+    def _describe(self, point: t.Any) -> t.Tuple[str, str, str]:
+        """
+        Measurement and tag set (escaped), kind of values and units of a
+        point, from the cache when nothing changed.
+        """
+        key = self._key(point)
+        try:
+            ref, cached_key, prefix, kind, units = self._cache[id(point)]
+            if ref() is point and all(a is b for a, b in zip(key, cached_key)):
+                return (prefix, kind, units)
+        except KeyError:
+            pass
+        properties = point.properties
+        device_name = properties.device.properties.name
+        device_id = properties.device.properties.device_id
+        _object = f"{properties.type}:{properties.address}"
+        tags = [
+            ("object_name", properties.name),
+            ("name", f"{device_name}/{properties.name}"),
+            ("description", properties.description),
+            ("units_state", f"{properties.units_state}"),
+            ("object", _object),
+            ("device", device_name),
+            ("device_id", device_id),
+        ]
+        tags.extend(point.tags)
+        prefix = escape_measurement(f"Device_{device_id}/{_object}") + tag_set(tags)
+        if "analog" in properties.type:
+            kind = "analog"
+        elif "multi" in properties.type or "binary" in properties.type:
+            kind = "state"
+        else:
+            kind = "other"
+        units = f"{properties.units_state}"
+        ref = weakref.ref(point, lambda _, oid=id(point): self._cache.pop(oid, None))
+        self._cache[id(point)] = (ref, key, prefix, kind, units)
+        return (prefix, kind, units)
+
+    def encode_one(self, point: t.Any, timestamp: float, value: t.Any) -> str:
+        prefix, kind, units = self._describe(point)
+        if kind == "analog":
+            string_value = f"{value:.3f} {units}"
+        elif kind == "state":
+            # "1: active", "2: Alarm"
+            number, _, string_value = str(value).partition(":")
+            value = int(number)
+        else:
+            string_value = f"{value}"
+        fields = [field("value", value), field("string_value", string_value)]
+        return f"{prefix} {','.join(each for each in fields if each)} {timestamp_ns(timestamp)}"
+
+    def encode(self, samples: t.Iterable[t.Tuple[t.Any, float, t.Any]]) -> t.List[str]:
+        return [
+            self.encode_one(point, timestamp, value)
+            for point, timestamp, value in samples
+        ]
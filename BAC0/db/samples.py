@@ -0,0 +1,131 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+samples.py - readings waiting to be written to a database
+
+Point._trend only adds a (point, timestamp, value) record to a bounded queue.
+Building what the database needs (line protocol, tags...) is done later by
+the writer of the database, in batches.
+
+When the queue is full (database too slow or unavailable), the policy decides :
+
+    - "drop_oldest" : the oldest record is dropped (default)
+    - "drop_newest" : the new record is dropped
+    - "spill" : the oldest record is moved to the overflow, that the writer
+      saves to disk (the overflow is bounded too, its oldest records are
+      dropped)
+"""
+# --- standard Python modules ---
+import typing as t
+from collections import deque
+
+# --- this application's modules ---
+from ..core.utils.notes import note_and_log
+
+# ------------------------------------------------------------------------------
+
+DEFAULT_QUEUE_SIZE = 10_000
+POLICIES = ("drop_oldest", "drop_newest", "spill")
+
+# (point, epoch timestamp, value)
+Sample = t.Tuple[t.Any, float, t.Any]
+
+
+@note_and_log
+class SampleQueue:
+    """
+    Bounded queue of readings.
+
+    :param capacity: (int) records kept
+    :param policy: (str) "drop_oldest", "drop_newest" or "spill"
+
+    *Example*::
+
+        queue = SampleQueue(capacity=3)
+        for i in range(5):
+            queue.put(point, time.time(), i)
+        queue.get_batch(10)     # the last 3 readings
+        queue.dropped           # 2
+    """
+
+    def __init__(
+        self, capacity: int = DEFAULT_QUEUE_SIZE, policy: str = "drop_oldest"
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy {policy} (use one of {POLICIES})")
+        self.capacity = max(1, int(capacity))
+        self.policy = policy
+        self._samples: t.Deque[Sample] = deque()
+        self.overflow: t.Deque[Sample] = deque()
+        self.dropped = 0
+
+    def put(self, point: t.Any, timestamp: float, value: t.Any) -> None:
+        if len(self._samples) >= self.capacity:
+            if self.policy == "drop_newest":
+                self._drop(1)
+                return
+            oldest = self._samples.popleft()
+            if self.policy == "spill":
+                self._to_overflow([oldest])
+            else:
+                self._drop(1)
+        self._samples.append((point, timestamp, value))
+
+    def _to_overflow(self, samples: t.Iterable[Sample]) -> None:
+        self.overflow.extend(samples)
+        extra = len(self.overflow) - self.capacity
+        if extra > 0:
+            for _ in range(extra):
+                self.overflow.popleft()
+            self._drop(extra)
+
+    def _drop(self, count: int) -> None:
+        if not self.dropped:
+            self.log(
+                f"Sample queue full ({self.capacity}), readings are dropped",
+                level="warning",
+            )
+        self.dropped += count
+
+    def get_batch(self, size: int) -> t.List[Sample]:
+        """
+        Take up to size records, oldest first.
+        """
+        size = min(size, len(self._samples))
+        return [self._samples.popleft() for _ in range(size)]
+
+    def get_overflow(self) -> t.List[Sample]:
+        overflow = list(self.overflow)
+        self.overflow.clear()
+        return overflow
+
+    def requeue(self, samples: t.List[Sample]) -> None:
+        """
+        Put back records that couldn't be written, in front of the queue.
+        What doesn't fit follows the policy.
+        """
+        room = self.capacity - len(self._samples)
+        if room < len(samples):
+            cut = len(samples) - room
+            extra, samples = samples[:cut], samples[cut:]
+            if self.policy == "spill":
+                self._to_overflow(extra)
+            else:
+                self._drop(len(extra))
+        self._samples.extendleft(reversed(samples))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def __bool__(self) -> bool:
+        return bool(self._samples)
+
+    def __repr__(self) -> str:
+        return (
+            f"SampleQueue({len(self._samples)}/{self.capacity} | {self.policy} | "
+            f"{len(self.overflow)} in overflow | {self.dropped} dropped)"
+        )
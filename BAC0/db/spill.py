@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+spill.py - readings that couldn't be written to the database, on disk
+
+Lines (line protocol) are appended to numbered segment files in a directory.
+When a segment reaches its maximal size, a new one is started. Once the
+database is back, segments are read back oldest first and each one is deleted
+when all its lines are written.
+
+Nothing is kept in memory : a database outage of hours only costs disk space.
+"""
+# --- standard Python modules ---
+import os
+import typing as t
+
+# --- this application's modules ---
+from ..core.utils.notes import note_and_log
+
+# ------------------------------------------------------------------------------
+
+SEGMENT_SIZE = 4 * 1024 * 1024  # bytes
+SEGMENT_SUFFIX = ".lp"
+
+
+@note_and_log
+class SpillLog:
+    """
+    Append-only log of line protocol, in segments.
+
+    :param directory: (str) where segments are written (created if needed)
+    :param segment_size: (int) bytes per segment before starting a new one
+
+    *Example*::
+
+        log = SpillLog("BAC0_spill")
+        log.append(lines)
+        for segment in log.segments(close=True):
+            if await write(log.read(segment)):
+                log.acknowledge(segment)
+    """
+
+    def __init__(self, directory: str, segment_size: int = SEGMENT_SIZE) -> None:
+        self.directory = directory
+        self.segment_size = segment_size
+        self._current: t.Optional[str] = None
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{number:010d}{SEGMENT_SUFFIX}")
+
+    def _numbers(self) -> t.List[int]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in names
+            if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def append(self, lines: t.Sequence[str]) -> None:
+        if not lines:
+            return
+        if self._current is None or os.path.getsize(self._current) >= (
+            self.segment_size
+        ):
+            self._current = self._next_segment()
+        with open(self._current, "a", encoding="utf-8") as file:
+            file.writelines(f"{line}\n" for line in lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _next_segment(self) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        numbers = self._numbers()
+        path = self._path(numbers[-1] + 1 if numbers else 0)
+        # created now, so it is seen by segments()
+        open(path, "a").close()
+        return path
+
+    def segments(self, close: bool = False) -> t.List[str]:
+        """
+        Segments, oldest first.
+
+        :param close: (bool) the segment being written is closed (the next
+            lines will start a new one) and listed with the others
+        """
+        paths = [self._path(number) for number in self._numbers()]
+        if close:
+            self._current = None
+        elif self._current in paths:
+            paths.remove(self._current)
+        return paths
+
+    def read(self, segment: str) -> t.List[str]:
+        with open(segment, "r", encoding="utf-8") as file:
+            return [line.rstrip("\n") for line in file if line.strip()]
+
+    def acknowledge(self, segment: str) -> None:
+        """
+        Every line of the segment was written : delete it.
+        """
+        if segment == self._current:
+            self._current = None
+        try:
+            os.remove(segment)
+        except FileNotFoundError:
+            pass
+
+    def __bool__(self) -> bool:
+        return bool(self._numbers())
+
+    def __repr__(self) -> str:
+        return f"SpillLog({self.directory} | {len(self._numbers())} segments)"
@@ -12,6 +12,7 @@ import os.path
 
 # --- standard Python modules ---
 import pickle
+from datetime import datetime
 
 # --- 3rd party modules ---
 import aiosqlite
@@ -29,6 +30,37 @@ _PANDAS, pd, sql, Timestamp = pandas_if_available()
 # ------------------------------------------------------------------------------
 
 
+def _quote(name):
+    return '"{}"'.format(str(name).replace('"', '""'))
+
+
+def _sql_value(value):
+    # NumPy scalars are not understood by sqlite3
+    return value.item() if hasattr(value, "item") else value
+
+
+def _local_tz():
+    return datetime.now().astimezone().tzinfo
+
+
+def _utc(timestamp):
+    """
+    The timestamp in UTC (a naive one is local time, like the histories).
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize(_local_tz())
+    return timestamp.tz_convert("UTC")
+
+
+def _same_tz(timestamp, index):
+    """
+    The timestamp, comparable with the (tz-aware or naive) index.
+    """
+    if index.tz is None:
+        return _utc(timestamp).tz_convert(_local_tz()).tz_localize(None)
+    return _utc(timestamp)
+
+
 class SQLMixin(object):
     """
     Use SQL to persist a device's contents.  By saving the device contents to an SQL
@@ -193,8 +225,6 @@ class SQLMixin(object):
         if resampling is None:
             resampling = self.properties.save_resampling
 
-        # Does file exist? If so, append data
-
         def _df_to_backup():
             try:
                 return self.backup_histories_df(resampling=resampling)
@@ -202,46 +232,30 @@ class SQLMixin(object):
                 self.log("Impossible to save right now, error in data", level="error")
                 return pd.DataFrame()
 
-        if os.path.isfile(f"{self.properties.db_name}.db"):
-            try:
-                his = await self._read_from_sql(
-                    'select * from "history"', self.properties.db_name
-                )
-                his.index = his["index"].apply(Timestamp)
-                last = his.index[-1]
-                df_to_backup = _df_to_backup()[last:]
-            except Exception:
-                df_to_backup = _df_to_backup()
-
-        else:
-            self.log("Creating a new backup database", level="debug")
-            df_to_backup = _df_to_backup()
-
-        if df_to_backup is None:
-            return
-        # DataFrames that will be saved to SQL
+        if not os.path.isfile(f"{self.properties.db_name}.db"):
+            self._sql_saved_until = (None, None)
+        # Only the rows newer than the last one saved are appended
         async with aiosqlite.connect(f"{self.properties.db_name}.db") as con:
             try:
-                async with con.execute("SELECT * FROM history") as cursor:
-                    data = await cursor.fetchall()
-                    columns = [description[0] for description in cursor.description]
-                    data = pd.DataFrame(data, columns=columns)
-                    df = pd.concat([data, df_to_backup], sort=True)
-                    sql.to_sql(
-                        df_to_backup,
-                        name="history",
-                        con=con,
-                        index_label="index",
-                        index=True,
-                        if_exists="append",
+                last = await self._last_saved(con)
+                df_to_backup = _df_to_backup()
+                if df_to_backup is None:
+                    return
+                if last is None:
+                    self.log("Creating a new backup database", level="debug")
+                elif not df_to_backup.empty:
+                    df_to_backup = df_to_backup[
+                        df_to_backup.index > _same_tz(last, df_to_backup.index)
+                    ]
+                await self._append_history(con, df_to_backup)
+                await con.commit()
+                if not df_to_backup.empty:
+                    self._sql_saved_until = (
+                        self.properties.db_name,
+                        _utc(Timestamp(df_to_backup.index[-1])),
                     )
-            except Exception:
-                # df = df_to_backup
-                self._log.error("Error saving to SQL database")
-
-            # asyncio.run(
-            #    None, df_to_backup.to_sql, "history", con, None, "append", True, "index"
-            # )
+            except Exception as error:
+                self._log.error(f"Error saving to SQL database : {error}")
 
         # Saving other properties to a pickle file...
         prop_backup = {"device": self.dev_properties_df()}
@@ -256,6 +270,55 @@ class SQLMixin(object):
         except Exception as error:
             self._log.error(f"Error saving to pickle file: {error}")
 
+    async def _last_saved(self, con):
+        """
+        Timestamp (UTC) of the last row of the history table (None if empty).
+        Known after the first save, read from the table otherwise.
+
+        The timestamps are text : rows written with different UTC offsets
+        (or by older versions, through pandas) don't sort as text, they are
+        parsed to find the last one.
+        """
+        db_name, last = getattr(self, "_sql_saved_until", (None, None))
+        if db_name == self.properties.db_name:
+            return last
+        try:
+            async with con.execute('SELECT DISTINCT "index" FROM history') as cursor:
+                rows = await cursor.fetchall()
+        except aiosqlite.OperationalError:
+            # no history table yet
+            return None
+        timestamps = [_utc(Timestamp(index)) for (index,) in rows if index]
+        return max(timestamps) if timestamps else None
+
+    async def _append_history(self, con, df):
+        """
+        Append the rows of df to the history table. The table (with an index
+        on the timestamps) and new columns are created when needed.
+        """
+        await con.execute('CREATE TABLE IF NOT EXISTS history ("index" TIMESTAMP)')
+        await con.execute(
+            'CREATE INDEX IF NOT EXISTS ix_history_index ON history ("index")'
+        )
+        if df.empty:
+            return
+        async with con.execute("PRAGMA table_info(history)") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        columns = [str(column) for column in df.columns]
+        for column in columns:
+            if column not in existing:
+                await con.execute(f"ALTER TABLE history ADD COLUMN {_quote(column)}")
+        names = ", ".join(_quote(column) for column in ["index"] + columns)
+        marks = ", ".join("?" for _ in range(len(columns) + 1))
+        values = df.astype(object).where(df.notna(), None)
+        await con.executemany(
+            f"INSERT INTO history ({names}) VALUES ({marks})",
+            (
+                (str(index), *[_sql_value(value) for value in row])
+                for index, row in zip(values.index, values.itertuples(index=False))
+            ),
+        )
+
     async def points_from_sql(self, db_name):
         """
         Retrieve point list from SQL database
@@ -267,6 +330,24 @@ class SQLMixin(object):
             self._log.warning(f"No history retrieved from {db_name}.db:")
             return []
 
+    async def last_readings_from_sql(self, db_name):
+        """
+        Last valid (timestamp, value) of each point saved in the database,
+        the history table being read once for all the points.
+        """
+        try:
+            his = await self._read_from_sql('select * from "history"', db_name)
+        except Exception:
+            self._log.warning(f"No history retrieved from {db_name}.db:")
+            return {}
+        his.index = his["index"].apply(Timestamp)
+        last_readings = {}
+        for name in list(his.columns.values)[1:]:
+            column = his[name].dropna()
+            if len(column):
+                last_readings[name] = (column.index[-1].timestamp(), column.iloc[-1])
+        return last_readings
+
     async def his_from_sql(self, db_name, point):
         """
         Retrive point histories from SQL database
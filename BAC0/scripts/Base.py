@@ -28,6 +28,7 @@ from ..core.app.asyncApp import (
 )  # BAC0BBMDDeviceApplication,; BAC0ForeignDeviceApplication,
 from ..core.functions.GetIPAddr import validate_ip_address
 from ..core.functions.TimeSync import TimeHandler
+from ..core.io.DeviceInfoCache import DeviceInfoCache
 from ..core.io.IOExceptions import InitializationError, UnknownObjectError
 from ..core.utils.notes import note_and_log
 from ..tasks.TaskManager import stopAllTasks
@@ -113,6 +114,8 @@ class Base:
         self.timehandler = TimeHandler(tz=timezone)
 
         self.response = None
+        self._device_info_cache = DeviceInfoCache()
+        self._requests_in_flight: t.Dict[t.Hashable, asyncio.Future] = {}
         self._initialized = False
         self._started = False
         self._stopped = False
@@ -151,6 +154,8 @@ class Base:
         self.location = charstring(location)
 
         self.discoveredDevices: t.Optional[t.Dict[t.Tuple[str, int], int]] = None
+        # time.monotonic() when the next paced Who-Is can be sent
+        self._next_who_is: float = 0.0
         self.systemStatus = DeviceStatus(1)
 
         self.bbmdAddress = bbmdAddress
@@ -11,9 +11,11 @@ and allow communication with other devices.
 
 """
 import asyncio
+import contextlib
 import typing as t
 
 # --- standard Python modules ---
+import warnings
 import weakref
 
 from bacpypes3 import __version__ as bacpypes_version
@@ -60,6 +62,7 @@ from ..infos import __version__ as version
 
 # --- this application's modules ---
 from ..tasks.RecurringTask import RecurringTask
+from ..tasks.Scheduler import PollScheduler
 from ..tasks.TaskManager import Task
 
 INFLUXDB, _ = influxdb_if_available()
@@ -73,6 +76,9 @@ if RICH:
 
     pretty.install()
 
+# Devices read at the same time by iter_devices (total, per routed network)
+DEVICES_CONCURRENCY = 32
+DEVICES_NETWORK_CONCURRENCY = 4
 
 # ------------------------------------------------------------------------------
 
@@ -204,7 +210,8 @@ class Lite(
                     "Unable to connect to InfluxDB. Please validate parameters"
                 )
         if self.database:
-            self.create_save_to_influxdb_task(delay=20)
+            # points are written in batches by the database writer
+            self.database.start()
 
         # Announce yourself
 
@@ -226,27 +233,32 @@ class Lite(
         self._initialized = True
 
     def create_save_to_influxdb_task(self, delay: int = 60) -> None:
-        self._write_to_db = RecurringTask(
-            self.save_registered_devices_to_db,
-            delay=60,
-            name="Write to InfluxDB Task",
+        """
+        Deprecated : points are written in batches by the database writer,
+        started with the network (see InfluxDB.start()).
+        """
+        warnings.warn(
+            "create_save_to_influxdb_task() is deprecated, the database writer "
+            "is started with the network (database.start())",
+            DeprecationWarning,
+            stacklevel=2,
         )
-        self._write_to_db.start()
+        if self.database:
+            self.database.start()
 
-    async def save_registered_devices_to_db(self):
-        if len(self.registered_devices) > 0:
-            for each in self.registered_devices:
-                try:
-                    await self.database.write_points_lastvalue_to_db(each.points)
-                except Exception as error:
-                    self._log.error(
-                        f"Error writing points of {each} to InfluxDB : {error}. Stopping task."
-                    )
-                    await self._write_to_db.stop()
-                    self.log(
-                        "Write to InfluxDB Task stopped. Restarting", level="warning"
-                    )
-                    self.create_save_to_influxdb_task(delay=20)
+    async def save_registered_devices_to_db(self) -> bool:
+        """
+        Deprecated : write the readings waiting in the queue of the database
+        writer (see InfluxDB.flush()).
+        """
+        warnings.warn(
+            "save_registered_devices_to_db() is deprecated, use database.flush()",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if not self.database:
+            return False
+        return await self.database.flush()
 
     def register_device(
         self, device: t.Union[RPDeviceConnected, RPMDeviceConnected]
@@ -357,6 +369,102 @@ class Lite(
     async def devices(self):
         await self._devices(_return_list=False)
 
+    async def _device_name_and_vendor(
+        self, key: str, device: t.Dict[str, t.Any]
+    ) -> t.Optional[t.Tuple[str, str, int, Address, t.Set[int]]]:
+        objid, device_address, network_number = (
+            device["object_instance"],
+            device["address"],
+            device["network_number"],
+        )
+        devId = objid[1]
+        try:
+            values = await self.readMultiple(
+                f"{device_address} device {devId} objectName vendorName"
+            )
+        except UnrecognizedService:
+            self._log.warning(f"Unrecognized service for {devId} | {device_address}")
+            values = None
+        except (NoResponseFromController, Timeout):
+            self.log(f"No response from {key}", level="warning")
+            return None
+        if values is None or len(values) != 2:
+            # no answer ([""]) or an incomplete one : ask one property at a time
+            try:
+                deviceName, vendorName = await asyncio.gather(
+                    self.read(f"{device_address} device {devId} objectName"),
+                    self.read(f"{device_address} device {devId} vendorName"),
+                )
+            except (NoResponseFromController, Timeout):
+                self.log(f"No response from {key}", level="warning")
+                return None
+        else:
+            deviceName, vendorName = values
+        return (
+            str(deviceName),
+            str(vendorName),
+            devId,
+            device_address,
+            network_number,
+        )
+
+    async def iter_devices(
+        self,
+        concurrency: int = DEVICES_CONCURRENCY,
+        network_concurrency: int = DEVICES_NETWORK_CONCURRENCY,
+    ) -> t.AsyncIterator[t.Tuple[str, str, int, Address, t.Set[int]]]:
+        """
+        Read the name and the vendor name of the discovered devices, many
+        devices at a time. Devices are given back as soon as they answer
+        (devices not answering, or failing, are skipped).
+
+        :param concurrency: (int) devices read at the same time
+        :param network_concurrency: (int) devices read at the same time on a
+            network reached through a router
+
+        *Example*::
+
+            await bacnet._discover()
+            async for name, vendor, instance, address, networks in bacnet.iter_devices():
+                print(name, address)
+        """
+        if not self.discoveredDevices:
+            return
+        limit = asyncio.Semaphore(concurrency)
+        network_limits: t.Dict[int, asyncio.Semaphore] = {}
+
+        async def _read(key, device):
+            address = device["address"]
+            if address.addrType == Address.remoteStationAddr:
+                network_limit = network_limits.setdefault(
+                    address.addrNet, asyncio.Semaphore(network_concurrency)
+                )
+            else:
+                network_limit = None
+            # wait for the network first, not to hold a global slot
+            async with network_limit or contextlib.nullcontext():
+                async with limit:
+                    try:
+                        return await self._device_name_and_vendor(key, device)
+                    except Exception as error:
+                        # one device must not stop the others
+                        self.log(f"Error reading {key} : {error!r}", level="error")
+                        return None
+
+        tasks = [
+            asyncio.create_task(_read(key, device))
+            for key, device in list(self.discoveredDevices.items())
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is not None:
+                    yield result
+        finally:
+            # caller stopped iterating
+            for task in tasks:
+                task.cancel()
+
     async def _devices(
         self, _return_list: bool = False
     ) -> t.List[t.Tuple[str, str, str, int]]:
@@ -370,39 +478,14 @@ class Lite(
 
         lst = []
         if self.discoveredDevices is not None:
-            for k, v in self.discoveredDevices.items():
-                objid, device_address, network_number, vendor_id, vendor_name = (
-                    v["object_instance"],
-                    v["address"],
-                    v["network_number"],
-                    v["vendor_id"],
-                    v["vendor_name"],
-                )
-                devId = objid[1]
-                try:
-                    deviceName, vendorName = await self.readMultiple(
-                        f"{device_address} device {devId} objectName vendorName"
-                    )
-                except (UnrecognizedService, ValueError):
-                    self._log.warning(
-                        f"Unrecognized service for {devId} | {device_address}"
-                    )
-                    try:
-                        deviceName = await self.read(
-                            f"{device_address} device {devId} objectName"
-                        )
-                        vendorName = await self.read(
-                            f"{device_address} device {devId} vendorName"
-                        )
-                    except NoResponseFromController:
-                        self.log(f"No response from {k}", level="warning")
-                        continue
-                except (NoResponseFromController, Timeout):
-                    self.log(f"No response from {k}", level="warning")
-                    continue
-                lst.append(
-                    (deviceName, vendorName, devId, device_address, network_number)
-                )
+            order = {
+                device["object_instance"][1]: i
+                for i, device in enumerate(self.discoveredDevices.values())
+            }
+            lst = sorted(
+                [each async for each in self.iter_devices()],
+                key=lambda each: order[each[2]],
+            )
             if RICH:
                 console = Console()
                 table = Table(show_header=True, header_style="bold magenta")
@@ -434,9 +517,12 @@ class Lite(
     @property
     def tasks(self) -> t.List[Task]:
         """
-        This will present a list of all registered tasks
+        This will present a list of all registered tasks (device polls
+        included, they are run by the PollScheduler)
         """
-        return Task.tasks
+        return Task.tasks + [
+            job.poll_task for job in PollScheduler.instance().jobs.values()
+        ]
 
     def disconnect(self) -> None:
         asyncio.create_task(self._disconnect())
@@ -445,6 +531,8 @@ class Lite(
         self.log("Disconnecting", level="debug")
         for each in self.registered_devices:
             await each._disconnect()
+        if self.database:
+            await self.database.close()
         await super()._disconnect()
         self._initialized = False
 
@@ -55,12 +55,9 @@ class Match(Task):
         ):
             raise NotReadyError(f"{self.command} is not ready")
         try:
-            if self.status.history[-1] != self.command.history[-1]:
-                _val = (
-                    self.command.history[-1].split(":")[1]
-                    if ":" in self.command.history[-1]
-                    else self.command.history[-1]
-                )
+            command = self.command.lastValue
+            if self.status.lastValue != command:
+                _val = command.split(":")[1] if ":" in command else command
                 self.log(f"Match value is {_val}", level="debug")
                 await self.status._setitem(_val.replace(" ", ""))
         except (NotReadyError, TypeError) as error:
@@ -16,6 +16,7 @@ import weakref
 from ..core.utils.notes import note_and_log
 
 # --- this application's modules ---
+from .Scheduler import PollScheduler
 from .TaskManager import Task
 
 if t.TYPE_CHECKING:
@@ -64,6 +65,7 @@ class DevicePoll(Task):
     """
     Start a polling task to repeatedly read a list of points from a device using
     ReadPropertyMultiple requests.
+    The task is run by the PollScheduler, with all the other device polls.
     """
 
     def __init__(
@@ -92,6 +94,17 @@ class DevicePoll(Task):
     def device(self) -> t.Union["RPMDeviceConnected", "RPDeviceConnected", None]:
         return self._device()
 
+    def start(self) -> None:
+        # Device polls are run by the scheduler, not by their own asyncio task
+        PollScheduler.instance().add(self)
+
+    def stop(self) -> bool:
+        return PollScheduler.instance().remove(self)
+
+    @property
+    def done(self) -> bool:
+        return self.id not in PollScheduler.instance().jobs
+
     async def task(self) -> None:
         if self.device.properties.ping_failures > 0:
             self.device._log.warning(
@@ -108,9 +121,7 @@ class DevicePoll(Task):
                         self.device.properties.name, self.device.properties.address
                     )
                 )
-            await self.device.read_multiple(
-                list(self.device.pollable_points_name), points_per_request=25
-            )
+            await self.device.read_multiple(list(self.device.pollable_points_name))
             self._counter += 1
             if self._counter == self.device.properties.auto_save:
                 self.device.save(resampling=self.device.properties.save_resampling)
@@ -0,0 +1,333 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 by Christian Tremblay, P.Eng <christian.tremblay@servisys.com>
+# Licensed under LGPLv3, see file LICENSE in this source tree.
+#
+"""
+Scheduler.py - one scheduler for all the device polls
+
+Each device used to run its own polling task, sleeping independently from the
+others. Nothing prevented all the devices behind the same router from being
+polled at the same moment, which is too much for a slow MS/TP trunk.
+
+The PollScheduler owns every device poll job :
+
+    - jobs sharing the same interval are spread evenly over it
+    - the number of polls running at the same time is limited per network
+      (devices reached directly on BACnet/IP vs devices behind a router)
+    - polls going through the same router are started with a minimal spacing
+    - a poll still running when its next cycle is due is reported as an
+      overrun and the cycle is skipped
+
+The scheduler lives as long as the process, but its asyncio event and
+semaphores belong to an event loop : they are created for the running loop,
+and created again when the scheduler is used from another one.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import typing as t
+
+from bacpypes3.pdu import Address
+
+# --- this application's modules ---
+from ..core.utils.notes import note_and_log
+from .TaskManager import Task
+
+# ------------------------------------------------------------------------------
+
+# Device polls running at the same time, per network
+LOCAL_NETWORK_CONCURRENCY = 16
+ROUTED_NETWORK_CONCURRENCY = 2
+# Minimal time (sec) between the start of 2 polls through the same router
+ROUTER_SPACING = 0.05
+
+
+class PollJob:
+    """
+    A device poll owned by the scheduler.
+    """
+
+    def __init__(self, poll_task: Task, network=None, router=None) -> None:
+        self.poll_task = poll_task
+        self.interval: float = poll_task.delay
+        self.network: t.Optional[int] = network
+        self.router: t.Optional[str] = router
+        self.next_run: float = 0.0
+        self.running: bool = False
+        self.last_duration: float = 0.0
+        self.overruns: int = 0
+        self.aio_task: t.Optional[asyncio.Task] = None
+
+    def __repr__(self) -> str:
+        return "{:<40} | every {}s | network {} | router {} | last duration : {:.2f} sec | overruns : {}".format(
+            self.poll_task.name,
+            self.interval,
+            self.network if self.network is not None else "local",
+            self.router,
+            self.last_duration,
+            self.overruns,
+        )
+
+
+@note_and_log
+class PollScheduler(Task):
+    """
+    Run all device polls from a single task. There is one scheduler for the
+    process, get it using PollScheduler.instance().
+
+    *Example*::
+
+        scheduler = PollScheduler.instance()
+        scheduler.set_limit(network=2, concurrency=1)
+        scheduler.report()
+    """
+
+    _instance: t.Optional["PollScheduler"] = None
+
+    def __init__(
+        self,
+        local_concurrency: int = LOCAL_NETWORK_CONCURRENCY,
+        routed_concurrency: int = ROUTED_NETWORK_CONCURRENCY,
+        router_spacing: float = ROUTER_SPACING,
+    ) -> None:
+        Task.__init__(self, name="poll_scheduler", delay=0)
+        self.local_concurrency = local_concurrency
+        self.routed_concurrency = routed_concurrency
+        self.router_spacing = router_spacing
+        self.jobs: t.Dict[int, PollJob] = {}
+        self._limits: t.Dict[t.Optional[int], int] = {}
+        self._semaphores: t.Dict[t.Optional[int], asyncio.Semaphore] = {}
+        self._router_next_start: t.Dict[str, float] = {}
+        self._epochs: t.Dict[float, float] = {}
+        self._queue: t.List[t.Tuple[float, int, int]] = []
+        self._sequence = itertools.count()
+        # created for the running loop, see _bind_loop()
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+        self._changed: t.Optional[asyncio.Event] = None
+
+    @classmethod
+    def instance(cls) -> "PollScheduler":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def start(self) -> None:
+        # started again in another loop : still one entry in Task.tasks
+        if self in Task.tasks:
+            Task.tasks.remove(self)
+        Task.start(self)
+
+    def set_limit(self, network: t.Optional[int] = None, concurrency: int = 1) -> None:
+        """
+        Number of device polls allowed at the same time on a network
+        (None for devices reached directly on BACnet/IP).
+        """
+        self._limits[network] = concurrency
+        self._semaphores.pop(network, None)
+
+    def _bind_loop(self) -> asyncio.Event:
+        """
+        The event and the semaphores of the running loop. Anything created
+        for another loop (a previous asyncio.run()) is dropped.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._changed is None:
+            self._loop = loop
+            self._changed = asyncio.Event()
+            self._semaphores.clear()
+            self._router_next_start.clear()
+            for job in self.jobs.values():
+                if job.aio_task is not None and job.aio_task.get_loop() is not loop:
+                    job.aio_task = None
+                    job.running = False
+        return self._changed
+
+    def _wake(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+
+    def add(self, poll_task: Task) -> PollJob:
+        """
+        Give a device poll to the scheduler. It will be run every
+        poll_task.delay seconds.
+        """
+        network, router = self._route(poll_task)
+        job = PollJob(poll_task, network=network, router=router)
+        self.jobs[poll_task.id] = job
+        self._spread(job.interval)
+        changed = self._bind_loop()
+        if (
+            self.aio_task is None
+            or self.aio_task.done()
+            or self.aio_task.get_loop() is not self._loop
+        ):
+            self.start()
+        changed.set()
+        self.log(f"New poll job : {job}", level="debug")
+        return job
+
+    def remove(self, poll_task: Task) -> bool:
+        job = self.jobs.pop(poll_task.id, None)
+        if job is None:
+            return False
+        if job.aio_task is not None:
+            job.aio_task.cancel()
+        self._spread(job.interval)
+        self._wake()
+        return True
+
+    def report(self) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        Statistics of each job (interval, last duration, overruns...).
+        """
+        return {
+            job.poll_task.name: {
+                "interval": job.interval,
+                "network": job.network,
+                "router": job.router,
+                "running": job.running,
+                "count": job.poll_task.count,
+                "last_duration": job.last_duration,
+                "overruns": job.overruns,
+            }
+            for job in self.jobs.values()
+        }
+
+    def _route(self, poll_task: Task) -> t.Tuple[t.Optional[int], t.Optional[str]]:
+        device = getattr(poll_task, "device", None)
+        if device is None:
+            return (None, None)
+        address = device.bacnet_address
+        if address.addrType != Address.remoteStationAddr:
+            return (None, None)
+        try:
+            routers = device.properties.network.routing_table
+            for router_address, router in routers.items():
+                if address.addrNet in router.destination_networks:
+                    return (address.addrNet, router_address)
+        except Exception as error:
+            self.log(f"Routing table not available ({error})", level="debug")
+        return (address.addrNet, None)
+
+    def _spread(self, interval: float) -> None:
+        """
+        Give each job of the same interval its own slot in the cycle.
+        """
+        jobs = [job for job in self.jobs.values() if job.interval == interval]
+        if not jobs:
+            self._epochs.pop(interval, None)
+            return
+        now = time.monotonic()
+        epoch = self._epochs.setdefault(interval, now)
+        for i, job in enumerate(jobs):
+            slot = epoch + i * interval / len(jobs)
+            cycles = max(0, -(-(now - slot) // interval))
+            job.next_run = slot + cycles * interval
+        self._queue = [
+            (job.next_run, next(self._sequence), key) for key, job in self.jobs.items()
+        ]
+        heapq.heapify(self._queue)
+
+    def _semaphore(self, network: t.Optional[int]) -> asyncio.Semaphore:
+        self._bind_loop()
+        try:
+            return self._semaphores[network]
+        except KeyError:
+            limit = self._limits.get(
+                network,
+                self.local_concurrency if network is None else self.routed_concurrency,
+            )
+            self._semaphores[network] = asyncio.Semaphore(limit)
+            return self._semaphores[network]
+
+    async def _router_slot(self, router: t.Optional[str]) -> None:
+        if router is None:
+            return
+        now = time.monotonic()
+        start = max(now, self._router_next_start.get(router, now))
+        self._router_next_start[router] = start + self.router_spacing
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _launch(self, job: PollJob, now: float) -> None:
+        if job.running:
+            job.overruns += 1
+            self.log(
+                f"{job.poll_task.name} | Poll cycle overrun (still running after {job.interval}s), skipping this cycle",
+                level="warning",
+            )
+        else:
+            job.running = True
+            job.aio_task = asyncio.create_task(self._run(job))
+        # next slot in the future (missed cycles are skipped)
+        cycles = max(1, -(-(now - job.next_run) // job.interval))
+        job.next_run += cycles * job.interval
+        heapq.heappush(
+            self._queue,
+            (job.next_run, next(self._sequence), job.poll_task.id),
+        )
+
+    async def _run(self, job: PollJob) -> None:
+        poll_task = job.poll_task
+        try:
+            async with self._semaphore(job.network):
+                await self._router_slot(job.router)
+                _start_time = time.time()
+                poll_task.count += 1
+                try:
+                    await poll_task.task()
+                except Exception as error:
+                    self.log(
+                        f"An exception occured while running the task {poll_task.name} (id:{poll_task.id}) : {error}",
+                        level="error",
+                    )
+                poll_task.execution_time = job.last_duration = time.time() - _start_time
+                poll_task.previous_execution = _start_time
+                poll_task.next_execution = _start_time + job.interval
+        finally:
+            job.running = False
+
+    async def task(self) -> None:
+        self.log("Poll scheduler started", level="info")
+        changed = self._bind_loop()
+        try:
+            while True:
+                now = time.monotonic()
+                while self._queue and self._queue[0][0] <= now:
+                    next_run, _, key = heapq.heappop(self._queue)
+                    job = self.jobs.get(key)
+                    if job is None or job.next_run != next_run:
+                        # removed or spread again
+                        continue
+                    if getattr(job.poll_task, "device", True) is None:
+                        # device is gone
+                        del self.jobs[key]
+                        continue
+                    self._launch(job, now)
+                timeout = self._queue[0][0] - now if self._queue else None
+                changed.clear()
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for job in self.jobs.values():
+                if job.aio_task is not None:
+                    job.aio_task.cancel()
+            self.jobs.clear()
+            self._queue = []
+            self._epochs.clear()
+            self._semaphores.clear()
+            self._router_next_start.clear()
+            self._loop = None
+            self._changed = None
+
+    def __repr__(self) -> str:
+        return "{} | {} jobs | {} overruns".format(
+            self.name,
+            len(self.jobs),
+            sum(job.overruns for job in self.jobs.values()),
+        )
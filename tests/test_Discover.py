@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test the discovery of the devices of the network
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from bacpypes3.pdu import Address
+from bacpypes3.primitivedata import ObjectIdentifier
+
+from BAC0.core.functions.Discover import Discover
+
+
+def _discovered(device):
+    return {
+        "object_instance": ObjectIdentifier(f"device,{device.properties.device_id}"),
+        "address": Address(device.properties.address),
+        "network_number": {None},
+        "vendor_id": 842,
+        "vendor_name": "unknown",
+    }
+
+
+@pytest.mark.asyncio
+async def test_iter_devices(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        discovered = bacnet.discoveredDevices
+        bacnet.discoveredDevices = {
+            f"device:{device.properties.device_id}": _discovered(device)
+            for device in (test_device, test_device_30)
+        }
+        try:
+            found = {
+                instance: name
+                async for name, _, instance, _, _ in bacnet.iter_devices()
+            }
+            assert found == {
+                test_device.properties.device_id: test_device.properties.name,
+                test_device_30.properties.device_id: test_device_30.properties.name,
+            }
+            # the table lists them in discovery order
+            devices = await bacnet._devices(_return_list=True)
+            assert [each[2] for each in devices] == [
+                test_device.properties.device_id,
+                test_device_30.properties.device_id,
+            ]
+
+            # stop iterating after the first one
+            async for each in bacnet.iter_devices(concurrency=1):
+                break
+
+            # a device failing doesn't stop the others
+            _device_name_and_vendor = bacnet._device_name_and_vendor
+
+            async def _failing(key, device):
+                if key == f"device:{test_device.properties.device_id}":
+                    raise RuntimeError("Broken device")
+                return await _device_name_and_vendor(key, device)
+
+            bacnet._device_name_and_vendor = _failing
+            try:
+                found = {
+                    instance: name
+                    async for name, _, instance, _, _ in bacnet.iter_devices()
+                }
+            finally:
+                del bacnet._device_name_and_vendor
+            assert found == {
+                test_device_30.properties.device_id: test_device_30.properties.name
+            }
+
+            # no answer to ReadPropertyMultiple : ReadProperty is used
+            async def _no_answer(*args, **kwargs):
+                return [""]
+
+            bacnet.readMultiple = _no_answer
+            try:
+                key = f"device:{test_device.properties.device_id}"
+                result = await bacnet._device_name_and_vendor(
+                    key, bacnet.discoveredDevices[key]
+                )
+            finally:
+                del bacnet.readMultiple
+            assert result[0] == test_device.properties.name
+        finally:
+            bacnet.discoveredDevices = discovered
+
+
+class _IAm:
+    def __init__(self, network, instance):
+        self.pduSource = Address(f"{network}:{instance % 250 + 1}")
+        self.iAmDeviceIdentifier = ObjectIdentifier(f"device,{instance}")
+        self.vendorID = 842
+
+
+class _App:
+    """
+    150 devices on network 5, 3 on network 6. Every Who-Is gets the I-Am of
+    both networks (like remote broadcasts sent at the same time).
+    """
+
+    def __init__(self):
+        self.devices = [_IAm(5, i) for i in range(150)] + [
+            _IAm(6, i) for i in range(1000, 1003)
+        ]
+        self.requests = []
+
+    async def who_is(self, low_limit, high_limit, address, timeout):
+        self.requests.append((address, low_limit, high_limit))
+        return [
+            each
+            for each in self.devices
+            if low_limit <= each.iAmDeviceIdentifier[1] <= high_limit
+        ]
+
+
+class _Network(Discover):
+    def __init__(self):
+        self.this_application = SimpleNamespace(app=_App())
+        self._next_who_is = 0.0
+
+
+@pytest.mark.asyncio
+async def test_who_is_storm_splits_range():
+    network = _Network()
+    i_ams = await network._who_is_network(5, 0, 4194303, pacing=0)
+    requests = network.this_application.app.requests
+    # 150 answers : asked again in 2 ranges around the median instance
+    assert requests[1:3] == [
+        (Address("5:*"), 0, 73),
+        (Address("5:*"), 74, 4194303),
+    ]
+    assert len(requests) == 3
+    assert {each.iAmDeviceIdentifier[1] for each in i_ams} == set(range(150))
+
+    # only the I-Am of the network asked
+    i_ams = await network._who_is_network(6, 0, 4194303, pacing=0)
+    assert len(i_ams) == 3
+
+
+@pytest.mark.asyncio
+async def test_devices_sharing_an_address():
+    network = _Network()
+    network.discoveredDevices = None
+    network.this_application._learnedNetworks = set()
+
+    async def _no_network(*args, **kwargs):
+        return []
+
+    network.what_is_network_number = _no_network
+    network.whois_router_to_network = _no_network
+    # behind the same gateway (5:1), device 0 answers twice
+    network.this_application.app.devices = [_IAm(5, 0), _IAm(5, 250), _IAm(5, 0)]
+    await network._discover(networks=[5], pacing=0)
+    assert set(network.discoveredDevices) == {"device,0", "device,250"}
+
+
+@pytest.mark.asyncio
+async def test_deprecated_database_tasks(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        flushed = []
+
+        class _Database:
+            def start(self):
+                flushed.append("start")
+
+            async def flush(self):
+                flushed.append("flush")
+                return True
+
+        database, bacnet.database = bacnet.database, _Database()
+        try:
+            with pytest.warns(DeprecationWarning):
+                bacnet.create_save_to_influxdb_task()
+            with pytest.warns(DeprecationWarning):
+                assert await bacnet.save_registered_devices_to_db()
+        finally:
+            bacnet.database = database
+        assert flushed == ["start", "flush"]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test the circular buffer holding the history of points
+"""
+
+import pytest
+
+from BAC0.core.devices.History import PointHistory
+
+
+def test_history_keeps_the_last_readings():
+    history = PointHistory(capacity=3, numeric=True)
+    for value in range(5):
+        history.append(value, timestamp=1000.0 + value)
+    assert len(history) == 3
+    assert list(history.values) == [2.0, 3.0, 4.0]
+    assert list(history.timestamps) == [1002.0, 1003.0, 1004.0]
+    assert history.last()[1] == 4.0
+
+    history.resize(2)
+    assert list(history.values) == [3.0, 4.0]
+    history.resize(None)
+    for value in range(5, 40):
+        history.append(value)
+    assert len(history) == 37
+    assert list(history.values)[-1] == 39.0
+
+
+def test_history_storage_grows_with_readings():
+    history = PointHistory(capacity=100, numeric=True)
+    # nothing allocated for a point never read
+    assert len(history._timestamps) == 0
+    for value in range(40):
+        history.append(value, timestamp=float(value))
+    assert len(history._timestamps) == 64
+    # full : mirrored storage
+    for value in range(40, 250):
+        history.append(value, timestamp=float(value))
+    assert len(history._timestamps) == 200
+    assert list(history.values) == [float(value) for value in range(150, 250)]
+    assert list(history.timestamps) == [float(value) for value in range(150, 250)]
+    history.clear()
+    assert len(history._timestamps) == 0
+    for value in range(150):
+        history.append(value)
+    assert list(history.values) == [float(value) for value in range(50, 150)]
+
+
+def test_history_of_strings():
+    history = PointHistory(capacity=2, numeric=True)
+    history.append(1.0)
+    history.append("auto")
+    history.append("0: inactive")
+    assert not history.numeric
+    assert history.values == ["auto", "0: inactive"]
+    history.clear()
+    assert len(history) == 0
+
+
+@pytest.mark.asyncio
+async def test_last_value_is_kept_by_the_point(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        point = test_device["AV"]
+        value = await point.value
+        assert point.lastValue == value
+        assert point.lastTimestamp.tzinfo is not None
+        # a missing value doesn't replace the last valid one
+        point._trend(None)
+        assert point.lastValue == value
+        assert len(point._history.values) == len(point._history)
+        # clearing the history forgets the last reading too
+        point.clear_history()
+        assert point.lastValue is None
+        assert point.lastTimestamp is None
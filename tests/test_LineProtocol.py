@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test the line protocol encoder used to write readings to InfluxDB
+"""
+
+from types import SimpleNamespace
+
+from BAC0.db.lineprotocol import LineEncoder, field, tag_set
+
+TIMESTAMP = 1718900000.123456
+TIMESTAMP_NS = 1718900000123456000
+
+
+class _Point:
+    def __init__(self, point_type, name, units_state, description="A point"):
+        device = SimpleNamespace(
+            properties=SimpleNamespace(name="My Device", device_id=5)
+        )
+        self.properties = SimpleNamespace(
+            name=name,
+            type=point_type,
+            address=1,
+            description=description,
+            units_state=units_state,
+            device=device,
+        )
+        self.tags = []
+
+
+def test_escaping():
+    assert tag_set([("b", "x y"), ("a", "1,2=3"), ("empty", ""), ("none", None)]) == (
+        ",a=1\\,2\\=3,b=x\\ y"
+    )
+    assert (
+        field("string_value", 'say "hi" \\o/') == 'string_value="say \\"hi\\" \\\\o/"'
+    )
+    assert field("value", 3) == "value=3i"
+    assert field("value", True) == "value=true"
+    assert field("value", float("nan")) is None
+
+
+def test_encode_analog_and_states():
+    encoder = LineEncoder()
+    analog = _Point("analogInput", "ZN-T", "degreesCelsius", description=None)
+    binary = _Point("binaryValue", "Fan", ("Off", "On"))
+    multi = _Point("multiStateValue", "Mode", ["Off", "Auto"])
+    lines = encoder.encode(
+        [
+            (analog, TIMESTAMP, 21.5),
+            (binary, TIMESTAMP, "1: active"),
+            (multi, TIMESTAMP, "2: Auto"),
+        ]
+    )
+    assert lines[0] == (
+        "Device_5/analogInput:1,device=My\\ Device,device_id=5,"
+        "name=My\\ Device/ZN-T,object=analogInput:1,object_name=ZN-T,"
+        "units_state=degreesCelsius "
+        f'value=21.5,string_value="21.500 degreesCelsius" {TIMESTAMP_NS}'
+    )
+    assert lines[1].endswith(f'value=1i,string_value=" active" {TIMESTAMP_NS}')
+    assert lines[2].endswith(f'value=2i,string_value=" Auto" {TIMESTAMP_NS}')
+
+
+def test_tag_set_cached_until_point_changes():
+    encoder = LineEncoder()
+    point = _Point("analogValue", "SP", "percent")
+    first = encoder.encode_one(point, TIMESTAMP, 1.0)
+    prefix = first.split(" value=")[0]
+    assert encoder.encode_one(point, TIMESTAMP, 2.0).startswith(prefix + " ")
+
+    point.tags = point.tags + [("site", "Montreal")]
+    assert ",site=Montreal" in encoder.encode_one(point, TIMESTAMP, 3.0)
+
+    del point
+    assert not encoder._cache
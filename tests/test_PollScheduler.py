@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test the scheduler running device polls
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from BAC0.tasks.Scheduler import PollJob, PollScheduler
+from BAC0.tasks.TaskManager import Task
+
+
+class SlowJob(Task):
+    def __init__(self, name):
+        Task.__init__(self, name=name, delay=5)
+        self.runs = 0
+
+    async def task(self):
+        self.runs += 1
+        await asyncio.sleep(0.2)
+
+
+class CountingJob(Task):
+    """
+    Keeps track of the polls running at the same time.
+    """
+
+    running = 0
+    most_running = 0
+
+    def __init__(self, name):
+        Task.__init__(self, name=name, delay=5)
+        self.started = None
+
+    async def task(self):
+        self.started = time.monotonic()
+        CountingJob.running += 1
+        CountingJob.most_running = max(CountingJob.most_running, CountingJob.running)
+        await asyncio.sleep(0.1)
+        CountingJob.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_spread_and_overruns_reported(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        scheduler = PollScheduler.instance()
+        # test_device is polled every 10 seconds, by the scheduler
+        assert test_device._polling_task.task.id in scheduler.jobs
+
+        jobs = [SlowJob(f"slow_{i}") for i in range(4)]
+        for job in jobs:
+            scheduler.add(job)
+        try:
+            next_runs = sorted(scheduler.jobs[job.id].next_run for job in jobs)
+            gaps = [b - a for a, b in zip(next_runs, next_runs[1:])]
+            assert all(abs(gap - 5 / 4) < 0.01 for gap in gaps)
+
+            # a job still running when its next cycle is due is skipped
+            job = scheduler.jobs[jobs[0].id]
+            scheduler._launch(job, time.monotonic())
+            scheduler._launch(job, time.monotonic())
+            assert job.overruns == 1
+            await asyncio.sleep(0.3)
+            assert jobs[0].runs == 1
+            assert scheduler.report()["slow_0"]["overruns"] == 1
+        finally:
+            for job in jobs:
+                scheduler.remove(job)
+        assert not any(job.id in scheduler.jobs for job in jobs)
+
+
+@pytest.mark.asyncio
+async def test_network_limit():
+    scheduler = PollScheduler()
+    scheduler.set_limit(network=2, concurrency=2)
+    CountingJob.running = CountingJob.most_running = 0
+    jobs = [
+        PollJob(CountingJob(f"routed_{i}"), network=2, router=None) for i in range(5)
+    ]
+    await asyncio.gather(*(scheduler._run(job) for job in jobs))
+    assert CountingJob.most_running == 2
+    assert all(job.poll_task.count == 1 for job in jobs)
+
+    # devices reached directly use their own limit
+    CountingJob.running = CountingJob.most_running = 0
+    jobs = [PollJob(CountingJob(f"local_{i}")) for i in range(5)]
+    await asyncio.gather(*(scheduler._run(job) for job in jobs))
+    assert CountingJob.most_running == 5
+
+
+@pytest.mark.asyncio
+async def test_router_spacing():
+    scheduler = PollScheduler(router_spacing=0.05)
+    jobs = [
+        PollJob(CountingJob(f"router_{i}"), network=net, router="192.168.1.1")
+        for i, net in enumerate((2, 2, 3))
+    ]
+    await asyncio.gather(*(scheduler._run(job) for job in jobs))
+    starts = sorted(job.poll_task.started for job in jobs)
+    # different networks behind the same router are spaced too
+    assert all(b - a >= 0.04 for a, b in zip(starts, starts[1:]))
+
+
+def test_scheduler_follows_the_event_loop():
+    scheduler = PollScheduler()
+    scheduler.set_limit(network=None, concurrency=1)
+
+    async def contend():
+        job = SlowJob("loop_job")
+        scheduler.add(job)
+        scheduler.remove(job)
+        # a waiter binds the semaphore to the running loop
+        semaphore = scheduler._semaphore(None)
+        async with semaphore:
+            waiter = asyncio.create_task(semaphore.acquire())
+            await asyncio.sleep(0)
+        await waiter
+        semaphore.release()
+        return semaphore, scheduler._bind_loop()
+
+    first = asyncio.run(contend())
+    second = asyncio.run(contend())
+    assert first[0] is not second[0]
+    assert first[1] is not second[1]
+    # started in both loops, registered once
+    assert Task.tasks.count(scheduler) == 1
+    Task.tasks.remove(scheduler)
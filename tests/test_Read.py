@@ -1,8 +1,21 @@
 #!/usr/BIn/env python
 # -*- coding utf-8 -*-
+import asyncio
+import json
 from typing import AsyncGenerator
 import pytest
 
+from bacpypes3.basetypes import PropertyIdentifier
+from bacpypes3.pdu import Address
+
+import BAC0
+from BAC0.core.devices.Device import RPDeviceConnected
+from BAC0.core.devices.mixins.read_mixin import DiscoveryUtilsMixin
+from BAC0.core.devices.Points import NumericPoint
+from BAC0.core.devices.Snapshot import DeviceSnapshot, read_revision
+from BAC0.core.io.DeviceInfoCache import DeviceInfoCache
+from BAC0.core.io.IOExceptions import NoResponseFromController, SegmentationNotSupported
+
 """
 Test Bacnet communication with another device
 """
@@ -49,3 +62,348 @@ async def test_ReadBinary(network_and_devices: AsyncGenerator):
 
         assert test_device["BO"] == BINARY_TEST_STATE_STR2
         assert test_device["BO-1"] == BINARY_TEST_STATE_BOOL
+
+
+@pytest.mark.asyncio
+async def test_DeviceInfoCache(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        app = bacnet.this_application.app
+        cache = DeviceInfoCache(timeout=1)
+
+        info = await cache.get(app, test_device.bacnet_address)
+        assert info.device_instance == test_device.properties.device_id
+
+        # Many concurrent requests to a silent device : one Who-Is
+        silent = Address("127.0.0.1:47899")
+        requests = [asyncio.create_task(cache.get(app, silent)) for _ in range(50)]
+        await asyncio.sleep(0)
+        assert len(cache._pending) == 1
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        assert all(isinstance(res, NoResponseFromController) for res in results)
+
+        # ... then it is skipped without waiting for another Who-Is
+        start = loop.time()
+        with pytest.raises(NoResponseFromController):
+            await cache.get(app, silent)
+        assert loop.time() - start < 0.5
+
+        # a read sent to it fails, it's not an empty answer
+        _device_info_cache = bacnet._device_info_cache
+        bacnet._device_info_cache = cache
+        try:
+            with pytest.raises(NoResponseFromController):
+                await bacnet.readMultiple(f"{silent} analogValue 0 presentValue")
+        finally:
+            bacnet._device_info_cache = _device_info_cache
+
+
+@pytest.mark.asyncio
+async def test_IdenticalReadsShareOneRequest(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        point = test_device["AV"]
+        reads = [
+            asyncio.create_task(
+                bacnet.read_value(
+                    test_device.bacnet_address, point.object_identifier, "presentValue"
+                )
+            )
+            for _ in range(20)
+        ]
+        await asyncio.sleep(0)
+        assert len(bacnet._requests_in_flight) == 1
+        values = await asyncio.gather(*reads)
+        assert len(set(values)) == 1
+        assert not bacnet._requests_in_flight
+
+
+@pytest.mark.asyncio
+async def test_BatchedPointReads(
+    network_and_devices: AsyncGenerator, monkeypatch
+):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        points = [test_device[name] for name in ("AV", "AI", "AO")]
+        expected = [await point._read_value("presentValue") for point in points]
+        requests = []
+        read_property_multiple = bacnet._read_property_multiple
+
+        async def counting(*args, **kwargs):
+            requests.append(args)
+            return await read_property_multiple(*args, **kwargs)
+
+        bacnet._read_property_multiple = counting
+        test_device.batch_point_reads()
+        try:
+            for point in points:
+                point._cache["_previous_read"] = (None, None)
+            values = await asyncio.gather(*(point.value for point in points + points))
+        finally:
+            test_device.batch_point_reads(None)
+            del bacnet._read_property_multiple
+        assert len(requests) == 1
+        assert values == expected + expected
+
+        # a point known to break ReadPropertyMultiple is read alone
+        requests.clear()
+        bacnet._read_property_multiple = counting
+        test_device.batch_point_reads()
+        test_device._rpm_excluded["AI"] = float("inf")
+        try:
+            for point in points:
+                point._cache["_previous_read"] = (None, None)
+            values = await asyncio.gather(*(point.value for point in points))
+        finally:
+            test_device._rpm_excluded.pop("AI")
+            test_device.batch_point_reads(None)
+            del bacnet._read_property_multiple
+        assert len(requests) == 1 and len(requests[0][1]) == 4
+        assert values == expected
+
+        # a failure while sending is given to every caller
+        def failing(*args, **kwargs):
+            raise ValueError("No plan")
+
+        test_device.batch_point_reads()
+        monkeypatch.setattr("BAC0.core.devices.ReadBatcher.ReadPlan", failing)
+        try:
+            for point in points:
+                point._cache["_previous_read"] = (None, None)
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(
+                    asyncio.gather(*(point.value for point in points)), timeout=5
+                )
+        finally:
+            test_device.batch_point_reads(None)
+
+
+@pytest.mark.asyncio
+async def test_PointIndexes(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        point = test_device["AV"]
+        assert "AV" in test_device
+        assert "not a point" not in test_device
+        address = point.properties.address
+        assert test_device[("analogValue", address)] is point
+        assert test_device.find_point("analogValue", float(address)) is point
+
+        point.tag("equipment", "AHU-1")
+        assert test_device.find_points_by_tag("equipment") == [point]
+        assert test_device.find_points_by_tag("equipment", "AHU-1") == [point]
+        assert test_device.find_points_by_tag("equipment", "AHU-2") == []
+        assert ("equipment", "AHU-1") not in test_device["AI"].tags
+
+
+@pytest.mark.asyncio
+async def test_PointViews(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        analog = test_device.analog_units
+        assert "AV" in analog and "BV" not in analog
+        assert "BV" in test_device.binary_states
+        assert "BIG-ALARM" in test_device.multi_states
+        # (name, units) tuples, as before
+        assert all(
+            "percent" in str(units) for name, units in test_device.percent
+        )
+        assert all(
+            "deg" in str(units) for name, units in test_device.temperatures
+        )
+        # computed once per point list, read-only
+        assert test_device.analog_units is analog
+        with pytest.raises(TypeError):
+            analog["AV"] = "degreesCelsius"
+        numeric = test_device.points_of_class(NumericPoint)
+        assert [point.properties.name for point in numeric] == list(analog)
+        test_device.points = list(test_device.points)
+        assert test_device.analog_units is not analog
+
+
+@pytest.mark.asyncio
+async def test_DiscoveryAssembledInOrder(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        assert test_device.discover_points_progress() == 1.0
+        kinds = [type(point).__name__ for point in test_device.points]
+        # analog, then binary, then multi-state points, whatever the order
+        # the concurrent phases finished in
+        assert kinds == sorted(
+            kinds, key=["NumericPoint", "BooleanPoint", "EnumPoint"].index
+        )
+
+
+@pytest.mark.asyncio
+async def test_DiscoveryWithReadProperty(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        rpm_class = test_device.__class__
+        test_device.__class__ = RPDeviceConnected
+        try:
+            objects, points, trendlogs = await test_device._discoverPoints()
+            # names and values first, details in the background
+            av = next(point for point in points if point.properties.name == "AV")
+            assert av.properties.description == ""
+            await test_device._details_task
+        finally:
+            test_device.__class__ = rpm_class
+        assert [point.properties.name for point in points] == [
+            point.properties.name for point in test_device.points
+        ]
+        assert av.properties.units_state is not None
+        assert av.properties.units_state == test_device["AV"].properties.units_state
+        assert av.properties.description == test_device["AV"].properties.description
+
+
+@pytest.mark.asyncio
+async def test_ObjectListReadByIndex(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        expected = list(await test_device.read_objects_list())
+        read_value = bacnet.read_value
+        indexes_read = []
+
+        async def no_segmentation(address, objid, propid, arr_index=None, **kwargs):
+            if propid == PropertyIdentifier.objectList:
+                if arr_index is None:
+                    raise SegmentationNotSupported()
+                indexes_read.append(arr_index)
+            return await read_value(address, objid, propid, arr_index, **kwargs)
+
+        bacnet.read_value = no_segmentation
+        try:
+            # objectList[i] in ReadPropertyMultiple batches
+            assert list(await test_device.read_objects_list()) == expected
+            assert indexes_read == [0]
+            # or one index per ReadProperty
+            test_device.properties.object_list_rpm = False
+            assert list(await test_device.read_objects_list()) == expected
+            assert len(indexes_read) == 2 + len(expected)
+        finally:
+            test_device.properties.object_list_rpm = True
+            del bacnet.read_value
+
+
+@pytest.mark.asyncio
+async def test_FastConnect(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        test_device.properties.fast_connect = True
+        try:
+            objects, points, trendlogs = await test_device._discoverPoints()
+        finally:
+            test_device.properties.fast_connect = False
+        stubs = {point.properties.name: point for point in points}
+        assert not any(point.properties.details_loaded for point in points)
+        assert stubs["AV"].properties.units_state is None
+
+        # completed on first use
+        await stubs["AV"].value
+        assert stubs["AV"].properties.details_loaded
+        assert stubs["AV"].properties.units_state == test_device["AV"].units
+        assert not stubs["BV"].properties.details_loaded
+
+        await test_device.load_point_details(points)
+        for name in ("BV", "MV", "AI"):
+            assert stubs[name].properties.details_loaded
+            assert (
+                stubs[name].properties.units_state
+                == test_device[name].properties.units_state
+            )
+            assert (
+                stubs[name].properties.description
+                == test_device[name].properties.description
+            )
+
+
+@pytest.mark.asyncio
+async def test_DeviceSnapshot(
+    network_and_devices: AsyncGenerator, tmp_path, monkeypatch
+):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        address = test_device.properties.address
+        device_id = test_device.properties.device_id
+        first = await BAC0.device(
+            address, device_id, bacnet, poll=0, snapshot=str(tmp_path)
+        )
+        second = None
+        try:
+            snapshot = DeviceSnapshot.load(device_id, str(tmp_path))
+            assert snapshot is not None
+            assert snapshot.matches(await read_revision(first))
+
+            # the file holds plain JSON, no pickle
+            with open(DeviceSnapshot.filename(device_id, str(tmp_path))) as file:
+                assert json.load(file)["device_id"] == device_id
+
+            # unchanged device : no discovery
+            discoveries = []
+            _discoverPoints = DiscoveryUtilsMixin._discoverPoints
+
+            async def _counting_discovery(self, custom_object_list=None):
+                discoveries.append(self)
+                return await _discoverPoints(self, custom_object_list)
+
+            monkeypatch.setattr(
+                DiscoveryUtilsMixin, "_discoverPoints", _counting_discovery
+            )
+            second = await BAC0.device(
+                address, device_id, bacnet, poll=0, snapshot=str(tmp_path)
+            )
+            assert [point.properties.name for point in second.points] == [
+                point.properties.name for point in first.points
+            ]
+            assert second["AV"].properties.units_state == first["AV"].units
+            assert second["BIG-ALARM"].properties.units_state == (
+                first["BIG-ALARM"].properties.units_state
+            )
+            assert second.properties.objects_list == snapshot.objects_list
+            assert discoveries == []
+            assert await second._points_from_snapshot()
+
+            # no segmentation : no segmented requests after a reconnection
+            first.segmentation_supported = False
+            await first.save_snapshot()
+            assert not DeviceSnapshot.load(
+                device_id, str(tmp_path)
+            ).segmentation_supported
+            assert await second._points_from_snapshot()
+            assert second.segmentation_supported is False
+            assert second.properties.segmentation_supported is False
+            first.segmentation_supported = True
+            await first.save_snapshot()
+
+            # a file that isn't a valid snapshot is ignored
+            with open(DeviceSnapshot.filename(device_id, str(tmp_path)), "w") as file:
+                json.dump({"version": 1, "device_id": device_id, "points": 3}, file)
+            assert DeviceSnapshot.load(device_id, str(tmp_path)) is None
+            snapshot.save(str(tmp_path))
+
+            # changed device : discovery
+            snapshot.database_revision += 1
+            snapshot.save(str(tmp_path))
+            assert not await second._points_from_snapshot()
+        finally:
+            await first._disconnect(save_on_disconnect=False)
+            if second is not None:
+                await second._disconnect(save_on_disconnect=False)
+
+
+@pytest.mark.asyncio
+async def test_DisconnectCancelsPointDetails(network_and_devices: AsyncGenerator):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        device = await BAC0.device(
+            test_device.properties.address,
+            test_device.properties.device_id,
+            bacnet,
+            poll=0,
+        )
+        # details still being read in the background
+        details = asyncio.create_task(asyncio.sleep(3600))
+        device._details_task = details
+        await device._disconnect(save_on_disconnect=False)
+        assert details.cancelled()
+        assert device._details_task is None
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test compiled read plans and batch sizes used to poll a device
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from bacpypes3.basetypes import Segmentation
+from bacpypes3.primitivedata import CharacterString, Real
+
+from BAC0.core.devices.BatchSizer import (
+    GROW_AFTER,
+    RETRY_CEILING_AFTER,
+    RPMBatchSizer,
+)
+from BAC0.core.devices.Device import RPDeviceConnected
+from BAC0.core.devices.mixins.read_mixin import IP_RPM_WINDOW
+from BAC0.core.devices.Points import NumericPoint, Point
+
+
+@pytest.mark.asyncio
+async def test_read_plan_is_reused(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        names = list(test_device.pollable_points_name)
+        plan = test_device._read_plan(names)
+        assert plan is test_device._read_plan(names)
+        assert len(plan) == len(names)
+
+        batches = plan.batches(7)
+        assert sum(len(points) for points, _ in batches) == len(names)
+        assert all(len(parameters) == 2 * len(points) for points, parameters in batches)
+
+        before = len(test_device["AV"]._history)
+        await test_device.read_multiple(names, points_per_request=7)
+        assert len(test_device["AV"]._history) == before + 1
+
+        # A new point list invalidates the plans
+        test_device.points = test_device.points
+        assert plan is not test_device._read_plan(names)
+
+        # and so does a change made in place
+        plan = test_device._read_plan(names)
+        test_device.points.append(test_device.points.pop())
+        assert plan is not test_device._read_plan(names)
+
+
+def test_batch_sizer_uses_apdu_length():
+    sizer = RPMBatchSizer(
+        max_apdu_length_accepted=480,
+        segmentation_supported=Segmentation.noSegmentation,
+    )
+    assert sizer.size == 29
+    sizer.failure(29)
+    assert sizer.size == 14
+    # doesn't go back to a size known to fail...
+    for _ in range(14 * GROW_AFTER + RETRY_CEILING_AFTER - 1):
+        sizer.success([Real(1.0)] * sizer.size)
+    assert sizer.size == 28
+    # ...until it has worked at the limit for a long time
+    for _ in range(1 + GROW_AFTER):
+        sizer.success([Real(1.0)] * sizer.size)
+    assert sizer.size == 29
+    sizer.failure(29)
+    assert sizer.size == 28
+    # long strings mean less points per request
+    for _ in range(20):
+        sizer.success([CharacterString("x" * 40)] * sizer.size)
+    assert sizer.size < 10
+
+
+def test_batch_sizer_keeps_largest_working_size():
+    sizer = RPMBatchSizer(size=25)
+    # a batch of 25 failed, it was split and both halves were read
+    sizer.success([Real(1.0)] * 12)
+    sizer.success([Real(1.0)] * 13)
+    sizer.failure(25)
+    assert sizer.size == 13
+    assert sizer.limit == 24
+
+
+@pytest.mark.asyncio
+async def test_rpm_exclusions_expire(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        names = list(test_device.pollable_points_name)
+        test_device._exclude_from_rpm(test_device["AV"])
+        plan = test_device._read_plan(names)
+        assert [point.properties.name for point in plan.excluded] == ["AV"]
+        # the delay is over : AV is part of the requests again
+        test_device._rpm_excluded["AV"] = time.monotonic() - 1
+        plan = test_device._read_plan(names)
+        assert plan.excluded == [] and len(plan) == len(names)
+        assert "AV" not in test_device._rpm_excluded
+
+
+@pytest.mark.asyncio
+async def test_discovery_batch_without_answer_is_not_split(
+    network_and_devices, monkeypatch
+):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        requests = []
+
+        async def _no_answer(request, **kwargs):
+            requests.append(request)
+            return [""]
+
+        monkeypatch.setattr(bacnet, "readMultiple", _no_answer)
+        av = test_device["AV"].properties.address
+        request = [
+            f"analogValue {index} objectName description units "
+            for index in (av, 999)
+        ]
+        values = await test_device._discover_batch(request, 3)
+        # not split, each object read with ReadProperty
+        assert len(requests) == 1
+        assert values[0][0] == "AV"
+        assert values[1] == [None, None, None]
+
+        # no point without a name
+        points = await test_device._process_new_objects(
+            obj_cls=NumericPoint,
+            obj_type="analog",
+            objList=[("analogValue", int(av)), ("analogValue", 999)],
+        )
+        assert [point.properties.name for point in points] == ["AV"]
+
+
+@pytest.mark.asyncio
+async def test_poll_uses_learned_batch_size(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        await test_device.read_multiple(list(test_device.pollable_points_name))
+        assert test_device.properties.rpm_batch_size == test_device._rpm_batch_sizer.size
+
+
+@pytest.mark.asyncio
+async def test_pipelined_batches(network_and_devices, monkeypatch):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        names = list(test_device_30.pollable_points_name)
+        # reference values, read in one request
+        await test_device_30.read_multiple(names, points_per_request=len(names))
+        expected = [test_device_30[name].lastValue for name in names]
+        before = [len(test_device_30[name]._history) for name in names]
+
+        # the first requests sent are the last to be answered
+        in_flight = {"now": 0, "max": 0, "sent": 0}
+        _read_property_multiple = bacnet._read_property_multiple
+
+        async def _slow_read_property_multiple(address, parameter_list, **kwargs):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            in_flight["sent"] += 1
+            try:
+                await asyncio.sleep(0.2 / in_flight["sent"])
+                return await _read_property_multiple(address, parameter_list, **kwargs)
+            finally:
+                in_flight["now"] -= 1
+
+        trended = []
+        _trend = Point._trend
+
+        def _recording_trend(self, res):
+            trended.append(self.properties.name)
+            _trend(self, res)
+
+        monkeypatch.setattr(
+            bacnet, "_read_property_multiple", _slow_read_property_multiple
+        )
+        monkeypatch.setattr(Point, "_trend", _recording_trend)
+        # small batches, sent 4 at a time on IP
+        await test_device_30.read_multiple(names, points_per_request=3)
+        batches = -(-len(names) // 3)
+        assert in_flight["max"] == min(IP_RPM_WINDOW, batches) > 1
+        # values are applied in the order of the plan, whatever the answer order
+        assert trended == names
+        assert [test_device_30[name].lastValue for name in names] == expected
+        after = [len(test_device_30[name]._history) for name in names]
+        assert after == [count + 1 for count in before]
+
+
+@pytest.mark.asyncio
+async def test_value_error_splits_batches(network_and_devices, monkeypatch):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        analog_values = [
+            point
+            for point in test_device.points
+            if point.properties.type == "analogValue"
+        ]
+        readMultiple = bacnet.readMultiple
+        requests = []
+
+        async def _one_object_at_a_time(request, **kwargs):
+            requests.append(request)
+            if request.count("analogValue") > 1:
+                raise ValueError("Too many objects")
+            return await readMultiple(request, **kwargs)
+
+        monkeypatch.setattr(bacnet, "readMultiple", _one_object_at_a_time)
+        request = [
+            f"analogValue {point.properties.address} objectName "
+            for point in analog_values
+        ]
+        values = await test_device._discover_batch(request, 1)
+        # both halves read
+        assert values == [[point.properties.name] for point in analog_values]
+        assert len(requests) == 1 + len(analog_values)
+
+        # the same for a poll
+        _read_property_multiple = bacnet._read_property_multiple
+
+        async def _one_point_at_a_time(address, parameter_list, **kwargs):
+            if len(parameter_list) > 2:
+                raise ValueError("Too many points")
+            return await _read_property_multiple(address, parameter_list, **kwargs)
+
+        monkeypatch.setattr(bacnet, "_read_property_multiple", _one_point_at_a_time)
+        names = [point.properties.name for point in analog_values]
+        before = [len(point._history) for point in analog_values]
+        await test_device.read_multiple(names, points_per_request=len(names))
+        assert [len(point._history) for point in analog_values] == [
+            count + 1 for count in before
+        ]
+        assert not any(name in test_device._rpm_excluded for name in names)
+
+
+@pytest.mark.asyncio
+async def test_rejected_batches_are_split(network_and_devices, monkeypatch):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        names = list(test_device.pollable_points_name)[:4]
+        points = [test_device[name] for name in names]
+        _read_property_multiple = bacnet._read_property_multiple
+
+        async def _rejects_big_requests(address, parameter_list, **kwargs):
+            if len(parameter_list) > 2:
+                # an abort or a reject, not an exception
+                return None
+            return await _read_property_multiple(address, parameter_list, **kwargs)
+
+        monkeypatch.setattr(bacnet, "_read_property_multiple", _rejects_big_requests)
+        sizer = RPMBatchSizer(size=len(names), max_apdu_length_accepted=1476)
+        plan = test_device._read_plan(names)
+        [(batch, parameter_list)] = plan.batches(len(names))
+        succeeded, values = await test_device._read_batch(
+            plan, batch, parameter_list, sizer
+        )
+        # every point read in the end, the batch size reduced
+        assert succeeded
+        assert [point for point, _ in values] == points
+        assert all(value is not None for _, value in values)
+        assert sizer.size < len(names)
+
+
+@pytest.mark.asyncio
+async def test_excluded_points_read_without_rpm(network_and_devices):
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        names = ["AV", "AI"]
+        av = test_device["AV"]
+        test_device._exclude_from_rpm(av)
+        rpm_class = test_device.__class__
+        try:
+            before = len(av._history)
+            await test_device.read_single(names)
+            assert len(av._history) == before + 1
+
+            test_device.__class__ = RPDeviceConnected
+            await test_device.read_multiple(names)
+            assert len(av._history) == before + 2
+        finally:
+            test_device.__class__ = rpm_class
+            del test_device._rpm_excluded["AV"]
+            test_device._read_plans = {}
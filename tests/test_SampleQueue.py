@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test the queue of readings waiting for the database
+"""
+
+import pytest
+
+from BAC0.db.samples import SampleQueue
+
+
+def _fill(queue, count):
+    for i in range(count):
+        queue.put("point", float(i), i)
+
+
+def test_drop_oldest():
+    queue = SampleQueue(capacity=3)
+    _fill(queue, 5)
+    assert [value for _, _, value in queue.get_batch(10)] == [2, 3, 4]
+    assert queue.dropped == 2
+    assert not queue
+
+
+def test_drop_newest():
+    queue = SampleQueue(capacity=3, policy="drop_newest")
+    _fill(queue, 5)
+    assert [value for _, _, value in queue.get_batch(10)] == [0, 1, 2]
+    assert queue.dropped == 2
+
+
+def test_spill_and_requeue():
+    queue = SampleQueue(capacity=3, policy="spill")
+    _fill(queue, 5)
+    assert [value for _, _, value in queue.get_overflow()] == [0, 1]
+    assert queue.dropped == 0
+
+    # a batch that couldn't be written goes back in front
+    batch = queue.get_batch(2)
+    queue.put("point", 5.0, 5)
+    queue.requeue(batch)
+    assert len(queue) == 3
+    assert [value for _, _, value in queue.overflow] == [2]
+    assert [value for _, _, value in queue.get_batch(10)] == [3, 4, 5]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        SampleQueue(policy="keep_everything")
@@ -5,11 +5,16 @@
 Test Bacnet communication with another device
 """
 import asyncio
+import logging
 import os.path
+import sqlite3
+from types import SimpleNamespace
 
+import aiosqlite
 import pytest
 
 import BAC0
+from BAC0.db.sql import SQLMixin
 
 
 # @pytest.mark.skip(reason="Need more work")
@@ -43,3 +48,114 @@ async def test_disconnection_of_device(network_and_devices):
         await test_device_30.connect(network=bacnet)
         assert isinstance(test_device, BAC0.core.devices.Device.RPMDeviceConnected)
         assert isinstance(test_device_30, BAC0.core.devices.Device.RPMDeviceConnected)
+
+
+class _Histories(SQLMixin):
+    """
+    A device reduced to what save() needs, with histories set by the test.
+    """
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.points = []
+        self.properties = SimpleNamespace(
+            device_id=1234,
+            db_name=None,
+            save_resampling="1s",
+            clear_history_on_save=False,
+            asdict={},
+        )
+        self._log = logging.getLogger("test_SaveToSQL")
+
+    def log(self, message, level="info"):
+        self._log.info(message)
+
+    def backup_histories_df(self, resampling="1s"):
+        return self.histories
+
+
+@pytest.mark.asyncio
+async def test_save_appends_new_rows_only(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.chdir(tmp_path)
+
+    def histories(seconds):
+        index = pd.date_range("2024-01-01 00:00:00", periods=seconds, freq="1s")
+        return pd.DataFrame({"AV": [float(i) for i in range(seconds)]}, index=index)
+
+    device = _Histories(histories(3))
+    await device.save(filename="saved")
+    # same readings and 2 new ones
+    device.histories = histories(5)
+    await device.save(filename="saved")
+    # a new object finds the last row saved in the table
+    device = _Histories(histories(6))
+    await device.save(filename="saved")
+
+    async with aiosqlite.connect("saved.db") as con:
+        async with con.execute('SELECT "index", AV FROM history') as cursor:
+            rows = await cursor.fetchall()
+    assert [value for _, value in rows] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert len({index for index, _ in rows}) == 6
+
+
+@pytest.mark.asyncio
+async def test_last_readings_read_once(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.chdir(tmp_path)
+    index = pd.date_range("2024-01-01 00:00:00", periods=3, freq="1s")
+    device = _Histories(
+        pd.DataFrame({"AV": [1.0, 2.0, 3.0], "BV": [1.0, None, None]}, index=index)
+    )
+    await device.save(filename="saved")
+
+    reads = []
+    _read_from_sql = device._read_from_sql
+
+    async def _counting(request, db_name):
+        reads.append(request)
+        return await _read_from_sql(request, db_name)
+
+    device._read_from_sql = _counting
+    last_readings = await device.last_readings_from_sql("saved")
+    assert len(reads) == 1
+    # last valid value of each point
+    assert last_readings == {
+        "AV": (index[2].timestamp(), 3.0),
+        "BV": (index[0].timestamp(), 1.0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_save_after_rows_written_by_pandas(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.chdir(tmp_path)
+
+    # written by the previous versions (pandas to_sql), with 2 UTC offsets :
+    # the last row (10:00 UTC) isn't the last one as text
+    with sqlite3.connect("saved.db") as con:
+        for start, tz in (
+            ("2024-01-01 10:00:00", "Europe/Paris"),
+            ("2024-01-01 05:00:00", "America/Montreal"),
+        ):
+            index = pd.date_range(start, periods=1, freq="1s", tz=tz)
+            pd.io.sql.to_sql(
+                pd.DataFrame({"AV": [1.0]}, index=index),
+                name="history",
+                con=con,
+                index_label="index",
+                index=True,
+                if_exists="append",
+            )
+
+    index = pd.date_range("2024-01-01 09:59:58", periods=5, freq="1s", tz="UTC")
+    device = _Histories(pd.DataFrame({"AV": [2.0] * 5}, index=index))
+    await device.save(filename="saved")
+
+    async with aiosqlite.connect("saved.db") as con:
+        async with con.execute('SELECT "index" FROM history') as cursor:
+            rows = await cursor.fetchall()
+    saved = sorted(pd.Timestamp(index).tz_convert("UTC") for (index,) in rows)
+    # only the readings after 10:00 UTC were appended
+    assert len(saved) == 4
+    assert saved[-2:] == list(index[-2:])
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding utf-8 -*-
+
+"""
+Test the spill log (readings kept on disk while the database is unavailable)
+"""
+
+from BAC0.db.spill import SpillLog
+
+
+def test_segments_replayed_in_order(tmp_path):
+    log = SpillLog(str(tmp_path / "spill"), segment_size=100)
+    assert not log
+    for i in range(4):
+        log.append([f"m,device=1 value={i} {i}", f"m,device=2 value={i} {i}"])
+    # a new segment is started when the size is reached
+    assert len(log.segments(close=True)) == 2
+
+    log.append(["m,device=1 value=4 4"])
+    replayed = []
+    for segment in log.segments(close=True):
+        replayed.extend(log.read(segment))
+        log.acknowledge(segment)
+    assert [line.split()[-1] for line in replayed] == [
+        "0",
+        "0",
+        "1",
+        "1",
+        "2",
+        "2",
+        "3",
+        "3",
+        "4",
+    ]
+    assert not log
+    assert log.segments() == []
+
+
+def test_segment_kept_until_acknowledged(tmp_path):
+    log = SpillLog(str(tmp_path))
+    log.append(["m value=1 1"])
+    segment = log.segments(close=True)[0]
+    log.append(["m value=2 2"])
+    # the first segment is still there, new lines went to a new one
+    assert log.segments(close=True)[0] == segment
+    log.acknowledge(segment)
+    assert [log.read(each) for each in log.segments()] == [["m value=2 2"]]
@@ -7,6 +7,8 @@ Test Bacnet communication with another device
 import asyncio
 import pytest
 
+from bacpypes3.basetypes import PropertyIdentifier
+
 NEWCSVALUE = "New_Test"
 
 
@@ -47,6 +49,38 @@ async def test_WriteCharStr(network_and_devices):
         assert new_value == NEWCSVALUE
 
 
+@pytest.mark.asyncio
+async def test_WriteValueTyped(network_and_devices):
+    # Typed requests, no string is built or parsed
+    async for resources in network_and_devices:
+        loop, bacnet, device_app, device30_app, test_device, test_device_30 = resources
+        point = test_device["AV"]
+        await bacnet.write_value(
+            test_device.bacnet_address,
+            point.object_identifier,
+            PropertyIdentifier.presentValue,
+            11.25,
+            priority=8,
+        )
+        value = await bacnet.read_value(
+            test_device.bacnet_address,
+            point.object_identifier,
+            PropertyIdentifier.presentValue,
+        )
+        assert abs(value - 11.25) < 0.01
+        values = await bacnet.read_multiple_values(
+            test_device.bacnet_address,
+            [
+                (
+                    point.object_identifier,
+                    [PropertyIdentifier.presentValue, PropertyIdentifier.objectName],
+                )
+            ],
+        )
+        assert abs(values[0] - 11.25) < 0.01
+        assert values[1] == point.properties.name
+
+
 @pytest.mark.skip(
     "Not ready yet as BAC0 do not support out_of_service write -> unlocking PV"
 )